@@ -0,0 +1,71 @@
+"""Alert signal conditions, expressions and re-arming
+
+Adds the columns for move/RSI/volume/expression alerts and re-arming, and
+the new ``alertcondition`` enum values (stored by name).
+
+Databases created by ``init_db()`` after these columns were added already
+have them, and a database without the alerts table gets it from
+``init_db()``, so existing columns are skipped.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+NEW_CONDITIONS = ('MOVE_PERCENT', 'RSI_ABOVE', 'RSI_BELOW', 'EXPRESSION', 'VOLUME_ABOVE')
+
+COLUMNS = (
+    sa.Column('window_minutes', sa.Integer(), nullable=True),
+    sa.Column('timeframe', sa.String(5), nullable=True),
+    sa.Column('expression', sa.String(500), nullable=True),
+    sa.Column('rearm', sa.Boolean(), nullable=False, server_default=sa.false()),
+    sa.Column('hysteresis_percent', sa.Float(), nullable=True),  # NULL: settings default
+    sa.Column('cooldown_seconds', sa.Integer(), nullable=True),  # NULL: settings default
+)
+
+
+def _alert_columns():
+    """The alerts table's columns, or None when it does not exist yet."""
+    if op.get_context().as_sql:
+        return set()  # offline (--sql): no database to inspect
+    inspector = sa.inspect(op.get_bind())
+    if 'alerts' not in inspector.get_table_names():
+        return None
+    return {column['name'] for column in inspector.get_columns('alerts')}
+
+
+def upgrade():
+    existing = _alert_columns()
+    if existing is None:
+        return
+    
+    if op.get_bind().dialect.name == 'postgresql':
+        # ADD VALUE cannot be used in the transaction that adds it
+        with op.get_context().autocommit_block():
+            for name in NEW_CONDITIONS:
+                op.execute(f"ALTER TYPE alertcondition ADD VALUE IF NOT EXISTS '{name}'")
+    
+    with op.batch_alter_table('alerts') as batch:
+        for column in COLUMNS:
+            if column.name not in existing:
+                batch.add_column(column.copy())
+
+
+def downgrade():
+    if _alert_columns() is None:
+        return
+    
+    # Postgres cannot drop enum values, so they stay in the type; alerts
+    # with the new conditions must be deleted before downgrading the app
+    with op.batch_alter_table('alerts') as batch:
+        for column in reversed(COLUMNS):
+            batch.drop_column(column.name)
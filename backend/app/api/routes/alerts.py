@@ -1,36 +1,115 @@
 """
 Alert management API routes.
 """
-from typing import List
+import asyncio
+from datetime import datetime, timedelta
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_async_db, SessionLocal
 from app.core.security import get_current_user
 from app.models.user import User
-from app.models.alert import Alert
+from app.models.alert import Alert, AlertCondition, PRICE_CONDITIONS
 from app.models.price import AlertHistory
-from app.schemas.alert import AlertCreate, AlertUpdate, AlertResponse, AlertHistoryResponse
+from app.schemas.alert import (
+    AlertCreate, AlertUpdate, AlertResponse, AlertHistoryResponse,
+    AlertBacktestRequest, AlertBacktestResponse
+)
+from app.services.alert_engine import alert_engine
+from app.services.alert_expressions import ExpressionError, parse_expression
+from app.services.alert_replay import alert_replay
 from app.config import settings
 
 router = APIRouter(prefix="/alerts", tags=["Alerts"])
 
 
+def _validate_condition(
+    condition: AlertCondition,
+    symbol: Optional[str],
+    target: Optional[float],
+    window_minutes: Optional[int] = None,
+    timeframe: Optional[str] = None,
+    expression: Optional[str] = None
+) -> str:
+    """
+    Check the fields a condition type needs.
+    
+    Returns:
+        The alert's symbol (for expressions, the first symbol referenced)
+    """
+    if condition == AlertCondition.EXPRESSION:
+        try:
+            _, symbols = parse_expression(expression or "")
+        except ExpressionError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        return symbols[0]
+    
+    if symbol not in settings.supported_symbols:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported symbol. Supported: {', '.join(settings.supported_symbols)}"
+        )
+    if target is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="target_price is required"
+        )
+    
+    if condition == AlertCondition.MOVE_PERCENT:
+        if window_minutes is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="move_percent alerts require window_minutes"
+            )
+        if target <= 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="move_percent alerts require a positive percent"
+            )
+    elif condition == AlertCondition.VOLUME_ABOVE:
+        if window_minutes is None or window_minutes * 60 > settings.trade_bucket_seconds:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"volume_above alerts require window_minutes up to {settings.trade_bucket_seconds // 60}"
+            )
+        if target <= 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="volume_above alerts require a positive volume"
+            )
+    elif condition in (AlertCondition.RSI_ABOVE, AlertCondition.RSI_BELOW):
+        if timeframe not in settings.indicator_timeframes:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"RSI alerts require a timeframe. Available: {', '.join(settings.indicator_timeframes)}"
+            )
+        if not 0 < target < 100:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="RSI level must be between 0 and 100"
+            )
+    
+    return symbol
+
+
 @router.get("", response_model=List[AlertResponse])
 async def get_alerts(
     active_only: bool = False,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get all alerts for the current user.
     """
-    query = db.query(Alert).filter(Alert.user_id == current_user.id)
+    query = select(Alert).where(Alert.user_id == current_user.id)
     
     if active_only:
-        query = query.filter(Alert.is_active == True)
+        query = query.where(Alert.is_active == True)
     
-    alerts = query.order_by(Alert.created_at.desc()).all()
+    result = await db.execute(query.order_by(Alert.created_at.desc()))
+    alerts = result.scalars().all()
     return [AlertResponse.model_validate(a) for a in alerts]
 
 
@@ -38,23 +117,28 @@ async def get_alerts(
 async def create_alert(
     alert_data: AlertCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create a new price alert.
     """
-    # Validate symbol
-    if alert_data.symbol not in settings.supported_symbols:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Unsupported symbol. Supported: {', '.join(settings.supported_symbols)}"
-        )
+    # Validate symbol and condition fields
+    symbol = _validate_condition(
+        alert_data.condition,
+        alert_data.symbol,
+        alert_data.target_price,
+        alert_data.window_minutes,
+        alert_data.timeframe,
+        alert_data.expression
+    )
     
     # Check alert limit (e.g., max 20 active alerts per user)
-    active_count = db.query(Alert).filter(
-        Alert.user_id == current_user.id,
-        Alert.is_active == True
-    ).count()
+    active_count = await db.scalar(
+        select(func.count()).select_from(Alert).where(
+            Alert.user_id == current_user.id,
+            Alert.is_active == True
+        )
+    )
     
     if active_count >= 20:
         raise HTTPException(
@@ -65,34 +149,94 @@ async def create_alert(
     # Create alert
     alert = Alert(
         user_id=current_user.id,
-        symbol=alert_data.symbol,
-        target_price=alert_data.target_price,
+        symbol=symbol,
+        target_price=alert_data.target_price if alert_data.target_price is not None else 0.0,
         condition=alert_data.condition,
+        window_minutes=alert_data.window_minutes,
+        timeframe=alert_data.timeframe,
+        expression=alert_data.expression if alert_data.condition == AlertCondition.EXPRESSION else None,
+        rearm=alert_data.rearm,
+        hysteresis_percent=alert_data.hysteresis_percent,
+        cooldown_seconds=alert_data.cooldown_seconds,
         note=alert_data.note,
         notify_telegram=alert_data.notify_telegram,
         notify_email=alert_data.notify_email
     )
     
     db.add(alert)
-    db.commit()
-    db.refresh(alert)
+    await db.commit()
+    await db.refresh(alert)
+    alert_engine.upsert(alert)
     
     return AlertResponse.model_validate(alert)
 
 
+@router.post("/backtest", response_model=AlertBacktestResponse)
+async def backtest_alert(
+    request: AlertBacktestRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Show how often an alert would have fired over a past period.
+    
+    Uses archived ticks when available, otherwise price history.
+    """
+    if request.symbol not in settings.supported_symbols:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported symbol. Supported: {', '.join(settings.supported_symbols)}"
+        )
+    
+    if request.condition not in PRICE_CONDITIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Backtesting supports above/below alerts only"
+        )
+    
+    period_map = {
+        "1h": timedelta(hours=1),
+        "24h": timedelta(hours=24),
+        "7d": timedelta(days=7),
+        "30d": timedelta(days=30)
+    }
+    end = datetime.utcnow()
+    
+    # Archive reads and NumPy evaluation run in a worker thread with its own
+    # sync session so they don't block the event loop
+    def run_backtest():
+        db = SessionLocal()
+        try:
+            return alert_replay.backtest(
+                db,
+                symbol=request.symbol,
+                target_price=request.target_price,
+                condition=request.condition,
+                start=end - period_map[request.period],
+                end=end
+            )
+        finally:
+            db.close()
+    
+    result = await asyncio.to_thread(run_backtest)
+    
+    return AlertBacktestResponse(period=request.period, **result)
+
+
 @router.get("/{alert_id}", response_model=AlertResponse)
 async def get_alert(
     alert_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get a specific alert by ID.
     """
-    alert = db.query(Alert).filter(
-        Alert.id == alert_id,
-        Alert.user_id == current_user.id
-    ).first()
+    alert = await db.scalar(
+        select(Alert).where(
+            Alert.id == alert_id,
+            Alert.user_id == current_user.id
+        )
+    )
     
     if not alert:
         raise HTTPException(
@@ -108,15 +252,17 @@ async def update_alert(
     alert_id: int,
     alert_data: AlertUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update an existing alert.
     """
-    alert = db.query(Alert).filter(
-        Alert.id == alert_id,
-        Alert.user_id == current_user.id
-    ).first()
+    alert = await db.scalar(
+        select(Alert).where(
+            Alert.id == alert_id,
+            Alert.user_id == current_user.id
+        )
+    )
     
     if not alert:
         raise HTTPException(
@@ -125,10 +271,39 @@ async def update_alert(
         )
     
     # Update fields
+    was_expression = alert.condition == AlertCondition.EXPRESSION
     if alert_data.target_price is not None:
         alert.target_price = alert_data.target_price
     if alert_data.condition is not None:
         alert.condition = alert_data.condition
+    if alert_data.window_minutes is not None:
+        alert.window_minutes = alert_data.window_minutes
+    if alert_data.timeframe is not None:
+        alert.timeframe = alert_data.timeframe
+    if alert_data.expression is not None:
+        alert.expression = alert_data.expression
+    if alert_data.rearm is not None:
+        alert.rearm = alert_data.rearm
+    if alert_data.hysteresis_percent is not None:
+        alert.hysteresis_percent = alert_data.hysteresis_percent
+    if alert_data.cooldown_seconds is not None:
+        alert.cooldown_seconds = alert_data.cooldown_seconds
+    
+    # Only expression alerts keep an expression; one switched to another
+    # condition needs a real target (expression alerts store 0)
+    target = alert.target_price
+    if alert.condition != AlertCondition.EXPRESSION:
+        alert.expression = None
+        if was_expression and alert_data.target_price is None:
+            target = None
+    alert.symbol = _validate_condition(
+        alert.condition,
+        alert.symbol,
+        target,
+        alert.window_minutes,
+        alert.timeframe,
+        alert.expression
+    )
     if alert_data.is_active is not None:
         alert.is_active = alert_data.is_active
         # Reset triggered status if reactivating
@@ -143,8 +318,9 @@ async def update_alert(
     if alert_data.notify_email is not None:
         alert.notify_email = alert_data.notify_email
     
-    db.commit()
-    db.refresh(alert)
+    await db.commit()
+    await db.refresh(alert)
+    alert_engine.upsert(alert)
     
     return AlertResponse.model_validate(alert)
 
@@ -153,15 +329,17 @@ async def update_alert(
 async def delete_alert(
     alert_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete an alert.
     """
-    alert = db.query(Alert).filter(
-        Alert.id == alert_id,
-        Alert.user_id == current_user.id
-    ).first()
+    alert = await db.scalar(
+        select(Alert).where(
+            Alert.id == alert_id,
+            Alert.user_id == current_user.id
+        )
+    )
     
     if not alert:
         raise HTTPException(
@@ -169,21 +347,25 @@ async def delete_alert(
             detail="Alert not found"
         )
     
-    db.delete(alert)
-    db.commit()
+    await db.delete(alert)
+    await db.commit()
+    alert_engine.remove(alert_id)
 
 
 @router.get("/history/all", response_model=List[AlertHistoryResponse])
 async def get_alert_history(
     limit: int = 50,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get history of triggered alerts.
     """
-    history = db.query(AlertHistory).filter(
-        AlertHistory.user_id == current_user.id
-    ).order_by(AlertHistory.triggered_at.desc()).limit(limit).all()
+    result = await db.execute(
+        select(AlertHistory).where(
+            AlertHistory.user_id == current_user.id
+        ).order_by(AlertHistory.triggered_at.desc()).limit(limit)
+    )
+    history = result.scalars().all()
     
     return [AlertHistoryResponse.model_validate(h) for h in history]
@@ -3,14 +3,16 @@ Authentication API routes.
 """
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.rate_limit import throttle_login
 from app.core.security import (
-    create_access_token,
-    get_password_hash,
-    verify_password,
-    get_current_user
+    create_user_token,
+    password_hasher,
+    get_current_user,
+    invalidate_user
 )
 from app.models.user import User
 from app.schemas.user import UserCreate, UserLogin, UserResponse, TokenResponse, UserUpdate
@@ -19,20 +21,20 @@ from app.config import settings
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
-@router.post("/register", response_model=TokenResponse)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+@router.post("/register", response_model=TokenResponse, dependencies=[Depends(throttle_login)])
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Register a new user account.
     """
     # Check if email already exists
-    if db.query(User).filter(User.email == user_data.email).first():
+    if await db.scalar(select(User).where(User.email == user_data.email)):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
     # Check if username already exists
-    if db.query(User).filter(User.username == user_data.username).first():
+    if await db.scalar(select(User).where(User.username == user_data.username)):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already taken"
@@ -42,15 +44,15 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     user = User(
         email=user_data.email,
         username=user_data.username,
-        hashed_password=get_password_hash(user_data.password)
+        hashed_password=await password_hasher.hash(user_data.password)
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     
     # Generate token
-    access_token = create_access_token(
-        data={"sub": str(user.id)},
+    access_token = create_user_token(
+        user,
         expires_delta=timedelta(minutes=settings.access_token_expire_minutes)
     )
     
@@ -60,15 +62,15 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     )
 
 
-@router.post("/login", response_model=TokenResponse)
-async def login(user_data: UserLogin, db: Session = Depends(get_db)):
+@router.post("/login", response_model=TokenResponse, dependencies=[Depends(throttle_login)])
+async def login(user_data: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """
     Login with email and password.
     """
     # Find user by email
-    user = db.query(User).filter(User.email == user_data.email).first()
+    user = await db.scalar(select(User).where(User.email == user_data.email))
     
-    if not user or not verify_password(user_data.password, user.hashed_password):
+    if not user or not await password_hasher.verify(user_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
@@ -81,8 +83,8 @@ async def login(user_data: UserLogin, db: Session = Depends(get_db)):
         )
     
     # Generate token
-    access_token = create_access_token(
-        data={"sub": str(user.id)},
+    access_token = create_user_token(
+        user,
         expires_delta=timedelta(minutes=settings.access_token_expire_minutes)
     )
     
@@ -104,18 +106,33 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
 async def update_current_user(
     user_data: UserUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update current user's profile.
     """
+    # The authenticated user may come from the auth cache; change a
+    # session-bound copy instead. A cached user or trusted token claim can
+    # outlive a deleted account, so the row may be gone.
+    user_id = current_user.id
+    current_user = await db.get(User, user_id)
+    if current_user is None:
+        invalidate_user(user_id)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
     # Update fields if provided
     if user_data.username is not None:
         # Check if username is taken by another user
-        existing = db.query(User).filter(
-            User.username == user_data.username,
-            User.id != current_user.id
-        ).first()
+        existing = await db.scalar(
+            select(User).where(
+                User.username == user_data.username,
+                User.id != current_user.id
+            )
+        )
         if existing:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -132,7 +149,8 @@ async def update_current_user(
     if user_data.telegram_notifications is not None:
         current_user.telegram_notifications = user_data.telegram_notifications
     
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    await db.refresh(current_user)
+    invalidate_user(current_user.id)
     
     return UserResponse.model_validate(current_user)
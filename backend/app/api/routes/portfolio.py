@@ -1,88 +1,170 @@
 """
-Portfolio management API routes.
+Portfolio management API routes including WebSocket for live valuations.
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
-from app.core.security import get_current_user
+from app.core.database import get_async_db, AsyncSessionLocal
+from app.core.metrics import WS_BROADCAST_SECONDS, WS_CLIENTS
+from app.core.security import get_current_user, get_user_from_token
 from app.models.user import User
 from app.models.portfolio import PortfolioHolding
 from app.schemas.portfolio import HoldingCreate, HoldingUpdate, HoldingResponse, PortfolioSummary
-from app.services.bybit import bybit_client
+from app.services.price_feed import price_feed
+from app.services.portfolio_valuation import portfolio_valuation
 from app.config import settings
 
 router = APIRouter(prefix="/portfolio", tags=["Portfolio"])
 
 
+# =============================================================================
+# WebSocket Connection Manager
+# =============================================================================
+
+class PortfolioWebSocketManager:
+    """
+    Pushes live portfolio valuations to each user's WebSocket connections.
+    
+    Updates are throttled to one per ``portfolio_ws_throttle_seconds`` per
+    user and only sent when a rounded value actually changed. Messages carry
+    the totals plus the holdings that changed; a full snapshot is sent when
+    holdings are added or removed.
+    """
+    
+    def __init__(self):
+        self.connections: Dict[int, List[WebSocket]] = {}
+        self._last_summary: Dict[int, PortfolioSummary] = {}
+        self._last_sent: Dict[int, dict] = {}
+        self._task: Optional[asyncio.Task] = None
+    
+    def _update_client_gauge(self):
+        WS_CLIENTS.labels("portfolio").set(sum(len(c) for c in self.connections.values()))
+    
+    async def connect(self, websocket: WebSocket, user_id: int, summary: PortfolioSummary):
+        self.connections.setdefault(user_id, []).append(websocket)
+        self._update_client_gauge()
+        
+        snapshot = summary.model_dump(mode="json")
+        await websocket.send_json({
+            "type": "snapshot",
+            "data": snapshot,
+            "timestamp": datetime.utcnow().isoformat()
+        })
+        
+        # Other connections of this user may still be owed a delta from the
+        # previous state, so only seed the state for a user's first connection
+        if user_id not in self._last_sent:
+            self._last_summary[user_id] = summary
+            self._last_sent[user_id] = snapshot
+        
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        
+        print(f"✓ Portfolio WebSocket client connected. Users: {len(self.connections)}")
+    
+    def disconnect(self, websocket: WebSocket, user_id: int):
+        connections = self.connections.get(user_id, [])
+        if websocket in connections:
+            connections.remove(websocket)
+        if not connections:
+            self.connections.pop(user_id, None)
+            self._last_summary.pop(user_id, None)
+            self._last_sent.pop(user_id, None)
+        self._update_client_gauge()
+        print(f"✗ Portfolio WebSocket client disconnected. Users: {len(self.connections)}")
+    
+    def _diff(self, user_id: int, summary: PortfolioSummary) -> Optional[dict]:
+        """Build the message for a changed summary, or None if nothing visible changed."""
+        current = summary.model_dump(mode="json")
+        last = self._last_sent[user_id]
+        self._last_sent[user_id] = current
+        
+        if [h["id"] for h in current["holdings"]] != [h["id"] for h in last["holdings"]]:
+            return {"type": "snapshot", "data": current}
+        
+        changed = [
+            holding for holding, previous in zip(current["holdings"], last["holdings"])
+            if holding != previous
+        ]
+        totals = {k: current[k] for k in ("total_value", "total_pnl", "total_pnl_percent")}
+        if not changed and all(totals[k] == last[k] for k in totals):
+            return None
+        
+        return {"type": "delta", "data": {**totals, "holdings": changed}}
+    
+    async def _send(self, user_id: int, message: dict):
+        message["timestamp"] = datetime.utcnow().isoformat()
+        text = json.dumps(message)
+        
+        for connection in list(self.connections.get(user_id, [])):
+            try:
+                await connection.send_text(text)
+            except Exception:
+                self.disconnect(connection, user_id)
+    
+    async def _run(self):
+        """Flush changed valuations to connected users until none remain."""
+        while self.connections:
+            await asyncio.sleep(settings.portfolio_ws_throttle_seconds)
+            
+            started = time.perf_counter()
+            
+            # Reload expired or evicted portfolios of connected users so
+            # changes made elsewhere reach their sockets too
+            stale = [u for u in self.connections if portfolio_valuation.needs_reload(u)]
+            if stale:
+                async with AsyncSessionLocal() as db:
+                    for user_id in stale:
+                        await portfolio_valuation.get_summary(db, user_id)
+            
+            for user_id in list(self.connections):
+                summary = portfolio_valuation.peek_summary(user_id)
+                
+                # Summaries are cached objects; the same object means no change
+                if summary is None or summary is self._last_summary.get(user_id):
+                    continue
+                self._last_summary[user_id] = summary
+                
+                message = self._diff(user_id, summary)
+                if message:
+                    await self._send(user_id, message)
+            WS_BROADCAST_SECONDS.labels("portfolio").observe(time.perf_counter() - started)
+
+
+# Global WebSocket manager
+portfolio_ws_manager = PortfolioWebSocketManager()
+
+
+# =============================================================================
+# REST Endpoints
+# =============================================================================
+
+
 @router.get("", response_model=PortfolioSummary)
 async def get_portfolio(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get user's complete portfolio with current values.
+    
+    Served from the in-memory valuation service, which keeps totals
+    current as prices tick.
     """
-    holdings = db.query(PortfolioHolding).filter(
-        PortfolioHolding.user_id == current_user.id
-    ).all()
-    
-    # Get current prices
-    current_prices = bybit_client.get_current_prices()
-    
-    # Calculate values for each holding
-    holdings_response = []
-    total_value = 0
-    total_cost = 0
-    
-    for holding in holdings:
-        price_data = current_prices.get(holding.symbol, {})
-        current_price = price_data.get('price', 0)
-        current_value = holding.amount * current_price
-        
-        # Calculate P&L
-        pnl = 0
-        pnl_percent = 0
-        if holding.average_buy_price and holding.average_buy_price > 0:
-            cost_basis = holding.amount * holding.average_buy_price
-            pnl = current_value - cost_basis
-            pnl_percent = (pnl / cost_basis) * 100 if cost_basis > 0 else 0
-            total_cost += cost_basis
-        
-        total_value += current_value
-        
-        holdings_response.append(HoldingResponse(
-            id=holding.id,
-            user_id=holding.user_id,
-            symbol=holding.symbol,
-            amount=holding.amount,
-            average_buy_price=holding.average_buy_price,
-            created_at=holding.created_at,
-            updated_at=holding.updated_at,
-            current_price=round(current_price, 2),
-            current_value=round(current_value, 2),
-            pnl=round(pnl, 2),
-            pnl_percent=round(pnl_percent, 2)
-        ))
-    
-    # Calculate total P&L
-    total_pnl = total_value - total_cost if total_cost > 0 else 0
-    total_pnl_percent = (total_pnl / total_cost) * 100 if total_cost > 0 else 0
-    
-    return PortfolioSummary(
-        total_value=round(total_value, 2),
-        total_pnl=round(total_pnl, 2),
-        total_pnl_percent=round(total_pnl_percent, 2),
-        holdings=holdings_response
-    )
+    return await portfolio_valuation.get_summary(db, current_user.id)
 
 
 @router.post("/holdings", response_model=HoldingResponse, status_code=status.HTTP_201_CREATED)
 async def add_holding(
     holding_data: HoldingCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Add a new holding to portfolio.
@@ -95,10 +177,12 @@ async def add_holding(
         )
     
     # Check if holding already exists for this symbol
-    existing = db.query(PortfolioHolding).filter(
-        PortfolioHolding.user_id == current_user.id,
-        PortfolioHolding.symbol == holding_data.symbol
-    ).first()
+    existing = await db.scalar(
+        select(PortfolioHolding).where(
+            PortfolioHolding.user_id == current_user.id,
+            PortfolioHolding.symbol == holding_data.symbol
+        )
+    )
     
     if existing:
         raise HTTPException(
@@ -115,11 +199,12 @@ async def add_holding(
     )
     
     db.add(holding)
-    db.commit()
-    db.refresh(holding)
+    await db.commit()
+    await db.refresh(holding)
+    portfolio_valuation.upsert_holding(holding)
     
     # Add current price info
-    price_data = bybit_client.get_price(holding.symbol)
+    price_data = price_feed.get_price(holding.symbol)
     current_price = price_data.get('price', 0) if price_data else 0
     
     return HoldingResponse(
@@ -142,15 +227,17 @@ async def update_holding(
     holding_id: int,
     holding_data: HoldingUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update a holding in portfolio.
     """
-    holding = db.query(PortfolioHolding).filter(
-        PortfolioHolding.id == holding_id,
-        PortfolioHolding.user_id == current_user.id
-    ).first()
+    holding = await db.scalar(
+        select(PortfolioHolding).where(
+            PortfolioHolding.id == holding_id,
+            PortfolioHolding.user_id == current_user.id
+        )
+    )
     
     if not holding:
         raise HTTPException(
@@ -164,11 +251,12 @@ async def update_holding(
     if holding_data.average_buy_price is not None:
         holding.average_buy_price = holding_data.average_buy_price
     
-    db.commit()
-    db.refresh(holding)
+    await db.commit()
+    await db.refresh(holding)
+    portfolio_valuation.upsert_holding(holding)
     
     # Calculate current values
-    price_data = bybit_client.get_price(holding.symbol)
+    price_data = price_feed.get_price(holding.symbol)
     current_price = price_data.get('price', 0) if price_data else 0
     current_value = holding.amount * current_price
     
@@ -198,15 +286,17 @@ async def update_holding(
 async def delete_holding(
     holding_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Remove a holding from portfolio.
     """
-    holding = db.query(PortfolioHolding).filter(
-        PortfolioHolding.id == holding_id,
-        PortfolioHolding.user_id == current_user.id
-    ).first()
+    holding = await db.scalar(
+        select(PortfolioHolding).where(
+            PortfolioHolding.id == holding_id,
+            PortfolioHolding.user_id == current_user.id
+        )
+    )
     
     if not holding:
         raise HTTPException(
@@ -214,5 +304,56 @@ async def delete_holding(
             detail="Holding not found"
         )
     
-    db.delete(holding)
-    db.commit()
+    symbol = holding.symbol
+    await db.delete(holding)
+    await db.commit()
+    portfolio_valuation.remove_holding(current_user.id, symbol)
+
+
+# =============================================================================
+# WebSocket Endpoint
+# =============================================================================
+
+@router.websocket("/ws")
+async def portfolio_websocket(websocket: WebSocket, token: str = Query(...)):
+    """
+    WebSocket endpoint for live portfolio valuation.
+    
+    Authenticates with the JWT passed as the ``token`` query parameter, sends
+    a snapshot on connect and then throttled deltas as held prices move.
+    """
+    # Authenticate and load the portfolio without holding a DB session open
+    # for the lifetime of the socket
+    async with AsyncSessionLocal() as db:
+        user = await get_user_from_token(token, db)
+        if user is None or not user.is_active:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+        user_id = user.id
+        summary = await portfolio_valuation.get_summary(db, user_id)
+    
+    await websocket.accept()
+    await portfolio_ws_manager.connect(websocket, user_id, summary)
+    
+    try:
+        # Keep connection alive and listen for client messages
+        while True:
+            try:
+                data = await asyncio.wait_for(
+                    websocket.receive_text(),
+                    timeout=30.0
+                )
+                
+                if data == "ping":
+                    await websocket.send_text("pong")
+                    
+            except asyncio.TimeoutError:
+                try:
+                    await websocket.send_text("ping")
+                except Exception:
+                    break
+                    
+    except WebSocketDisconnect:
+        pass
+    finally:
+        portfolio_ws_manager.disconnect(websocket, user_id)
@@ -3,16 +3,29 @@ Price data API routes including WebSocket for real-time updates.
 """
 import asyncio
 import json
+import time
 from datetime import datetime, timedelta
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
-from app.models.price import PriceHistory
-from app.schemas.price import PriceData, PriceHistoryResponse, MarketOverview, AIAnalysisRequest, AIAnalysisResponse
-from app.services.bybit import bybit_client
-from app.services.ai_analysis import ai_service
+from app.core.database import get_async_db
+from app.core.metrics import WS_BROADCAST_SECONDS, WS_CLIENTS
+from app.core.tracing import tracer
+from app.models.price import PriceCandle, PriceHistory
+from app.schemas.price import (
+    PriceData, PriceHistoryResponse, MarketOverview, AIAnalysisRequest, AIAnalysisResponse, IndicatorsResponse,
+    OrderBookResponse, TradeFlowResponse
+)
+from app.services.price_feed import price_feed
+from app.services.ai_cache import analysis_cache
+from app.services.ai_digest import ai_digest
+from app.services.indicators import indicator_engine
+from app.services.kline_backfill import HISTORY_INTERVALS, kline_backfill
+from app.services.orderbook import order_books
+from app.services.trade_flow import trade_flow, TRADE_RESOLUTIONS
+from app.services.tick_archive import tick_archive, from_epoch_ms, ARCHIVE_RESOLUTIONS
 from app.config import settings
 
 router = APIRouter(prefix="/prices", tags=["Prices"])
@@ -31,11 +44,13 @@ class PriceWebSocketManager:
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
         self.active_connections.append(websocket)
+        WS_CLIENTS.labels("prices").set(len(self.active_connections))
         print(f"✓ Price WebSocket client connected. Total: {len(self.active_connections)}")
     
     def disconnect(self, websocket: WebSocket):
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
+        WS_CLIENTS.labels("prices").set(len(self.active_connections))
         print(f"✗ Price WebSocket client disconnected. Total: {len(self.active_connections)}")
     
     async def broadcast(self, data: dict):
@@ -43,14 +58,17 @@ class PriceWebSocketManager:
         if not self.active_connections:
             return
         
+        started = time.perf_counter()
         message = json.dumps(data, default=str)
         disconnected = []
         
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message)
-            except Exception:
-                disconnected.append(connection)
+        with tracer.span("ws.broadcast", channel="prices", clients=len(self.active_connections)):
+            for connection in self.active_connections:
+                try:
+                    await connection.send_text(message)
+                except Exception:
+                    disconnected.append(connection)
+        WS_BROADCAST_SECONDS.labels("prices").observe(time.perf_counter() - started)
         
         # Clean up disconnected clients
         for conn in disconnected:
@@ -70,7 +88,7 @@ async def get_current_prices():
     """
     Get current prices for all tracked symbols.
     """
-    prices = bybit_client.get_current_prices()
+    prices = price_feed.get_current_prices()
     
     price_list = []
     for symbol in settings.supported_symbols:
@@ -83,7 +101,8 @@ async def get_current_prices():
                 low_24h=p.get('low_24h'),
                 volume_24h=p.get('volume_24h'),
                 change_24h_percent=p.get('change_24h_percent'),
-                timestamp=p.get('timestamp', datetime.utcnow())
+                timestamp=p.get('timestamp', datetime.utcnow()),
+                stale=price_feed.is_stale(symbol)
             ))
     
     return MarketOverview(
@@ -105,7 +124,7 @@ async def get_current_price(symbol: str):
             detail=f"Symbol not supported. Available: {', '.join(settings.supported_symbols)}"
         )
     
-    price_data = bybit_client.get_price(symbol)
+    price_data = price_feed.get_price(symbol)
     
     if not price_data:
         raise HTTPException(
@@ -120,7 +139,8 @@ async def get_current_price(symbol: str):
         low_24h=price_data.get('low_24h'),
         volume_24h=price_data.get('volume_24h'),
         change_24h_percent=price_data.get('change_24h_percent'),
-        timestamp=price_data.get('timestamp', datetime.utcnow())
+        timestamp=price_data.get('timestamp', datetime.utcnow()),
+        stale=price_feed.is_stale(symbol)
     )
 
 
@@ -128,12 +148,24 @@ async def get_current_price(symbol: str):
 async def get_price_history(
     symbol: str,
     period: str = Query("24h", regex="^(1h|24h|7d|30d)$"),
-    db: Session = Depends(get_db)
+    resolution: Optional[str] = Query(None, regex="^(tick|1s|5s|15s|30s)$"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get historical price data for charting.
     
     Periods: 1h, 24h, 7d, 30d
+    
+    Without a ``resolution``, points are the closes of ``price_candles``
+    backfilled from Bybit's kline history, at the interval
+    ``HISTORY_INTERVALS`` maps the period to (1m for 1h, 15m for 24h, 1h for
+    7d, 4h for 30d); ``resolution`` in the response is that interval. Until
+    the backfill has stored candles for the symbol, the periodic
+    ``price_history`` snapshots are served instead.
+    
+    Passing a sub-minute ``resolution`` (tick, 1s, 5s, 15s, 30s) serves the
+    data from the tick archive instead. Only available for the 1h and 24h
+    periods.
     """
     symbol = symbol.upper()
     
@@ -153,38 +185,62 @@ async def get_price_history(
     }
     start_time = now - period_map[period]
     
-    # Query history
-    history = db.query(PriceHistory).filter(
-        PriceHistory.symbol == symbol,
-        PriceHistory.timestamp >= start_time
-    ).order_by(PriceHistory.timestamp.asc()).all()
-    
-    # If no history, generate mock data points from current price
-    if not history:
-        current = bybit_client.get_price(symbol)
-        if current:
-            # Generate simple mock history for demo
-            data_points = []
-            base_price = current['price']
-            num_points = {"1h": 60, "24h": 96, "7d": 168, "30d": 180}[period]
-            interval = period_map[period] / num_points
-            
-            import random
-            for i in range(num_points):
-                # Add some random variation
-                variation = random.uniform(-0.02, 0.02) * base_price
-                mock_price = base_price + variation
-                mock_time = start_time + (interval * i)
-                data_points.append({
-                    "price": round(mock_price, 2),
-                    "timestamp": mock_time
-                })
-            
-            return PriceHistoryResponse(
-                symbol=symbol,
-                data=data_points,
-                period=period
+    # Sub-minute resolutions come from the memory-mapped tick archive
+    if resolution is not None:
+        if period not in ("1h", "24h"):
+            raise HTTPException(
+                status_code=400,
+                detail="Sub-minute resolutions are only available for 1h and 24h periods"
             )
+        
+        # Archive reads, downsampling and row building run in a worker
+        # thread so they don't block the event loop
+        def read_archive():
+            records = tick_archive.read_range(symbol, start_time, now)
+            records = tick_archive.downsample(records, ARCHIVE_RESOLUTIONS[resolution])
+            return [
+                {"price": price, "timestamp": from_epoch_ms(ts)}
+                for ts, price in zip(records["ts"].tolist(), records["price"].tolist())
+            ]
+        
+        return PriceHistoryResponse(
+            symbol=symbol,
+            data=await asyncio.to_thread(read_archive),
+            period=period,
+            resolution=resolution
+        )
+    
+    # Candles backfilled from the exchange's kline history
+    interval = HISTORY_INTERVALS[period]
+    result = await db.execute(
+        select(PriceCandle.start, PriceCandle.close).where(
+            PriceCandle.symbol == symbol,
+            PriceCandle.interval == interval,
+            PriceCandle.start >= start_time
+        ).order_by(PriceCandle.start.asc())
+    )
+    candles = result.all()
+    
+    if candles:
+        return PriceHistoryResponse(
+            symbol=symbol,
+            data=[{"price": close, "timestamp": start} for start, close in candles],
+            period=period,
+            resolution=interval
+        )
+    
+    # Fall back to the periodic price snapshots until the backfill has run,
+    # and fill a symbol that has no candles yet (e.g. newly added)
+    if settings.kline_backfill_enabled:
+        kline_backfill.request([symbol])
+    
+    result = await db.execute(
+        select(PriceHistory).where(
+            PriceHistory.symbol == symbol,
+            PriceHistory.timestamp >= start_time
+        ).order_by(PriceHistory.timestamp.asc())
+    )
+    history = result.scalars().all()
     
     return PriceHistoryResponse(
         symbol=symbol,
@@ -193,6 +249,122 @@ async def get_price_history(
     )
 
 
+@router.get("/indicators/{symbol}", response_model=IndicatorsResponse)
+async def get_indicators(
+    symbol: str,
+    timeframe: Optional[str] = Query(None, description="Limit to one timeframe, e.g. 1h")
+):
+    """
+    Get streaming technical indicators for a symbol.
+    
+    Returns the forming candle and live SMA, EMA, RSI and Bollinger Bands
+    per timeframe, plus the VWAP of the current UTC day.
+    """
+    symbol = symbol.upper()
+    
+    if symbol not in settings.supported_symbols:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Symbol not supported. Available: {', '.join(settings.supported_symbols)}"
+        )
+    
+    if timeframe is not None and timeframe not in settings.indicator_timeframes:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Timeframe not tracked. Available: {', '.join(settings.indicator_timeframes)}"
+        )
+    
+    snapshot = indicator_engine.snapshot(symbol, [timeframe] if timeframe else None)
+    
+    if not snapshot:
+        raise HTTPException(
+            status_code=503,
+            detail="Indicator data not available yet. Please try again."
+        )
+    
+    return snapshot
+
+
+@router.get("/orderbook/{symbol}", response_model=OrderBookResponse)
+async def get_order_book(
+    symbol: str,
+    levels: int = Query(10, ge=0, le=200, description="Price levels per side to include"),
+    depth_percent: Optional[float] = Query(None, gt=0, le=50, description="Band around mid for depth, in percent")
+):
+    """
+    Get the live order book for a symbol.
+    
+    Returns best bid/ask, spread, mid and the bid/ask depth within
+    ``depth_percent`` of mid, plus the top ``levels`` price levels.
+    """
+    symbol = symbol.upper()
+    
+    if symbol not in settings.supported_symbols:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Symbol not supported. Available: {', '.join(settings.supported_symbols)}"
+        )
+    
+    book = order_books.get(symbol)
+    
+    if book is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Order book not available. Please try again."
+        )
+    
+    return book.summary(depth_percent, levels)
+
+
+@router.get("/trades/{symbol}", response_model=TradeFlowResponse)
+async def get_trade_flow(
+    symbol: str,
+    seconds: int = Query(60, ge=1, le=settings.trade_bucket_seconds, description="Lookback in seconds"),
+    resolution: int = Query(1, description="Bucket size in seconds: 1, 5, 15 or 60")
+):
+    """
+    Get traded volume from the public trade stream.
+    
+    Returns totals over the last ``seconds`` seconds (volume, taker buy/sell
+    split, quote volume, trade count and VWAP) and the same figures per
+    ``resolution``-second bucket.
+    """
+    symbol = symbol.upper()
+    
+    if symbol not in settings.supported_symbols:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Symbol not supported. Available: {', '.join(settings.supported_symbols)}"
+        )
+    
+    if resolution not in TRADE_RESOLUTIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported resolution. Available: {', '.join(map(str, TRADE_RESOLUTIONS))}"
+        )
+    
+    now = time.time()
+    total = trade_flow.summary(symbol, seconds, now)
+    buckets = trade_flow.buckets(symbol, seconds, resolution, now)
+    
+    if total is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Trade data not available. Please try again."
+        )
+    
+    def bucket(b: dict) -> dict:
+        return {**b, "start": from_epoch_ms(b["start"] * 1000)}
+    
+    return TradeFlowResponse(
+        symbol=symbol,
+        seconds=seconds,
+        resolution=resolution,
+        total=bucket(total),
+        buckets=[bucket(b) for b in buckets]
+    )
+
+
 @router.get("/symbols")
 async def get_supported_symbols():
     """
@@ -222,16 +394,18 @@ async def analyze_market(request: AIAnalysisRequest):
         )
     
     # Get current prices
-    prices = bybit_client.get_current_prices()
+    prices = price_feed.get_current_prices()
     
-    # Generate analysis
-    result = await ai_service.analyze_market(prices, request.symbols)
+    # Serve from the analysis cache (kept warm for the common symbol sets by
+    # scheduled digests); identical concurrent requests share one upstream call
+    result, cached = await analysis_cache.get(prices, request.symbols)
     
     return AIAnalysisResponse(
         analysis=result['analysis'],
         symbols_analyzed=result['symbols_analyzed'],
         sentiment=result['sentiment'],
-        timestamp=result['timestamp']
+        timestamp=result['timestamp'],
+        cached=cached
     )
 
 
@@ -244,13 +418,13 @@ async def price_websocket(websocket: WebSocket):
     """
     WebSocket endpoint for real-time price streaming.
     
-    Sends price updates as they come in from Bybit.
+    Sends price updates as they come in from the price feed.
     """
     await ws_manager.connect(websocket)
     
     try:
         # Send current prices immediately on connect
-        current_prices = bybit_client.get_current_prices()
+        current_prices = price_feed.get_current_prices()
         if current_prices:
             # Convert any datetime objects to ISO format strings
             serializable_prices = {}
@@ -259,6 +433,7 @@ async def price_websocket(websocket: WebSocket):
                     k: v.isoformat() if isinstance(v, datetime) else v
                     for k, v in data.items()
                 }
+                serializable_data["stale"] = price_feed.is_stale(symbol)
                 serializable_prices[symbol] = serializable_data
             
             await websocket.send_json({
@@ -267,6 +442,28 @@ async def price_websocket(websocket: WebSocket):
                 "timestamp": datetime.utcnow().isoformat()
             })
         
+        # Send current indicators so clients need not wait for a candle close
+        for symbol in settings.supported_symbols:
+            snapshot = indicator_engine.snapshot(symbol)
+            if snapshot:
+                await websocket.send_text(json.dumps(
+                    {"type": "indicators", "data": snapshot, "timestamp": datetime.utcnow()},
+                    default=str
+                ))
+        
+        # Send current order book summaries
+        for symbol in settings.supported_symbols:
+            book = order_books.get(symbol)
+            if book is not None:
+                await websocket.send_text(json.dumps(
+                    {"type": "orderbook", "data": book.summary(), "timestamp": datetime.utcnow()},
+                    default=str
+                ))
+        
+        # Send the latest AI digests so clients need not request an analysis
+        for digest in ai_digest.latest():
+            await websocket.send_text(json.dumps(digest, default=str))
+        
         # Keep connection alive and listen for client messages
         while True:
             try:
@@ -294,12 +491,12 @@ async def price_websocket(websocket: WebSocket):
 
 
 # =============================================================================
-# Callback for Bybit price updates
+# Callback for price feed updates
 # =============================================================================
 
 async def on_price_update(price_data: dict):
     """
-    Callback function called when Bybit sends a price update.
+    Callback function called when the price feed publishes a price update.
     Broadcasts to all connected WebSocket clients.
     """
     # Serialize any datetime objects
@@ -315,5 +512,31 @@ async def on_price_update(price_data: dict):
     })
 
 
-# Register callback with Bybit client
-bybit_client.add_callback(on_price_update)
+async def on_candle_close(symbol: str, snapshot: dict):
+    """Push indicators for the timeframes whose candle just closed."""
+    await ws_manager.broadcast({
+        "type": "indicators",
+        "data": snapshot,
+        "timestamp": datetime.utcnow().isoformat()
+    })
+
+
+async def on_order_book(summary: dict):
+    """Push an order book summary (throttled by the order book manager)."""
+    await ws_manager.broadcast({
+        "type": "orderbook",
+        "data": summary,
+        "timestamp": datetime.utcnow().isoformat()
+    })
+
+
+async def on_ai_digest(message: dict):
+    """Push a newly generated AI digest to all connected clients."""
+    await ws_manager.broadcast(message)
+
+
+# Register callback with the price feed
+price_feed.add_callback(on_price_update)
+indicator_engine.add_listener(on_candle_close)
+order_books.add_listener(on_order_book)
+ai_digest.add_listener(on_ai_digest)
@@ -22,13 +22,130 @@ class Settings(BaseSettings):
     secret_key: str = "your-super-secret-key-change-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 60 * 24 * 7  # 7 days
+    user_cache_ttl_seconds: float = 60.0  # 0 disables the authenticated-user cache
+    auth_token_user_claims: bool = True  # signed profile claim, trusted for user_cache_ttl_seconds after issue
+    
+    # Password hashing pool and login throttling
+    password_hash_workers: int = 2  # concurrent bcrypt operations
+    password_hash_max_pending: int = 64  # running + queued before returning 503
+    login_rate_limit_attempts: int = 10  # login/register attempts per IP per window
+    login_rate_limit_window_seconds: float = 60.0
     
     # External APIs
     google_api_key: str = ""
     telegram_bot_token: str = ""
     
-    # Bybit WebSocket
+    # AI model calls: dedicated pool, per-call deadline and circuit breaker
+    ai_backend: str = "gemini"  # "gemini", or "mock" for a local model with injected latency
+    ai_max_concurrency: int = 4  # concurrent model calls
+    ai_call_timeout_seconds: float = 20.0
+    ai_circuit_failure_threshold: int = 3  # consecutive failures before falling back
+    ai_circuit_reset_seconds: float = 30.0  # wait before a trial call
+    ai_mock_latency_seconds: float = 0.0
+    ai_mock_failure_rate: float = 0.0  # fraction of mock calls that raise
+    
+    # AI analysis cache (stale-while-revalidate)
+    ai_cache_ttl_seconds: float = 60.0  # fresh while prices stay in their buckets
+    ai_cache_max_stale_seconds: float = 600.0  # served stale while refreshing
+    ai_cache_fallback_ttl_seconds: float = 5.0  # local analysis served when the model failed
+    ai_cache_bucket_percent: float = 0.5  # price/change quantization
+    
+    # Scheduled AI digests pushed over the price WebSocket
+    ai_digest_enabled: bool = True
+    ai_digest_interval_seconds: float = 300.0
+    ai_digest_move_percent: float = 2.0  # regenerate early on a move this large
+    ai_digest_max_concurrency: int = 2  # concurrent model calls for digests
+    ai_digest_symbol_sets: list = [
+        ["BTCUSDT", "ETHUSDT", "SOLUSDT", "XRPUSDT", "DOGEUSDT"],
+        ["BTCUSDT", "ETHUSDT"]
+    ]
+    
+    # Exchange WebSockets
     bybit_ws_url: str = "wss://stream.bybit.com/v5/public/spot"
+    binance_ws_url: str = "wss://stream.binance.com:9443/stream"
+    bybit_rest_url: str = "https://api.bybit.com"
+    binance_rest_url: str = "https://api.binance.com"
+    
+    # Consolidated price feed: venues to stream from and how to merge them
+    # ("latest": last write wins by exchange timestamp, "median": median of
+    # venues that ticked within price_feed_venue_max_age_seconds)
+    price_feed_exchanges: list = ["bybit"]
+    price_feed_mode: str = "latest"
+    price_feed_venue_max_age_seconds: float = 10.0
+    
+    # Stale-feed fallback: a symbol whose streams have been silent this long
+    # is stale, and is polled from the venues' batch REST tickers until a
+    # streamed tick arrives again
+    price_feed_stale_seconds: float = 15.0
+    price_feed_rest_fallback: bool = True
+    price_feed_rest_poll_seconds: float = 2.0
+    price_feed_rest_timeout_seconds: float = 5.0
+    
+    # Order books from orderbook.{depth}.{symbol} streams
+    orderbook_enabled: bool = True
+    orderbook_depth: int = 50  # Bybit spot depths: 1, 50, 200
+    orderbook_depth_percent: float = 1.0  # band around mid for streamed depth figures
+    orderbook_push_interval_seconds: float = 0.5  # minimum seconds between pushes per book
+    
+    # Per-second trade volume from publicTrade.{symbol} streams
+    trades_enabled: bool = True
+    trade_bucket_seconds: int = 3600  # one-second buckets kept per symbol (fixed memory)
+    
+    # Tick fan-out: per-subscriber queue bound and default overflow policy
+    # ("latest_per_symbol" or "drop_oldest")
+    tick_dispatch_policy: str = "latest_per_symbol"
+    tick_dispatch_queue_size: int = 1000
+    
+    # Alert engine: in-memory evaluation, reloaded to pick up other workers' edits
+    alert_engine_reload_seconds: float = 60.0
+    alert_rearm_hysteresis_percent: float = 0.5  # re-arm once back past the target by this much
+    alert_rearm_cooldown_seconds: int = 300  # minimum time between fires of a re-arming alert
+    
+    # Tick archive (columnar, one file per symbol per day)
+    tick_archive_enabled: bool = True
+    tick_archive_dir: str = "data/ticks"
+    tick_archive_flush_interval: float = 1.0  # seconds between buffered writes
+    
+    # Historical candles backfilled from Bybit's kline REST API; each series
+    # resumes from its last stored candle at startup and every
+    # kline_backfill_interval_seconds, and is pruned to its window
+    kline_backfill_enabled: bool = True
+    kline_backfill_days: dict = {"1m": 1, "15m": 2, "1h": 8, "4h": 31}  # interval -> days kept
+    kline_backfill_concurrency: int = 4  # requests in flight
+    kline_backfill_rate_per_second: float = 10.0  # request starts per second
+    kline_backfill_interval_seconds: float = 300.0
+    kline_backfill_timeout_seconds: float = 10.0
+    
+    # Warm start: last-known prices and candles snapshotted to a local file
+    # and reloaded on startup, served as stale until fresh ticks arrive
+    warm_start_enabled: bool = True
+    warm_start_path: str = "data/warm_start.json"
+    warm_start_interval_seconds: float = 30.0
+    warm_start_max_age_seconds: float = 3600.0  # older snapshots are ignored
+    
+    # Streaming candles and technical indicators
+    indicator_timeframes: list = ["1m", "5m", "15m", "1h"]
+    candle_history_size: int = 500  # closed candles kept per symbol and timeframe
+    indicator_sma_period: int = 20
+    indicator_ema_period: int = 20
+    indicator_rsi_period: int = 14
+    indicator_bollinger_period: int = 20
+    indicator_bollinger_stddev: float = 2.0
+    indicator_context_timeframes: list = ["15m", "1h"]  # included in AI prompts
+    
+    # Portfolio WebSocket: minimum seconds between pushes per user
+    portfolio_ws_throttle_seconds: float = 1.0
+    
+    # In-memory portfolio valuations: reloaded from the database after the
+    # TTL (picks up changes made elsewhere), least recently used evicted
+    # beyond the user limit
+    portfolio_valuation_ttl_seconds: float = 300.0
+    portfolio_valuation_max_users: int = 10_000
+    
+    # Tick pipeline tracing: "none", "file" (JSON lines) or "otel"
+    tracing_backend: str = "none"
+    tracing_file: str = "data/traces.jsonl"
+    tracing_sample_rate: float = 1.0  # fraction of ticks traced
     
     # Supported trading pairs
     supported_symbols: list = ["BTCUSDT", "ETHUSDT", "SOLUSDT", "XRPUSDT", "DOGEUSDT"]
@@ -1,3 +1,10 @@
 """Core modules for database and security."""
-from app.core.database import get_db, init_db, Base
-from app.core.security import get_current_user, create_access_token, get_password_hash, verify_password
+from app.core.database import get_db, get_async_db, init_db, Base
+from app.core.security import (
+    get_current_user,
+    create_access_token,
+    create_user_token,
+    invalidate_user,
+    get_password_hash,
+    verify_password
+)
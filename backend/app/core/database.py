@@ -1,12 +1,31 @@
 """
 Database connection and session management.
+
+Route handlers and the in-process tick consumers use the async engine so
+queries never block the event loop. The sync engine remains for table
+creation, Celery workers and command-line tools.
 """
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from app.config import settings
 
+
+def get_async_database_url(url: str) -> str:
+    """Map a sync database URL to its async driver equivalent."""
+    for sync_prefix, async_prefix in (
+        ("postgresql+psycopg2://", "postgresql+asyncpg://"),
+        ("postgresql://", "postgresql+asyncpg://"),
+        ("postgres://", "postgresql+asyncpg://"),
+        ("sqlite://", "sqlite+aiosqlite://"),
+    ):
+        if url.startswith(sync_prefix):
+            return async_prefix + url[len(sync_prefix):]
+    return url
+
+
 # Create engine
 engine = create_engine(
     settings.database_url,
@@ -15,8 +34,22 @@ engine = create_engine(
     max_overflow=20
 )
 
-# Session factory
+# Async engine for the event loop (aiosqlite, used for local runs, does
+# not take pool sizing options)
+async_engine = create_async_engine(
+    get_async_database_url(settings.database_url),
+    pool_pre_ping=True,
+    **({} if settings.database_url.startswith("sqlite") else {"pool_size": 10, "max_overflow": 20})
+)
+
+# Session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
 
 # Base class for models
 Base = declarative_base()
@@ -31,6 +64,12 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """Dependency for getting async database sessions."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def init_db():
     """Initialize database tables."""
     Base.metadata.create_all(bind=engine)
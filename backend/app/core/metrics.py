@@ -0,0 +1,213 @@
+"""
+Prometheus metrics for the tick-to-alert pipeline.
+
+Exposed at ``GET /metrics``. Metrics are per process; scrape each worker.
+"""
+import time
+from contextvars import ContextVar
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.routing import Match
+
+# Sub-millisecond to multi-second buckets for in-process work
+FAST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# Network-bound work (exchange lag, notifications)
+SLOW_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+# Exchange feeds
+BYBIT_MESSAGES = Counter(
+    "cryptoflyt_bybit_messages_total",
+    "Ticker messages received from Bybit",
+    ["symbol"]
+)
+BYBIT_TICK_LAG = Histogram(
+    "cryptoflyt_bybit_tick_lag_seconds",
+    "Delay between the exchange timestamp of a tick and its receipt",
+    ["symbol"],
+    buckets=SLOW_BUCKETS
+)
+PRICE_CALLBACK_SECONDS = Histogram(
+    "cryptoflyt_price_callback_seconds",
+    "Duration of each price callback per tick",
+    ["callback"],
+    buckets=FAST_BUCKETS
+)
+TICK_QUEUE_SECONDS = Histogram(
+    "cryptoflyt_tick_queue_seconds",
+    "Time a tick waits in a subscriber's queue before delivery",
+    ["callback"],
+    buckets=FAST_BUCKETS
+)
+TICKS_DROPPED = Counter(
+    "cryptoflyt_ticks_dropped_total",
+    "Ticks dropped or coalesced by a full subscriber queue",
+    ["callback"]
+)
+PRICE_FEED_TICKS = Counter(
+    "cryptoflyt_price_feed_ticks_total",
+    "Venue ticks merged into the consolidated price feed, by outcome",
+    ["exchange", "outcome"]
+)
+PRICE_FEED_STALE_SYMBOLS = Gauge(
+    "cryptoflyt_price_feed_stale_symbols",
+    "Symbols whose streams are stale and served by REST polling"
+)
+PRICE_FEED_REST_POLLS = Counter(
+    "cryptoflyt_price_feed_rest_polls_total",
+    "Batch REST ticker requests made while streams are stale, by outcome",
+    ["exchange", "outcome"]
+)
+KLINE_BACKFILL_REQUESTS = Counter(
+    "cryptoflyt_kline_backfill_requests_total",
+    "Kline REST requests made by the candle backfill, by outcome",
+    ["outcome"]
+)
+KLINE_BACKFILL_CANDLES = Counter(
+    "cryptoflyt_kline_backfill_candles_total",
+    "Candles written by the candle backfill",
+    ["interval"]
+)
+FIRST_PRICE_SECONDS = Gauge(
+    "cryptoflyt_first_price_seconds",
+    "Seconds from startup until current prices could be served, by source (snapshot or stream)",
+    ["source"]
+)
+TRADES_RECEIVED = Counter(
+    "cryptoflyt_trades_received_total",
+    "Public trades received from Bybit",
+    ["symbol"]
+)
+
+# Order books
+ORDERBOOK_UPDATE_SECONDS = Histogram(
+    "cryptoflyt_orderbook_update_seconds",
+    "Time to apply one order book snapshot or delta",
+    buckets=(0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.005)
+)
+ORDERBOOK_RESYNCS = Counter(
+    "cryptoflyt_orderbook_resyncs_total",
+    "Order books resubscribed after a sequence gap",
+    ["symbol"]
+)
+
+# WebSocket fan-out
+WS_CLIENTS = Gauge(
+    "cryptoflyt_ws_clients",
+    "Connected WebSocket clients",
+    ["channel"]
+)
+WS_BROADCAST_SECONDS = Histogram(
+    "cryptoflyt_ws_broadcast_seconds",
+    "Time to send one update to every connected client",
+    ["channel"],
+    buckets=FAST_BUCKETS
+)
+
+# Alerts
+ALERT_EVALUATION_SECONDS = Histogram(
+    "cryptoflyt_alert_evaluation_seconds",
+    "Time to load and evaluate a symbol's alerts for one tick",
+    ["symbol"],
+    buckets=FAST_BUCKETS
+)
+ALERTS_TRIGGERED = Counter(
+    "cryptoflyt_alerts_triggered_total",
+    "Alerts triggered",
+    ["symbol"]
+)
+ALERT_NOTIFICATION_SECONDS = Histogram(
+    "cryptoflyt_alert_notification_seconds",
+    "Delay between an alert triggering and its notification being sent",
+    ["channel", "outcome"],
+    buckets=SLOW_BUCKETS
+)
+
+# AI model calls
+AI_CALL_SECONDS = Histogram(
+    "cryptoflyt_ai_call_seconds",
+    "Duration of AI model calls including the wait for a worker",
+    ["operation", "outcome"],
+    buckets=SLOW_BUCKETS
+)
+AI_CIRCUIT_OPEN = Gauge(
+    "cryptoflyt_ai_circuit_open",
+    "Whether the AI circuit breaker is open (calls fall back to local analysis)"
+)
+
+# HTTP and database
+HTTP_REQUEST_SECONDS = Histogram(
+    "cryptoflyt_http_request_seconds",
+    "HTTP request duration",
+    ["method", "route", "status"],
+    buckets=FAST_BUCKETS
+)
+DB_QUERY_SECONDS = Histogram(
+    "cryptoflyt_db_query_seconds",
+    "Database query duration by originating route",
+    ["route"],
+    buckets=FAST_BUCKETS
+)
+
+
+# Route template of the request being served; tick consumers and other
+# background work run outside any request
+current_route: ContextVar[str] = ContextVar("current_route", default="background")
+
+
+def resolve_route(app, scope) -> str:
+    """Route template (e.g. ``/api/alerts/{alert_id}``) for a request scope."""
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", scope["path"])
+    return "unmatched"
+
+
+async def metrics_middleware(request, call_next):
+    """Time requests and tag database queries with the route they serve."""
+    route = resolve_route(request.app, request.scope)
+    token = current_route.set(route)
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        HTTP_REQUEST_SECONDS.labels(request.method, route, str(status_code)).observe(
+            time.perf_counter() - started
+        )
+        current_route.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    DB_QUERY_SECONDS.labels(current_route.get()).observe(time.perf_counter() - started)
+
+
+def _handle_error(context):
+    # Failed queries never reach after_cursor_execute
+    if context.connection is not None and getattr(context, "cursor", None) is not None:
+        started = context.connection.info.get("query_started")
+        if started:
+            started.pop()
+
+
+def instrument_engine(engine: Engine):
+    """Record query timings for a (sync) engine or an async engine's ``sync_engine``."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def render_metrics() -> tuple:
+    """Current metrics in the Prometheus text format, with its content type."""
+    return generate_latest(), CONTENT_TYPE_LATEST
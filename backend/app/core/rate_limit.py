@@ -0,0 +1,82 @@
+"""
+In-memory request rate limiting.
+"""
+import math
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from fastapi import HTTPException, Request, status
+
+from app.config import settings
+
+
+class SlidingWindowLimiter:
+    """
+    Allows at most ``max_attempts`` per key within a sliding time window.
+
+    State is per process, so the effective limit scales with the number of
+    workers.
+    """
+
+    # Sweep idle keys once the table grows past this many entries
+    SWEEP_THRESHOLD = 10_000
+
+    def __init__(self, max_attempts: int, window_seconds: float):
+        self.max_attempts = max_attempts
+        self.window_seconds = window_seconds
+        self._attempts: Dict[str, Deque[float]] = {}
+
+    def hit(self, key: str) -> Optional[float]:
+        """
+        Record an attempt for a key.
+
+        Returns:
+            None if allowed, otherwise seconds until the next attempt is allowed
+        """
+        now = time.monotonic()
+        cutoff = now - self.window_seconds
+
+        attempts = self._attempts.get(key)
+        if attempts is None:
+            if len(self._attempts) >= self.SWEEP_THRESHOLD:
+                self._sweep(cutoff)
+            attempts = self._attempts[key] = deque()
+
+        while attempts and attempts[0] <= cutoff:
+            attempts.popleft()
+
+        if len(attempts) >= self.max_attempts:
+            return attempts[0] - cutoff
+
+        attempts.append(now)
+        return None
+
+    def _sweep(self, cutoff: float):
+        for key in [k for k, a in self._attempts.items() if not a or a[-1] <= cutoff]:
+            del self._attempts[key]
+
+    def reset(self, key: Optional[str] = None):
+        if key is None:
+            self._attempts.clear()
+        else:
+            self._attempts.pop(key, None)
+
+
+# Global instance
+login_limiter = SlidingWindowLimiter(
+    settings.login_rate_limit_attempts,
+    settings.login_rate_limit_window_seconds
+)
+
+
+async def throttle_login(request: Request):
+    """Dependency limiting login/register attempts per client IP."""
+    client_ip = request.client.host if request.client else "unknown"
+    retry_after = login_limiter.hit(client_ip)
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many attempts, please try again later",
+            headers={"Retry-After": str(math.ceil(retry_after))}
+        )
@@ -1,17 +1,20 @@
 """
 Security utilities for authentication and password hashing.
 """
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.models.user import User
 
 # Password hashing with explicit bcrypt configuration
@@ -35,6 +38,68 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+class PasswordHasher:
+    """
+    Runs bcrypt on a bounded thread pool so it never blocks the event loop.
+
+    bcrypt releases the GIL, so up to ``workers`` hashes run in parallel
+    while the loop keeps serving ticks and WebSockets. At most
+    ``max_pending`` operations may be running or queued; beyond that
+    callers get a 503 instead of growing the queue without limit.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="password-hash"
+            )
+        return self._executor
+
+    async def _run(self, func, *args):
+        if self._pending >= self.max_pending:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication is busy, please retry",
+                headers={"Retry-After": "1"}
+            )
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self._pending -= 1
+
+    @property
+    def pending(self) -> int:
+        """Operations currently running or queued."""
+        return self._pending
+
+    async def hash(self, password: str) -> str:
+        """Hash a password off the event loop."""
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password off the event loop."""
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+# Global instance
+password_hasher = PasswordHasher(settings.password_hash_workers, settings.password_hash_max_pending)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -44,7 +109,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
     
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": datetime.utcnow()})
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     
     return encoded_jwt
@@ -59,9 +124,163 @@ def decode_token(token: str) -> Optional[dict]:
         return None
 
 
+def create_user_token(user: User, expires_delta: Optional[timedelta] = None) -> str:
+    """
+    Create an access token for a user.
+
+    When ``auth_token_user_claims`` is enabled the token also carries the
+    user's profile in a signed ``usr`` claim, so authenticated requests
+    made within ``user_cache_ttl_seconds`` of issue can skip the users
+    lookup entirely. After that the claim is ignored and the user is read
+    from the database like any other token.
+    """
+    data = {"sub": str(user.id)}
+    if settings.auth_token_user_claims:
+        data["usr"] = {
+            "email": user.email,
+            "username": user.username,
+            "telegram_chat_id": user.telegram_chat_id,
+            "is_active": user.is_active,
+            "email_notifications": user.email_notifications,
+            "telegram_notifications": user.telegram_notifications,
+            "created_at": user.created_at.isoformat() if user.created_at else None
+        }
+    return create_access_token(data, expires_delta)
+
+
+def _user_from_claims(user_id: int, claims: dict) -> User:
+    """Build a read-only (transient) user from a token's ``usr`` claim."""
+    created_at = claims.get("created_at")
+    return User(
+        id=user_id,
+        email=claims["email"],
+        username=claims["username"],
+        telegram_chat_id=claims.get("telegram_chat_id"),
+        is_active=claims.get("is_active", True),
+        email_notifications=claims.get("email_notifications", True),
+        telegram_notifications=claims.get("telegram_notifications", False),
+        created_at=datetime.fromisoformat(created_at) if created_at else None
+    )
+
+
+class UserCache:
+    """
+    Short-TTL cache of authenticated users keyed by user id.
+
+    Cached users are detached from any session and must be treated as
+    read-only; routes that change a user reload it first and then call
+    ``invalidate``. Invalidation also records the time so profile claims
+    in tokens issued before the change are no longer trusted.
+
+    State is per process, so other workers (and this one after a restart)
+    may serve a changed or disabled profile for up to ``ttl_seconds``:
+    cache entries expire after it, and token profile claims are only
+    trusted within it of the token's issue time.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._users: Dict[int, Tuple[float, User]] = {}
+        self._invalidated_at: Dict[int, float] = {}
+
+    def get(self, user_id: int) -> Optional[User]:
+        entry = self._users.get(user_id)
+        if entry is None:
+            return None
+
+        expires_at, user = entry
+        if expires_at < time.monotonic():
+            self._users.pop(user_id, None)
+            return None
+        return user
+
+    def set(self, user: User):
+        if self.ttl_seconds > 0:
+            self._users[user.id] = (time.monotonic() + self.ttl_seconds, user)
+
+    def invalidate(self, user_id: int):
+        self._users.pop(user_id, None)
+
+        now = time.time()
+        self._invalidated_at[user_id] = now
+
+        # Tokens older than their lifetime are rejected anyway
+        horizon = now - settings.access_token_expire_minutes * 60
+        for stale_id in [uid for uid, at in self._invalidated_at.items() if at < horizon]:
+            del self._invalidated_at[stale_id]
+
+    def claims_valid(self, user_id: int, issued_at: Optional[int]) -> bool:
+        """
+        Whether a token's profile claim can stand in for the users lookup.
+
+        The claim must be younger than ``ttl_seconds`` (so a disabled or
+        changed account is seen within the same bound as the cache, even
+        across restarts and other processes) and must postdate this
+        process's last invalidation of the user.
+        """
+        if issued_at is None or time.time() - issued_at > self.ttl_seconds:
+            return False
+        invalidated_at = self._invalidated_at.get(user_id)
+        if invalidated_at is None:
+            return True
+        return issued_at is not None and issued_at > invalidated_at
+
+    def clear(self):
+        self._users.clear()
+        self._invalidated_at.clear()
+
+
+# Global instance
+user_cache = UserCache(settings.user_cache_ttl_seconds)
+
+
+def invalidate_user(user_id: int):
+    """Drop a user from the auth cache after a profile or status change."""
+    user_cache.invalidate(user_id)
+
+
+async def get_user_from_token(token: str, db: AsyncSession) -> Optional[User]:
+    """
+    Resolve the user a JWT token belongs to, or None if invalid.
+
+    Checks the user cache first, then the token's ``usr`` claim while it is
+    fresh (see ``UserCache.claims_valid``), and only then queries the
+    database.
+    """
+    payload = decode_token(token)
+    if payload is None:
+        return None
+    
+    user_id: str = payload.get("sub")
+    if user_id is None:
+        return None
+    user_id = int(user_id)
+    
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+    
+    claims = payload.get("usr")
+    if (
+        settings.auth_token_user_claims
+        and claims
+        and user_cache.claims_valid(user_id, payload.get("iat"))
+    ):
+        user = _user_from_claims(user_id, claims)
+    else:
+        user = await db.get(User, user_id)
+        if user is None:
+            return None
+        # Detach so the cached instance is never tied to this request's session
+        db.expunge(user)
+    
+    user_cache.set(user)
+    return user
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """Get the current authenticated user from JWT token."""
     credentials_exception = HTTPException(
@@ -70,18 +289,14 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    token = credentials.credentials
-    payload = decode_token(token)
-    
-    if payload is None:
-        raise credentials_exception
-    
-    user_id: str = payload.get("sub")
-    if user_id is None:
-        raise credentials_exception
-    
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user = await get_user_from_token(credentials.credentials, db)
     if user is None:
         raise credentials_exception
     
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Account is disabled"
+        )
+    
     return user
@@ -0,0 +1,194 @@
+"""
+Pluggable tracing for the tick pipeline.
+
+Each delivery of a Bybit tick to a subscriber opens a root ``tick.deliver``
+span that starts at the exchange timestamp (so it includes network and
+queueing delay); alert checks, WebSocket fan-out and notifications open
+child spans under it. The tick's ``seq`` attribute links the deliveries of
+one tick. Backends, selected by ``tracing_backend``:
+
+- ``none``: spans are not recorded (default)
+- ``file``: one JSON line per span in ``tracing_file``
+- ``otel``: OpenTelemetry; uses an already configured tracer provider, or
+  exports to ``tracing_file`` when only the SDK is installed
+"""
+import json
+import os
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+
+from app.config import settings
+
+# Optional OpenTelemetry import
+try:
+    from opentelemetry import trace as otel_trace
+    OTEL_AVAILABLE = True
+except ImportError:
+    OTEL_AVAILABLE = False
+
+try:
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    from opentelemetry.sdk.trace.sampling import TraceIdRatioBased
+    OTEL_SDK_AVAILABLE = True
+except ImportError:
+    OTEL_SDK_AVAILABLE = False
+
+
+def to_epoch_ns(value: datetime) -> int:
+    """Naive datetimes are taken as UTC, like the rest of the app."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1_000_000_000)
+
+
+class _SpanContext:
+    """Identity of the span a piece of work is running under."""
+
+    __slots__ = ("trace_id", "span_id", "sampled")
+
+    def __init__(self, trace_id: str, span_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.sampled = sampled
+
+
+_current_span: ContextVar[Optional[_SpanContext]] = ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """No-op tracer; base class for the recording backends."""
+
+    @contextmanager
+    def span(self, name: str, start_time: Optional[datetime] = None, **attributes) -> Iterator[None]:
+        """
+        Trace a block of work as a span under the current span.
+
+        Args:
+            name: Span name (e.g. "alert.check")
+            start_time: Backdate the span start (e.g. to the exchange timestamp)
+            **attributes: Span attributes; None values are dropped
+        """
+        yield
+
+    def shutdown(self):
+        pass
+
+
+class FileTracer(Tracer):
+    """Writes finished spans as JSON lines."""
+
+    def __init__(self, path: str, sample_rate: float = 1.0):
+        self.path = path
+        self.sample_rate = sample_rate
+        self._file = None
+
+    def _write(self, record: dict):
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._file = open(self.path, "a", buffering=64 * 1024)
+        self._file.write(json.dumps(record, default=str) + "\n")
+
+    @contextmanager
+    def span(self, name: str, start_time: Optional[datetime] = None, **attributes) -> Iterator[None]:
+        parent = _current_span.get()
+        if parent is None:
+            context = _SpanContext(uuid.uuid4().hex, uuid.uuid4().hex[:16], random.random() < self.sample_rate)
+        else:
+            context = _SpanContext(parent.trace_id, uuid.uuid4().hex[:16], parent.sampled)
+
+        if not context.sampled:
+            token = _current_span.set(context)
+            try:
+                yield
+            finally:
+                _current_span.reset(token)
+            return
+
+        start_ns = to_epoch_ns(start_time) if start_time else time.time_ns()
+        token = _current_span.set(context)
+        error = None
+        try:
+            yield
+        except Exception as e:
+            error = repr(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            end_ns = time.time_ns()
+            self._write({
+                "trace_id": context.trace_id,
+                "span_id": context.span_id,
+                "parent_id": parent.span_id if parent else None,
+                "name": name,
+                "start_ns": start_ns,
+                "end_ns": end_ns,
+                "duration_ms": round((end_ns - start_ns) / 1e6, 3),
+                "error": error,
+                "attributes": {k: v for k, v in attributes.items() if v is not None}
+            })
+
+    def shutdown(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class OpenTelemetryTracer(Tracer):
+    """Records spans through the OpenTelemetry API."""
+
+    def __init__(self, path: str, sample_rate: float = 1.0):
+        self._provider = None
+
+        # Use a provider configured by the deployment (e.g. OTLP exporter);
+        # otherwise set up a local file exporter
+        provider = otel_trace.get_tracer_provider()
+        if isinstance(provider, otel_trace.ProxyTracerProvider) and OTEL_SDK_AVAILABLE:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._provider = TracerProvider(
+                resource=Resource.create({"service.name": "cryptoflyt-api"}),
+                sampler=TraceIdRatioBased(sample_rate)
+            )
+            self._provider.add_span_processor(BatchSpanProcessor(ConsoleSpanExporter(
+                out=open(path, "a"),
+                formatter=lambda span: span.to_json(indent=None) + "\n"
+            )))
+            provider = self._provider
+
+        self._tracer = provider.get_tracer("cryptoflyt")
+
+    @contextmanager
+    def span(self, name: str, start_time: Optional[datetime] = None, **attributes) -> Iterator[None]:
+        with self._tracer.start_as_current_span(
+            name,
+            start_time=to_epoch_ns(start_time) if start_time else None,
+            attributes={k: v for k, v in attributes.items() if v is not None}
+        ):
+            yield
+
+    def shutdown(self):
+        if self._provider is not None:
+            self._provider.shutdown()
+
+
+def create_tracer() -> Tracer:
+    """Build the tracer selected in settings."""
+    backend = settings.tracing_backend
+    if backend == "file":
+        return FileTracer(settings.tracing_file, settings.tracing_sample_rate)
+    if backend == "otel":
+        if OTEL_AVAILABLE:
+            return OpenTelemetryTracer(settings.tracing_file, settings.tracing_sample_rate)
+        print("⚠ OpenTelemetry not installed, tracing to file instead")
+        return FileTracer(settings.tracing_file, settings.tracing_sample_rate)
+    return Tracer()
+
+
+# Global instance
+tracer = create_tracer()
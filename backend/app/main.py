@@ -5,12 +5,25 @@ Main FastAPI application entry point.
 import asyncio
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
-from app.core.database import init_db
-from app.services.bybit import bybit_client
+from app.core.database import init_db, engine, async_engine
+from app.core.metrics import instrument_engine, metrics_middleware, render_metrics
+from app.core.security import password_hasher
+from app.core.tracing import tracer
+from app.services.price_feed import price_feed
+from app.services.tick_dispatcher import OverflowPolicy
+from app.services.tick_archive import tick_archive
+from app.services.portfolio_valuation import portfolio_valuation
+from app.services.alert_checker import check_alerts_on_tick
+from app.services.ai_digest import ai_digest
+from app.services.ai_executor import ai_executor
+from app.services.indicators import indicator_engine
+from app.services.orderbook import order_books
+from app.services.warm_start import warm_start
+from app.services.kline_backfill import kline_backfill
 from app.api.routes import auth, alerts, portfolio, prices
 
 
@@ -24,15 +37,62 @@ async def lifespan(app: FastAPI):
     init_db()
     print("✓ Database initialized")
     
-    # Start Bybit WebSocket connection
-    asyncio.create_task(bybit_client.listen())
-    print("✓ Bybit WebSocket connecting...")
+    # Serve last-known prices and candles until the feed catches up, and
+    # time the first streamed price either way
+    if settings.warm_start_enabled:
+        warm_start.load()
+        price_feed.add_callback(warm_start.on_price_update)
+        asyncio.create_task(warm_start.run())
+    
+    # Check alerts as prices arrive; every tick is evaluated unless the
+    # checker falls a full queue behind
+    price_feed.add_callback(check_alerts_on_tick, OverflowPolicy.DROP_OLDEST)
+    
+    # Build candles and indicators from every tick (highs and lows need
+    # all of them, so ticks are queued rather than coalesced)
+    price_feed.add_callback(indicator_engine.on_price_update, OverflowPolicy.DROP_OLDEST)
+    
+    # Keep cached portfolio valuations current
+    price_feed.add_callback(portfolio_valuation.on_price_update)
+    
+    # Archive raw ticks for backtesting and replay
+    if settings.tick_archive_enabled:
+        price_feed.add_callback(tick_archive.append, OverflowPolicy.DROP_OLDEST, maxsize=10_000)
+        asyncio.create_task(tick_archive.run())
+    
+    # Precompute AI digests on a cadence and on large moves
+    if settings.ai_digest_enabled:
+        price_feed.add_callback(ai_digest.on_price_update)
+        asyncio.create_task(ai_digest.run())
+    
+    # Push order book summaries to price WebSocket clients
+    if settings.orderbook_enabled:
+        asyncio.create_task(order_books.run())
+    
+    # Backfill historical candles for charts, then keep them topped up
+    if settings.kline_backfill_enabled:
+        asyncio.create_task(kline_backfill.run())
+    
+    # Start exchange WebSocket connections
+    asyncio.create_task(price_feed.listen())
+    print(f"✓ Price feed connecting to {', '.join(a.name for a in price_feed.adapters)}...")
     
     yield
     
     # Shutdown
     print("👋 Shutting down CryptoFlyt...")
-    await bybit_client.disconnect()
+    await price_feed.disconnect()
+    if settings.warm_start_enabled:
+        warm_start.stop()
+    if settings.tick_archive_enabled:
+        await tick_archive.stop()
+    ai_digest.stop()
+    order_books.stop()
+    kline_backfill.stop()
+    ai_executor.shutdown()
+    password_hasher.shutdown()
+    tracer.shutdown()
+    await async_engine.dispose()
 
 
 # Create FastAPI app
@@ -43,6 +103,11 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Request timing and per-route DB query metrics
+app.middleware("http")(metrics_middleware)
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -72,17 +137,32 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Detailed health check."""
-    prices = bybit_client.get_current_prices()
+    prices = price_feed.get_current_prices()
+    venues = price_feed.venues()
+    staleness = price_feed.staleness()
+    stale_symbols = [symbol for symbol, state in staleness.items() if state["stale"]]
     
     return {
-        "status": "healthy",
-        "bybit_connected": len(prices) > 0,
+        "status": "degraded" if stale_symbols else "healthy",
+        "bybit_connected": venues.get("bybit", False),
+        "exchanges": venues,
         "symbols_tracking": list(prices.keys()),
+        "stale_symbols": stale_symbols,
+        "rest_polling": sorted(price_feed.polling),
+        "price_staleness": staleness,
         "ai_available": bool(settings.google_api_key),
+        "ai_circuit": ai_executor.breaker.state,
         "telegram_configured": bool(settings.telegram_bot_token)
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics."""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -1,14 +1,16 @@
 """Database models."""
 from app.models.user import User
 from app.models.alert import Alert, AlertCondition
-from app.models.portfolio import PortfolioHolding
-from app.models.price import PriceHistory, AlertHistory
+from app.models.portfolio import PortfolioHolding, PortfolioSnapshot
+from app.models.price import PriceHistory, PriceCandle, AlertHistory
 
 __all__ = [
     "User",
     "Alert",
     "AlertCondition", 
     "PortfolioHolding",
+    "PortfolioSnapshot",
     "PriceHistory",
+    "PriceCandle",
     "AlertHistory"
 ]
@@ -2,7 +2,8 @@
 Price alert database model.
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Enum
+from typing import Optional
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Enum, false
 from sqlalchemy.orm import relationship
 import enum
 
@@ -13,6 +14,18 @@ class AlertCondition(str, enum.Enum):
     """Alert trigger conditions."""
     ABOVE = "above"  # Trigger when price goes above target
     BELOW = "below"  # Trigger when price goes below target
+    MOVE_PERCENT = "move_percent"  # Price moves target% (up or down) within window_minutes
+    RSI_ABOVE = "rsi_above"  # RSI on timeframe reaches target
+    RSI_BELOW = "rsi_below"  # RSI on timeframe falls to target
+    EXPRESSION = "expression"  # Boolean expression over one or more symbols
+    VOLUME_ABOVE = "volume_above"  # Quote volume traded within window_minutes reaches target
+
+
+# Conditions on the price itself; the rest need market signals
+PRICE_CONDITIONS = (AlertCondition.ABOVE, AlertCondition.BELOW)
+
+# Conditions met when the watched value is at or below the target
+FALLING_CONDITIONS = (AlertCondition.BELOW, AlertCondition.RSI_BELOW)
 
 
 class Alert(Base):
@@ -25,15 +38,24 @@ class Alert(Base):
     
     # Alert configuration
     symbol = Column(String(20), nullable=False, index=True)  # e.g., "BTCUSDT"
-    target_price = Column(Float, nullable=False)
+    target_price = Column(Float, nullable=False)  # Price, percent move or RSI level, per condition
     condition = Column(Enum(AlertCondition), nullable=False)
+    window_minutes = Column(Integer, nullable=True)  # MOVE_PERCENT / VOLUME_ABOVE lookback
+    timeframe = Column(String(5), nullable=True)  # RSI_* candle timeframe, e.g. "1h"
+    expression = Column(String(500), nullable=True)  # EXPRESSION source, e.g. "ETHUSDT / BTCUSDT < 0.035"
     
     # Status
     is_active = Column(Boolean, default=True)
-    is_triggered = Column(Boolean, default=False)
-    triggered_at = Column(DateTime, nullable=True)
+    is_triggered = Column(Boolean, default=False)  # One-shot alerts only; re-arming alerts stay untriggered
+    triggered_at = Column(DateTime, nullable=True)  # Last fire
     triggered_price = Column(Float, nullable=True)
     
+    # Re-arming: fire again once the watched value moves back past the
+    # target by hysteresis_percent, no sooner than cooldown_seconds apart
+    rearm = Column(Boolean, default=False, server_default=false(), nullable=False)
+    hysteresis_percent = Column(Float, nullable=True)  # None: settings default
+    cooldown_seconds = Column(Integer, nullable=True)  # None: settings default
+    
     # Notification settings
     notify_telegram = Column(Boolean, default=True)
     notify_email = Column(Boolean, default=False)
@@ -49,11 +71,54 @@ class Alert(Base):
     user = relationship("User", backref="alerts")
     
     def __repr__(self):
+        if self.condition == AlertCondition.EXPRESSION:
+            return f"<Alert {self.expression}>"
         return f"<Alert {self.symbol} {self.condition.value} {self.target_price}>"
     
-    def check_condition(self, current_price: float) -> bool:
+    def watched_value(self, current_price: float, signals=None) -> Optional[float]:
+        """
+        The value the condition compares with ``target_price``.
+        
+        Args:
+            current_price: Current market price
+            signals: ``MarketSignals`` for window and indicator conditions;
+                without it those conditions have no value
+        
+        Expression alerts have no single value; the alert engine evaluates
+        them through its expression graph.
+        """
+        if self.condition in PRICE_CONDITIONS:
+            return current_price
+        if signals is None or self.condition == AlertCondition.EXPRESSION:
+            return None
+        
+        if self.condition == AlertCondition.MOVE_PERCENT:
+            move = signals.percent_move(self.symbol, self.window_minutes * 60, current_price)
+            return abs(move) if move is not None else None
+        if self.condition == AlertCondition.VOLUME_ABOVE:
+            return signals.quote_volume(self.symbol, self.window_minutes * 60)
+        return signals.rsi(self.symbol, self.timeframe)
+    
+    def check_condition(self, current_price: float, signals=None) -> bool:
         """Check if alert condition is met."""
-        if self.condition == AlertCondition.ABOVE:
-            return current_price >= self.target_price
-        else:  # BELOW
-            return current_price <= self.target_price
+        value = self.watched_value(current_price, signals)
+        if value is None:
+            return False
+        if self.condition in FALLING_CONDITIONS:
+            return value <= self.target_price
+        return value >= self.target_price
+    
+    def check_rearm(self, current_price: float, hysteresis_percent: float, signals=None) -> bool:
+        """
+        Check if a fired alert may re-arm.
+        
+        The watched value must move back past the target by
+        ``hysteresis_percent`` of the target.
+        """
+        value = self.watched_value(current_price, signals)
+        if value is None:
+            return False
+        band = abs(self.target_price) * hysteresis_percent / 100
+        if self.condition in FALLING_CONDITIONS:
+            return value > self.target_price + band
+        return value < self.target_price - band
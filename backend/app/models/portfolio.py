@@ -2,7 +2,7 @@
 Portfolio holdings database model.
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -49,3 +49,31 @@ class PortfolioHolding(Base):
             "pnl": round(pnl, 2),
             "pnl_percent": round(pnl_percent, 2)
         }
+
+
+class PortfolioSnapshot(Base):
+    """Daily snapshot of a user's portfolio valuation."""
+    
+    __tablename__ = "portfolio_snapshots"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    snapshot_date = Column(Date, nullable=False)
+    
+    # Valuation at snapshot time
+    total_value = Column(Float, nullable=False)
+    total_cost = Column(Float, nullable=False)
+    total_pnl = Column(Float, nullable=False)
+    total_pnl_percent = Column(Float, nullable=False)
+    holdings_count = Column(Integer, nullable=False)
+    
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index('idx_snapshot_user_date', 'user_id', 'snapshot_date', unique=True),
+        Index('idx_snapshot_date', 'snapshot_date'),
+    )
+    
+    def __repr__(self):
+        return f"<PortfolioSnapshot user={self.user_id} {self.snapshot_date} ${self.total_value}>"
@@ -1,8 +1,8 @@
 """
-Price history database model.
+Price history database models.
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, DateTime, Index
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index, UniqueConstraint
 
 from app.core.database import Base
 
@@ -34,6 +34,34 @@ class PriceHistory(Base):
         return f"<Price {self.symbol} ${self.price} at {self.timestamp}>"
 
 
+class PriceCandle(Base):
+    """OHLCV candle backfilled from the exchange's kline history."""
+    
+    __tablename__ = "price_candles"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    
+    symbol = Column(String(20), nullable=False)
+    interval = Column(String(5), nullable=False)  # "1m", "15m", "1h", "4h", ...
+    start = Column(DateTime, nullable=False)  # candle open time (UTC)
+    
+    # OHLCV
+    open = Column(Float, nullable=False)
+    high = Column(Float, nullable=False)
+    low = Column(Float, nullable=False)
+    close = Column(Float, nullable=False)
+    volume = Column(Float, nullable=False)  # base asset
+    turnover = Column(Float, nullable=True)  # quote asset
+    
+    # One candle per symbol, interval and open time; also serves range scans
+    __table_args__ = (
+        UniqueConstraint('symbol', 'interval', 'start', name='uq_candle_symbol_interval_start'),
+    )
+    
+    def __repr__(self):
+        return f"<Candle {self.symbol} {self.interval} {self.start} close ${self.close}>"
+
+
 class AlertHistory(Base):
     """Log of triggered alerts."""
     
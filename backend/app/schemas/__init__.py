@@ -1,12 +1,22 @@
 """Pydantic schemas for API validation."""
 from app.schemas.user import UserCreate, UserLogin, UserUpdate, UserResponse, TokenResponse
-from app.schemas.alert import AlertCreate, AlertUpdate, AlertResponse, AlertHistoryResponse
+from app.schemas.alert import (
+    AlertCreate, AlertUpdate, AlertResponse, AlertHistoryResponse,
+    AlertBacktestRequest, AlertBacktestResponse
+)
 from app.schemas.portfolio import HoldingCreate, HoldingUpdate, HoldingResponse, PortfolioSummary
-from app.schemas.price import PriceData, PriceHistoryResponse, MarketOverview, AIAnalysisRequest, AIAnalysisResponse
+from app.schemas.price import (
+    PriceData, PriceHistoryResponse, MarketOverview, AIAnalysisRequest, AIAnalysisResponse,
+    CandleData, TimeframeIndicators, IndicatorsResponse, OrderBookLevel, OrderBookResponse,
+    TradeBucket, TradeFlowResponse
+)
 
 __all__ = [
     "UserCreate", "UserLogin", "UserUpdate", "UserResponse", "TokenResponse",
     "AlertCreate", "AlertUpdate", "AlertResponse", "AlertHistoryResponse",
+    "AlertBacktestRequest", "AlertBacktestResponse",
     "HoldingCreate", "HoldingUpdate", "HoldingResponse", "PortfolioSummary",
-    "PriceData", "PriceHistoryResponse", "MarketOverview", "AIAnalysisRequest", "AIAnalysisResponse"
+    "PriceData", "PriceHistoryResponse", "MarketOverview", "AIAnalysisRequest", "AIAnalysisResponse",
+    "CandleData", "TimeframeIndicators", "IndicatorsResponse", "OrderBookLevel", "OrderBookResponse",
+    "TradeBucket", "TradeFlowResponse"
 ]
@@ -2,17 +2,31 @@
 Pydantic schemas for Alert API.
 """
 from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel
+from typing import List, Optional
+from pydantic import BaseModel, Field
 
 from app.models.alert import AlertCondition
 
 
 class AlertBase(BaseModel):
-    """Base alert schema."""
+    """
+    Base alert schema.
+    
+    ``target_price`` is the price for above/below, the percent for
+    move_percent (with ``window_minutes``), the quote (USDT) volume for
+    volume_above (with ``window_minutes``) and the RSI level for rsi_above
+    and rsi_below (with ``timeframe``). Expression alerts use ``expression``
+    instead, and their ``symbol`` is the first symbol it references.
+    """
     symbol: str
     target_price: float
     condition: AlertCondition
+    window_minutes: Optional[int] = Field(None, ge=1, le=1440)
+    timeframe: Optional[str] = None
+    expression: Optional[str] = Field(None, max_length=500)
+    rearm: bool = False
+    hysteresis_percent: Optional[float] = Field(None, ge=0, le=50)
+    cooldown_seconds: Optional[int] = Field(None, ge=0, le=86400)
     note: Optional[str] = None
     notify_telegram: bool = True
     notify_email: bool = False
@@ -20,13 +34,21 @@ class AlertBase(BaseModel):
 
 class AlertCreate(AlertBase):
     """Schema for creating an alert."""
-    pass
+    # Not needed for expression alerts
+    symbol: Optional[str] = None
+    target_price: Optional[float] = None
 
 
 class AlertUpdate(BaseModel):
     """Schema for updating an alert."""
     target_price: Optional[float] = None
     condition: Optional[AlertCondition] = None
+    window_minutes: Optional[int] = Field(None, ge=1, le=1440)
+    timeframe: Optional[str] = None
+    expression: Optional[str] = Field(None, max_length=500)
+    rearm: Optional[bool] = None
+    hysteresis_percent: Optional[float] = Field(None, ge=0, le=50)
+    cooldown_seconds: Optional[int] = Field(None, ge=0, le=86400)
     is_active: Optional[bool] = None
     note: Optional[str] = None
     notify_telegram: Optional[bool] = None
@@ -61,3 +83,24 @@ class AlertHistoryResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class AlertBacktestRequest(BaseModel):
+    """Schema for backtesting a prospective alert."""
+    symbol: str
+    target_price: float
+    condition: AlertCondition
+    period: str = Field("24h", pattern="^(1h|24h|7d|30d)$")
+
+
+class AlertBacktestResponse(BaseModel):
+    """How often an alert would have fired over a past period."""
+    symbol: str
+    target_price: float
+    condition: AlertCondition
+    period: str
+    source: str  # "archive" or "price_history"
+    ticks_evaluated: int
+    fire_count: int
+    first_triggered_at: Optional[datetime]
+    trigger_times: List[datetime]
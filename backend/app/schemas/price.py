@@ -7,7 +7,7 @@ from pydantic import BaseModel
 
 
 class PriceData(BaseModel):
-    """Real-time price data from Bybit."""
+    """Real-time price data from the price feed."""
     symbol: str
     price: float
     high_24h: Optional[float] = None
@@ -15,6 +15,7 @@ class PriceData(BaseModel):
     volume_24h: Optional[float] = None
     change_24h_percent: Optional[float] = None
     timestamp: datetime
+    stale: bool = False  # no price update within price_feed_stale_seconds
 
 
 class PriceHistoryPoint(BaseModel):
@@ -28,6 +29,7 @@ class PriceHistoryResponse(BaseModel):
     symbol: str
     data: List[PriceHistoryPoint]
     period: str  # "1h", "24h", "7d", "30d"
+    resolution: Optional[str] = None  # "tick", "1s", "5s", "15s", "30s" (archive mode) or candle interval
 
 
 class MarketOverview(BaseModel):
@@ -36,6 +38,84 @@ class MarketOverview(BaseModel):
     last_updated: datetime
 
 
+class CandleData(BaseModel):
+    """OHLCV candle."""
+    start: datetime
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+
+
+class TimeframeIndicators(BaseModel):
+    """Indicator values for one timeframe, including the forming candle."""
+    timeframe: str  # "1m", "5m", "15m", "1h", ...
+    candle: Optional[CandleData] = None
+    candles_closed: int
+    sma: Optional[float] = None
+    ema: Optional[float] = None
+    rsi: Optional[float] = None
+    bollinger_lower: Optional[float] = None
+    bollinger_middle: Optional[float] = None
+    bollinger_upper: Optional[float] = None
+
+
+class IndicatorsResponse(BaseModel):
+    """Streaming technical indicators for a symbol."""
+    symbol: str
+    vwap: Optional[float] = None
+    timeframes: List[TimeframeIndicators]
+
+
+class TradeBucket(BaseModel):
+    """Traded volume in one time bucket."""
+    start: datetime
+    volume: float
+    buy_volume: float  # taker buys
+    sell_volume: float  # taker sells
+    quote_volume: float
+    trades: int
+    vwap: Optional[float] = None
+
+
+class TradeFlowResponse(BaseModel):
+    """Per-second trade buckets for a symbol, aggregated to a resolution."""
+    symbol: str
+    seconds: int
+    resolution: int  # bucket size in seconds
+    total: TradeBucket
+    buckets: List[TradeBucket]
+
+
+class OrderBookLevel(BaseModel):
+    """One price level of an order book."""
+    price: float
+    size: float
+
+
+class OrderBookResponse(BaseModel):
+    """Top of book, spread and depth near mid for a symbol."""
+    symbol: str
+    synced: bool
+    update_id: Optional[int] = None
+    timestamp: Optional[datetime] = None
+    best_bid: Optional[float] = None
+    best_bid_size: Optional[float] = None
+    best_ask: Optional[float] = None
+    best_ask_size: Optional[float] = None
+    mid: Optional[float] = None
+    spread: Optional[float] = None
+    spread_bps: Optional[float] = None
+    depth_percent: float  # band around mid for the depth figures
+    bid_depth: Optional[float] = None  # base quantity within the band
+    bid_depth_notional: Optional[float] = None  # quote value within the band
+    ask_depth: Optional[float] = None
+    ask_depth_notional: Optional[float] = None
+    bids: List[OrderBookLevel] = []
+    asks: List[OrderBookLevel] = []
+
+
 class AIAnalysisRequest(BaseModel):
     """Request for AI market analysis."""
     symbols: List[str]
@@ -48,3 +128,4 @@ class AIAnalysisResponse(BaseModel):
     symbols_analyzed: List[str]
     sentiment: str  # "bullish", "bearish", "neutral"
     timestamp: datetime
+    cached: bool = False
@@ -1,14 +1,71 @@
 """Services for external integrations and business logic."""
 from app.services.bybit import bybit_client, BybitWebSocketClient
+from app.services.binance import binance_client, BinanceWebSocketClient
+from app.services.exchange import ExchangeAdapter
+from app.services.price_feed import price_feed, PriceFeed
 from app.services.alert_checker import AlertChecker
+from app.services.alert_engine import alert_engine, AlertEngine
+from app.services.alert_expressions import ExpressionGraph, ExpressionError, parse_expression
 from app.services.notifier import NotificationService
 from app.services.ai_analysis import ai_service, AIAnalysisService
+from app.services.ai_executor import ai_executor, AIExecutor
+from app.services.ai_cache import analysis_cache, AnalysisCache
+from app.services.ai_digest import ai_digest, AIDigestScheduler
+from app.services.tick_archive import tick_archive, TickArchive
+from app.services.alert_replay import alert_replay, AlertReplayEngine
+from app.services.portfolio_valuation import portfolio_valuation, PortfolioValuationService
+from app.services.bulk_valuation import bulk_valuation, BulkPortfolioValuation
+from app.services.tick_dispatcher import TickDispatcher, OverflowPolicy
+from app.services.indicators import indicator_engine, IndicatorEngine
+from app.services.market_signals import market_signals, MarketSignals
+from app.services.orderbook import order_books, OrderBookManager
+from app.services.trade_flow import trade_flow, TradeFlow
+from app.services.warm_start import warm_start, WarmStartStore
+from app.services.kline_backfill import kline_backfill, KlineBackfill
 
 __all__ = [
     "bybit_client",
     "BybitWebSocketClient",
+    "binance_client",
+    "BinanceWebSocketClient",
+    "ExchangeAdapter",
+    "price_feed",
+    "PriceFeed",
     "AlertChecker",
+    "alert_engine",
+    "AlertEngine",
+    "ExpressionGraph",
+    "ExpressionError",
+    "parse_expression",
     "NotificationService",
     "ai_service",
-    "AIAnalysisService"
+    "AIAnalysisService",
+    "ai_executor",
+    "AIExecutor",
+    "analysis_cache",
+    "AnalysisCache",
+    "ai_digest",
+    "AIDigestScheduler",
+    "tick_archive",
+    "TickArchive",
+    "alert_replay",
+    "AlertReplayEngine",
+    "portfolio_valuation",
+    "PortfolioValuationService",
+    "bulk_valuation",
+    "BulkPortfolioValuation",
+    "TickDispatcher",
+    "OverflowPolicy",
+    "indicator_engine",
+    "IndicatorEngine",
+    "market_signals",
+    "MarketSignals",
+    "order_books",
+    "OrderBookManager",
+    "trade_flow",
+    "TradeFlow",
+    "warm_start",
+    "WarmStartStore",
+    "kline_backfill",
+    "KlineBackfill"
 ]
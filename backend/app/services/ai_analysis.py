@@ -1,11 +1,15 @@
 """
 AI-powered market analysis using Google Gemini.
 """
-import asyncio
+import random
+import time
 from datetime import datetime
+from types import SimpleNamespace
 from typing import List, Optional
 
 from app.config import settings
+from app.services.ai_executor import ai_executor, AIUnavailableError
+from app.services.indicators import indicator_engine
 
 # Optional Gemini import
 try:
@@ -15,6 +19,27 @@ except ImportError:
     GEMINI_AVAILABLE = False
 
 
+class MockGenerativeModel:
+    """
+    Local stand-in for the Gemini model (``ai_backend = "mock"``).
+
+    Blocks for ``latency`` seconds and fails a fraction of calls, to
+    exercise timeouts and the circuit breaker without an API key.
+    """
+    
+    def __init__(self, latency: float = 0.0, failure_rate: float = 0.0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+    
+    def generate_content(self, prompt: str):
+        time.sleep(self.latency)
+        if random.random() < self.failure_rate:
+            raise RuntimeError("Mock model failure")
+        return SimpleNamespace(
+            text=f"## Market Overview\n\nMock model response to a {len(prompt)} character prompt. Sentiment: neutral."
+        )
+
+
 class AIAnalysisService:
     """
     AI-powered market analysis using Google Gemini.
@@ -29,7 +54,9 @@ class AIAnalysisService:
         self.api_key = settings.google_api_key
         self.model = None
         
-        if GEMINI_AVAILABLE and self.api_key:
+        if settings.ai_backend == "mock":
+            self.model = MockGenerativeModel(settings.ai_mock_latency_seconds, settings.ai_mock_failure_rate)
+        elif GEMINI_AVAILABLE and self.api_key:
             genai.configure(api_key=self.api_key)
             self.model = genai.GenerativeModel('gemini-pro')
     
@@ -76,10 +103,8 @@ Please provide:
 Keep the response concise and factual. Focus on the data provided.
 """
             
-            # Call Gemini API
-            response = await asyncio.to_thread(
-                self.model.generate_content, prompt
-            )
+            # Call Gemini API on the bounded AI pool
+            response = await ai_executor.call("analyze_market", self.model.generate_content, prompt)
             
             # Determine sentiment from response
             sentiment = self._extract_sentiment(response.text)
@@ -89,12 +114,16 @@ Keep the response concise and factual. Focus on the data provided.
                 "symbols_analyzed": symbols,
                 "sentiment": sentiment,
                 "timestamp": datetime.utcnow(),
-                "source": "gemini"
+                "source": settings.ai_backend,
+                "fallback": False
             }
             
+        except AIUnavailableError as e:
+            print(f"⚠ AI analysis unavailable, using local analysis: {e}")
+            return self._mock_analysis(prices, symbols, fallback=True)
         except Exception as e:
             print(f"AI analysis error: {e}")
-            return self._mock_analysis(prices, symbols)
+            return self._mock_analysis(prices, symbols, fallback=True)
     
     async def explain_price_movement(
         self,
@@ -126,12 +155,13 @@ Provide a brief (2-3 sentences) general explanation of what might cause such pri
 Do not speculate on specific news or events. Keep it educational and general.
 Do not provide financial advice."""
             
-            response = await asyncio.to_thread(
-                self.model.generate_content, prompt
-            )
+            response = await ai_executor.call("explain_price_movement", self.model.generate_content, prompt)
             
             return response.text
             
+        except AIUnavailableError as e:
+            print(f"⚠ AI explanation unavailable, using local explanation: {e}")
+            return self._mock_explanation(symbol, change_percent)
         except Exception as e:
             print(f"AI explanation error: {e}")
             return self._mock_explanation(symbol, change_percent)
@@ -147,8 +177,32 @@ Do not provide financial advice."""
                 lines.append(
                     f"- {symbol}: ${p['price']:,.2f} ({direction} {change:+.2f}% 24h)"
                 )
+                lines.extend(self._indicator_lines(symbol))
         return "\n".join(lines) if lines else "No price data available"
     
+    def _indicator_lines(self, symbol: str) -> List[str]:
+        """Describe the streaming indicators for a symbol, if warmed up."""
+        snapshot = indicator_engine.snapshot(symbol, settings.indicator_context_timeframes)
+        if not snapshot:
+            return []
+        
+        lines = []
+        if snapshot['vwap'] is not None:
+            lines.append(f"  - VWAP (today): ${snapshot['vwap']:,.2f}")
+        for tf in snapshot['timeframes']:
+            signals = []
+            if tf['rsi'] is not None:
+                signals.append(f"RSI({settings.indicator_rsi_period}) {tf['rsi']:.1f}")
+            if tf['sma'] is not None:
+                signals.append(f"SMA({settings.indicator_sma_period}) ${tf['sma']:,.2f}")
+            if tf['ema'] is not None:
+                signals.append(f"EMA({settings.indicator_ema_period}) ${tf['ema']:,.2f}")
+            if tf['bollinger_lower'] is not None:
+                signals.append(f"Bollinger ${tf['bollinger_lower']:,.2f}-${tf['bollinger_upper']:,.2f}")
+            if signals:
+                lines.append(f"  - {tf['timeframe']}: " + ", ".join(signals))
+        return lines
+    
     def _extract_sentiment(self, text: str) -> str:
         """Extract sentiment from analysis text."""
         text_lower = text.lower()
@@ -158,8 +212,16 @@ Do not provide financial advice."""
             return "bearish"
         return "neutral"
     
-    def _mock_analysis(self, prices: dict, symbols: List[str]) -> dict:
-        """Generate mock analysis when AI is not available."""
+    def _mock_analysis(self, prices: dict, symbols: List[str], fallback: bool = False) -> dict:
+        """
+        Generate mock analysis when AI is not available.
+        
+        Args:
+            prices: Dict of current prices {symbol: price_data}
+            symbols: List of symbols to analyze
+            fallback: Standing in for a model call that failed or was
+                rejected (cached only briefly)
+        """
         # Calculate basic stats
         total_change = 0
         count = 0
@@ -206,7 +268,8 @@ Based on price action, the market appears {sentiment}. {"Buyers are showing stre
             "symbols_analyzed": symbols,
             "sentiment": sentiment,
             "timestamp": datetime.utcnow(),
-            "source": "mock"
+            "source": "mock",
+            "fallback": fallback
         }
     
     def _mock_explanation(self, symbol: str, change_percent: float) -> str:
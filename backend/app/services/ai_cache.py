@@ -0,0 +1,176 @@
+"""
+Cached, coalesced AI market analysis.
+
+Analyses are cached per symbol set together with a quantized snapshot of
+the prices they were generated from. A cached analysis is fresh while its
+prices stay in the same buckets and it is younger than the TTL; after that
+it is still served (stale-while-revalidate) while one background refresh
+runs. Concurrent requests for the same symbol set share a single upstream
+call (single-flight).
+
+When the model call fails or the circuit breaker rejects it the service
+returns a local fallback analysis. That is cached for only
+``fallback_ttl_seconds`` and never served stale, so the model is retried
+soon, and it does not replace a real analysis that can still be served
+stale.
+"""
+import asyncio
+import math
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from app.config import settings
+from app.services.ai_analysis import ai_service
+
+SymbolSet = Tuple[str, ...]
+
+
+class _CacheEntry:
+    """A cached analysis and the quantized prices it describes."""
+
+    __slots__ = ("result", "context_key", "ttl", "created_at")
+
+    def __init__(self, result: dict, context_key: tuple, ttl: float):
+        self.result = result
+        self.context_key = context_key
+        self.ttl = ttl
+        self.created_at = time.monotonic()
+
+    @property
+    def fallback(self) -> bool:
+        return bool(self.result.get('fallback'))
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.created_at
+
+
+class AnalysisCache:
+    """
+    Stale-while-revalidate cache in front of ``AIAnalysisService.analyze_market``.
+    """
+
+    def __init__(
+        self,
+        compute: Callable[[dict, List[str]], Awaitable[dict]],
+        ttl_seconds: float,
+        max_stale_seconds: float,
+        bucket_percent: float,
+        fallback_ttl_seconds: float
+    ):
+        self.compute = compute
+        self.ttl_seconds = ttl_seconds
+        self.max_stale_seconds = max_stale_seconds
+        self.fallback_ttl_seconds = fallback_ttl_seconds
+        self.bucket_percent = bucket_percent
+        self._entries: Dict[SymbolSet, _CacheEntry] = {}
+        self._inflight: Dict[SymbolSet, asyncio.Task] = {}
+        self._background: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def symbol_set(symbols: List[str]) -> SymbolSet:
+        return tuple(sorted(set(symbols)))
+
+    def context_key(self, prices: dict, symbols: SymbolSet) -> tuple:
+        """
+        Quantize the price context an analysis depends on.
+
+        Prices fall into logarithmic buckets ``bucket_percent`` wide and 24h
+        changes into buckets of ``bucket_percent`` points, so small ticks do
+        not invalidate an analysis.
+        """
+        step = math.log1p(self.bucket_percent / 100)
+        key = []
+        for symbol in symbols:
+            p = prices.get(symbol)
+            if not p or not p.get('price'):
+                key.append((symbol, None, None))
+                continue
+            key.append((
+                symbol,
+                round(math.log(p['price']) / step),
+                round(p.get('change_24h_percent', 0) / self.bucket_percent)
+            ))
+        return tuple(key)
+
+    async def get(self, prices: dict, symbols: List[str]) -> Tuple[dict, bool]:
+        """
+        Get an analysis for a symbol set.
+
+        Returns:
+            Tuple of (analysis dict, whether it was served from the cache)
+        """
+        key = self.symbol_set(symbols)
+        context_key = self.context_key(prices, key)
+        entry = self._entries.get(key)
+
+        if entry is not None:
+            if entry.context_key == context_key and entry.age < entry.ttl:
+                return entry.result, True
+
+            if not entry.fallback and entry.age < self.max_stale_seconds:
+                self._refresh_in_background(key, prices)
+                return entry.result, True
+
+        return await self._refresh(key, prices), False
+
+    def put(self, symbols: List[str], prices: dict, result: dict):
+        """Store an analysis computed elsewhere (e.g. a scheduled digest)."""
+        self._store(self.symbol_set(symbols), prices, result)
+
+    def peek(self, symbols: List[str]) -> Optional[dict]:
+        """The cached analysis for a symbol set regardless of age, if any."""
+        entry = self._entries.get(self.symbol_set(symbols))
+        return entry.result if entry else None
+
+    async def _refresh(self, key: SymbolSet, prices: dict) -> dict:
+        """Compute an analysis, joining a refresh already in flight."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._compute(key, prices))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        # Shield so one caller disconnecting does not cancel the shared call
+        return await asyncio.shield(task)
+
+    async def _compute(self, key: SymbolSet, prices: dict) -> dict:
+        result = await self.compute(prices, list(key))
+        self._store(key, prices, result)
+        return result
+
+    def _store(self, key: SymbolSet, prices: dict, result: dict):
+        ttl = self.ttl_seconds
+        if result.get('fallback'):
+            entry = self._entries.get(key)
+            if entry is not None and not entry.fallback and entry.age < self.max_stale_seconds:
+                return  # Keep serving the real analysis stale
+            ttl = self.fallback_ttl_seconds
+        self._entries[key] = _CacheEntry(result, self.context_key(prices, key), ttl)
+
+    def _refresh_in_background(self, key: SymbolSet, prices: dict):
+        if key in self._inflight:
+            return
+
+        async def refresh():
+            try:
+                await self._refresh(key, prices)
+            except Exception as e:
+                print(f"AI analysis refresh error: {e}")
+
+        task = asyncio.create_task(refresh())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def clear(self):
+        self._entries.clear()
+
+
+# Global instance
+analysis_cache = AnalysisCache(
+    ai_service.analyze_market,
+    ttl_seconds=settings.ai_cache_ttl_seconds,
+    max_stale_seconds=settings.ai_cache_max_stale_seconds,
+    bucket_percent=settings.ai_cache_bucket_percent,
+    fallback_ttl_seconds=settings.ai_cache_fallback_ttl_seconds
+)
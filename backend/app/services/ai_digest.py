@@ -0,0 +1,147 @@
+"""
+Scheduled AI market digests.
+
+Generates analyses for the common symbol sets on a fixed cadence, and early
+when any symbol in a set has moved more than ``ai_digest_move_percent``
+since its last digest. Each digest is written to the analysis cache (so
+``POST /api/prices/analyze`` is a cache read for these sets) and handed to
+listeners, which push it to price WebSocket clients.
+"""
+import asyncio
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Set
+
+from app.config import settings
+from app.services.ai_analysis import ai_service
+from app.services.ai_cache import SymbolSet, analysis_cache
+from app.services.price_feed import price_feed
+
+
+class AIDigestScheduler:
+    """Keeps digests for configured symbol sets current."""
+
+    def __init__(self):
+        self.symbol_sets: List[SymbolSet] = [
+            analysis_cache.symbol_set(symbols) for symbols in settings.ai_digest_symbol_sets
+        ]
+        self.listeners: List[Callable] = []
+        self.digests: Dict[SymbolSet, dict] = {}
+
+        # Price of each symbol when its set's last digest was generated
+        self._reference_prices: Dict[SymbolSet, Dict[str, float]] = {}
+        self._pending: Set[SymbolSet] = set()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._running = False
+
+    def add_listener(self, callback: Callable):
+        """Add an async callback called with each new digest message."""
+        self.listeners.append(callback)
+
+    def latest(self) -> List[dict]:
+        """Most recent digest message per symbol set."""
+        return list(self.digests.values())
+
+    def on_price_update(self, price_data: dict):
+        """
+        Request early digests for sets with a large move.
+
+        Registered as a price feed callback.
+        """
+        if not self._running:
+            return
+
+        symbol = price_data.get('symbol')
+        price = price_data.get('price')
+        if not symbol or not price:
+            return
+
+        for symbol_set in self.symbol_sets:
+            reference = self._reference_prices.get(symbol_set, {}).get(symbol)
+            if reference is None or symbol_set in self._pending:
+                continue
+
+            move = abs(price - reference) / reference * 100
+            if move >= settings.ai_digest_move_percent:
+                self._pending.add(symbol_set)
+                self._wakeup.set()
+
+    async def _generate(self, symbol_set: SymbolSet, reason: str):
+        prices = price_feed.get_current_prices()
+        if not all(symbol in prices for symbol in symbol_set):
+            return
+
+        async with self._semaphore:
+            result = await ai_service.analyze_market(prices, list(symbol_set))
+
+        analysis_cache.put(list(symbol_set), prices, result)
+        self._reference_prices[symbol_set] = {s: prices[s]['price'] for s in symbol_set}
+
+        message = {
+            "type": "ai_digest",
+            "data": {
+                "symbols": list(symbol_set),
+                "analysis": result['analysis'],
+                "sentiment": result['sentiment'],
+                "source": result.get('source'),
+                "timestamp": result['timestamp'],
+                "reason": reason
+            },
+            "timestamp": datetime.utcnow()
+        }
+        self.digests[symbol_set] = message
+
+        for listener in self.listeners:
+            try:
+                await listener(message)
+            except Exception as e:
+                print(f"AI digest listener error: {e}")
+
+    async def _generate_all(self, symbol_sets: List[SymbolSet], reason: str):
+        results = await asyncio.gather(
+            *[self._generate(symbol_set, reason) for symbol_set in symbol_sets],
+            return_exceptions=True
+        )
+        for symbol_set, result in zip(symbol_sets, results):
+            if isinstance(result, Exception):
+                print(f"✗ AI digest failed for {','.join(symbol_set)}: {result}")
+
+    async def run(self):
+        """Generate digests on the configured cadence until stopped."""
+        self._running = True
+        self._semaphore = asyncio.Semaphore(settings.ai_digest_max_concurrency)
+        self._wakeup = asyncio.Event()
+        loop = asyncio.get_running_loop()
+
+        # Wait for the first prices before the initial round
+        while self._running and not price_feed.get_current_prices():
+            await asyncio.sleep(1)
+
+        next_round = loop.time()
+        print(f"✓ AI digests every {settings.ai_digest_interval_seconds:.0f}s for {len(self.symbol_sets)} symbol sets")
+
+        while self._running:
+            timeout = max(0.0, next_round - loop.time())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            if loop.time() >= next_round:
+                self._pending.clear()
+                await self._generate_all(self.symbol_sets, "scheduled")
+                next_round = loop.time() + settings.ai_digest_interval_seconds
+            elif self._pending:
+                moved = list(self._pending)
+                await self._generate_all(moved, "move")
+                self._pending.difference_update(moved)
+
+    def stop(self):
+        self._running = False
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+
+# Global instance
+ai_digest = AIDigestScheduler()
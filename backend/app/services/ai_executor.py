@@ -0,0 +1,201 @@
+"""
+Bounded execution of blocking AI model calls.
+
+Model SDK calls block, so they run on a dedicated thread pool instead of the
+default executor shared with the rest of the app. At most ``workers`` calls
+hold a thread at once; a call that times out keeps its slot until its thread
+actually finishes, so a hung backend cannot pile up threads. Every call has a
+deadline covering both the wait for a slot and the call itself.
+
+A circuit breaker opens after ``failure_threshold`` consecutive failures or
+timeouts. While open, calls fail immediately (callers fall back to the local
+analysis); after ``reset_seconds`` one trial call is let through and its
+outcome closes or re-opens the circuit.
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from app.config import settings
+from app.core.metrics import AI_CALL_SECONDS, AI_CIRCUIT_OPEN
+
+
+class AIUnavailableError(Exception):
+    """An AI call was not completed; callers should fall back."""
+
+
+class AICircuitOpenError(AIUnavailableError):
+    """The circuit breaker is open."""
+
+
+class AITimeoutError(AIUnavailableError):
+    """An AI call missed its deadline."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open trial."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+            return self.HALF_OPEN
+        return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may proceed; claims the trial slot when half-open."""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._trial_in_flight:
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        if self._state != self.CLOSED:
+            print("✓ AI circuit closed")
+        self._state = self.CLOSED
+        self._trial_in_flight = False
+        self.failures = 0
+        AI_CIRCUIT_OPEN.set(0)
+
+    def abandon(self):
+        """A call that was allowed was cancelled before it had an outcome."""
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self._state != self.OPEN:
+                print(f"⚠ AI circuit open after {self.failures} failures, retrying in {self.reset_seconds:.0f}s")
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+            AI_CIRCUIT_OPEN.set(1)
+
+
+class AIExecutor:
+    """Runs blocking model calls with a concurrency cap, deadline and breaker."""
+
+    def __init__(self, workers: int, timeout_seconds: float, failure_threshold: int, reset_seconds: float):
+        self.workers = workers
+        self.timeout_seconds = timeout_seconds
+        self.breaker = CircuitBreaker(failure_threshold, reset_seconds)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._busy = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="ai-call"
+            )
+            self._slots = asyncio.Semaphore(self.workers)
+        return self._executor
+
+    @property
+    def busy(self) -> int:
+        """Threads currently running a model call (including timed-out ones)."""
+        return self._busy
+
+    def _release(self, future: asyncio.Future):
+        self._busy -= 1
+        self._slots.release()
+        # Retrieve the outcome of calls nobody is waiting on any more
+        if not future.cancelled():
+            future.exception()
+
+    async def call(self, operation: str, func, *args, timeout: Optional[float] = None):
+        """
+        Run ``func(*args)`` on the AI thread pool.
+
+        Args:
+            operation: Label for metrics (e.g. "analyze_market")
+            func: Blocking callable
+            timeout: Deadline in seconds (defaults to ``ai_call_timeout_seconds``)
+
+        Raises:
+            AICircuitOpenError: The backend is considered degraded
+            AITimeoutError: No slot or no result before the deadline
+        """
+        if not self.breaker.allow():
+            AI_CALL_SECONDS.labels(operation, "rejected").observe(0)
+            raise AICircuitOpenError(f"AI circuit is {self.breaker.state}")
+
+        executor = self._get_executor()
+        loop = asyncio.get_running_loop()
+        timeout = timeout or self.timeout_seconds
+        started = loop.time()
+
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=timeout)
+        except asyncio.CancelledError:
+            self.breaker.abandon()
+            raise
+        except asyncio.TimeoutError:
+            self.breaker.record_failure()
+            AI_CALL_SECONDS.labels(operation, "timeout").observe(loop.time() - started)
+            raise AITimeoutError(f"No AI worker free within {timeout:.1f}s")
+
+        self._busy += 1
+        future = loop.run_in_executor(executor, func, *args)
+        future.add_done_callback(self._release)
+
+        try:
+            # Shield so the slot is only released when the thread finishes
+            result = await asyncio.wait_for(
+                asyncio.shield(future),
+                timeout=max(0.0, timeout - (loop.time() - started))
+            )
+        except asyncio.TimeoutError:
+            self.breaker.record_failure()
+            AI_CALL_SECONDS.labels(operation, "timeout").observe(loop.time() - started)
+            raise AITimeoutError(f"AI call exceeded {timeout:.1f}s")
+        except asyncio.CancelledError:
+            self.breaker.abandon()
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            AI_CALL_SECONDS.labels(operation, "error").observe(loop.time() - started)
+            raise
+
+        self.breaker.record_success()
+        AI_CALL_SECONDS.labels(operation, "ok").observe(loop.time() - started)
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "circuit": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "busy": self._busy,
+            "workers": self.workers
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Global instance
+ai_executor = AIExecutor(
+    workers=settings.ai_max_concurrency,
+    timeout_seconds=settings.ai_call_timeout_seconds,
+    failure_threshold=settings.ai_circuit_failure_threshold,
+    reset_seconds=settings.ai_circuit_reset_seconds
+)
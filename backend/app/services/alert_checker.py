@@ -1,12 +1,21 @@
 """
 Alert checking service - monitors prices and triggers alerts.
 """
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
 from typing import List, Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import ALERT_EVALUATION_SECONDS, ALERT_NOTIFICATION_SECONDS, ALERTS_TRIGGERED
+from app.core.tracing import tracer
 from app.models.alert import Alert, AlertCondition
 from app.models.price import AlertHistory
+from app.models.user import User
+from app.services.alert_engine import AlertEngine, alert_engine, cooldown_seconds
+from app.services.alert_expressions import parse_expression
+from app.services.market_signals import market_signals
 from app.services.notifier import NotificationService
 
 
@@ -14,58 +23,131 @@ class AlertChecker:
     """
     Service to check and trigger price alerts.
     
-    Called whenever a new price update is received from Bybit.
-    Checks all active alerts for the symbol and triggers notifications.
+    Called whenever the price feed publishes a new price.
+    Evaluates the symbol's alerts in memory (``AlertEngine``) and persists
+    and notifies only the ones that fire.
     """
     
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: AsyncSession,
+        notifier=None,
+        persist: bool = True,
+        engine: Optional[AlertEngine] = None
+    ):
+        """
+        Args:
+            db: Database session
+            notifier: Notification sender (defaults to NotificationService)
+            persist: Commit triggers; when False they are only flushed so the
+                caller can roll them back (used by alert replay)
+            engine: Alert evaluation state (defaults to the live ``alert_engine``)
+        """
         self.db = db
-        self.notifier = NotificationService()
+        self.notifier = notifier or NotificationService()
+        self.persist = persist
+        self.engine = engine or alert_engine
+        self.signals = self.engine.signals
     
-    async def check_alerts(self, symbol: str, current_price: float) -> List[Alert]:
+    async def check_alerts(
+        self,
+        symbol: str,
+        current_price: float,
+        timestamp: Optional[datetime] = None
+    ) -> List[Alert]:
         """
         Check all active alerts for a symbol and trigger if conditions are met.
         
         Args:
             symbol: Trading pair (e.g., "BTCUSDT")
             current_price: Current market price
+            timestamp: Tick time (defaults to now)
             
         Returns:
             List of triggered alerts
         """
-        # Get all active, non-triggered alerts for this symbol
-        alerts = self.db.query(Alert).filter(
-            Alert.symbol == symbol,
-            Alert.is_active == True,
-            Alert.is_triggered == False
-        ).all()
-        
-        triggered_alerts = []
-        
-        for alert in alerts:
-            if alert.check_condition(current_price):
-                await self._trigger_alert(alert, current_price)
-                triggered_alerts.append(alert)
-        
-        if triggered_alerts:
-            self.db.commit()
+        with tracer.span("alert.check", symbol=symbol, price=current_price):
+            await self.engine.ensure_loaded(self.db)
+            
+            started = time.perf_counter()
+            triggered_alerts = self.engine.evaluate(symbol, current_price, timestamp)
+            ALERT_EVALUATION_SECONDS.labels(symbol).observe(time.perf_counter() - started)
+            
+            fired_at = timestamp or datetime.utcnow()
+            claimed = []
+            for alert in triggered_alerts:
+                # Expression alerts may fire on a tick of another symbol they
+                # reference; record the price of their own symbol
+                price = current_price
+                if alert.symbol != symbol:
+                    price = self.engine.graph.last_prices.get(alert.symbol, current_price)
+                history = await self._claim(alert, price, fired_at)
+                if history is not None:
+                    claimed.append((alert, price, history))
+                elif not alert.rearm:
+                    # Fired (or edited) by another worker since it was loaded
+                    self.engine.remove(alert.id)
+            
+            if not claimed:
+                return []
+            await self._store()
+            
+            # Only disarm or drop alerts, and notify, once the fires are
+            # stored: a failed write leaves them armed and nobody notified
+            for alert, price, _ in claimed:
+                self.engine.mark_fired(alert, price, fired_at)
+            for alert, price, history in claimed:
+                await self._notify(alert, price, history)
+            await self._store()
         
-        return triggered_alerts
+        return [alert for alert, _, _ in claimed]
     
-    async def _trigger_alert(self, alert: Alert, triggered_price: float):
+    async def _store(self):
+        if self.persist:
+            await self.db.commit()
+        else:
+            await self.db.flush()
+    
+    async def _claim(self, alert: Alert, triggered_price: float, fired_at: datetime) -> Optional[AlertHistory]:
         """
-        Trigger an alert and send notifications.
+        Record a fire unless another worker already did.
+        
+        Every process evaluates its own copy of the alerts, so the fire is
+        claimed with a conditional update of the alert row: a one-shot alert
+        only while it is still untriggered, a re-arming one only once its
+        cooldown since the last recorded fire has passed.
         
         Args:
-            alert: The alert to trigger
+            alert: The alert to trigger (detached, owned by the engine; not
+                modified here)
             triggered_price: The price that triggered the alert
+            fired_at: Time of the tick that fired it
+            
+        Returns:
+            The history record for a claimed fire, or None
         """
-        # Update alert status
-        alert.is_triggered = True
-        alert.triggered_at = datetime.utcnow()
-        alert.triggered_price = triggered_price
+        claim = update(Alert).where(
+            Alert.id == alert.id,
+            Alert.is_active == True,
+            Alert.is_triggered == False
+        )
+        if alert.rearm:
+            cooldown = timedelta(seconds=cooldown_seconds(alert))
+            claim = claim.where(or_(Alert.triggered_at == None, Alert.triggered_at < fired_at - cooldown))
+        
+        # Re-arming alerts stay untriggered. The engine's copy is updated
+        # by ``mark_fired`` once this is stored.
+        result = await self.db.execute(
+            claim.values(
+                is_triggered=not alert.rearm,
+                triggered_at=fired_at,
+                triggered_price=triggered_price
+            ).execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            return None
         
-        # Create history record
+        ALERTS_TRIGGERED.labels(alert.symbol).inc()
         history = AlertHistory(
             alert_id=alert.id,
             user_id=alert.user_id,
@@ -73,27 +155,104 @@ class AlertChecker:
             target_price=alert.target_price,
             triggered_price=triggered_price,
             condition=alert.condition.value,
-            triggered_at=datetime.utcnow()
+            triggered_at=fired_at
         )
         self.db.add(history)
+        return history
+    
+    async def _notify(self, alert: Alert, triggered_price: float, history: AlertHistory):
+        """
+        Send notifications for a stored fire.
         
-        # Send notifications
-        user = alert.user
+        Args:
+            alert: The fired alert
+            triggered_price: The price that triggered the alert
+            history: Its history record, updated with the delivery result
+        """
+        started = time.perf_counter()
+        
+        # The user is read at fire time so profile changes apply without
+        # reloading the engine
+        user = await self.db.get(User, alert.user_id)
         notification_message = self._format_notification(alert, triggered_price)
         
         # Telegram notification
-        if alert.notify_telegram and user.telegram_chat_id and user.telegram_notifications:
-            success = await self.notifier.send_telegram(
-                chat_id=user.telegram_chat_id,
-                message=notification_message
-            )
+        if user and alert.notify_telegram and user.telegram_chat_id and user.telegram_notifications:
+            with tracer.span("alert.notify", alert_id=alert.id, channel="telegram"):
+                success = await self.notifier.send_telegram(
+                    chat_id=user.telegram_chat_id,
+                    message=notification_message
+                )
             history.telegram_sent = success
+            ALERT_NOTIFICATION_SECONDS.labels("telegram", "sent" if success else "failed").observe(
+                time.perf_counter() - started
+            )
         
         # Log notification (email would go here)
-        print(f"🔔 Alert triggered: {alert.symbol} {alert.condition.value} ${alert.target_price} (actual: ${triggered_price})")
+        if alert.condition == AlertCondition.EXPRESSION:
+            print(f"🔔 Alert triggered: {alert.expression} ({alert.symbol} at ${triggered_price})")
+        else:
+            print(f"🔔 Alert triggered: {alert.symbol} {alert.condition.value} {alert.target_price} (actual: ${triggered_price})")
     
     def _format_notification(self, alert: Alert, triggered_price: float) -> str:
         """Format the notification message."""
+        if alert.condition == AlertCondition.MOVE_PERCENT:
+            move = self.signals.percent_move(alert.symbol, alert.window_minutes * 60, triggered_price) or 0.0
+            emoji = "📈" if move >= 0 else "📉"
+            headline = f"*{alert.symbol}* moved {move:+.2f}% within {alert.window_minutes} minutes!"
+            target = f"Target Move: ±{alert.target_price:g}%"
+        elif alert.condition in (AlertCondition.RSI_ABOVE, AlertCondition.RSI_BELOW):
+            rsi = self.signals.rsi(alert.symbol, alert.timeframe)
+            above = alert.condition == AlertCondition.RSI_ABOVE
+            emoji = "📈" if above else "📉"
+            headline = f"*{alert.symbol}* RSI ({alert.timeframe}) is {rsi or 0:.1f}, {'above' if above else 'below'} your level!"
+            target = f"Target RSI: {alert.target_price:g}"
+        elif alert.condition == AlertCondition.VOLUME_ABOVE:
+            volume = self.signals.quote_volume(alert.symbol, alert.window_minutes * 60) or 0.0
+            emoji = "📊"
+            headline = f"*{alert.symbol}* traded ${volume:,.0f} within {alert.window_minutes} minutes!"
+            target = f"Target Volume: ${alert.target_price:,.0f}"
+        elif alert.condition == AlertCondition.EXPRESSION:
+            return self._format_expression_notification(alert)
+        else:
+            return self._format_price_notification(alert, triggered_price)
+        
+        message = f"""
+{emoji} *CryptoFlyt Alert Triggered!*
+
+{headline}
+
+{target}
+Current Price: ${triggered_price:,.2f}
+
+{f"Note: {alert.note}" if alert.note else ""}
+        """.strip()
+        
+        return message
+    
+    def _format_expression_notification(self, alert: Alert) -> str:
+        """Format the notification message for an expression alert."""
+        _, symbols = parse_expression(alert.expression)
+        prices = self.engine.graph.last_prices
+        price_lines = "\n".join(
+            f"{symbol}: ${prices[symbol]:,.2f}" for symbol in symbols if symbol in prices
+        )
+        
+        message = f"""
+🔔 *CryptoFlyt Alert Triggered!*
+
+Your condition is now true:
+`{alert.expression}`
+
+{price_lines}
+
+{f"Note: {alert.note}" if alert.note else ""}
+        """.strip()
+        
+        return message
+    
+    def _format_price_notification(self, alert: Alert, triggered_price: float) -> str:
+        """Format the notification message for an above/below alert."""
         direction = "above" if alert.condition == AlertCondition.ABOVE else "below"
         emoji = "📈" if alert.condition == AlertCondition.ABOVE else "📉"
         
@@ -110,15 +269,35 @@ Current Price: ${triggered_price:,.2f}
         
         return message
     
-    def get_active_alerts_for_user(self, user_id: int) -> List[Alert]:
+    async def get_active_alerts_for_user(self, user_id: int) -> List[Alert]:
         """Get all active alerts for a user."""
-        return self.db.query(Alert).filter(
-            Alert.user_id == user_id,
-            Alert.is_active == True
-        ).all()
+        result = await self.db.execute(
+            select(Alert).where(
+                Alert.user_id == user_id,
+                Alert.is_active == True
+            )
+        )
+        return result.scalars().all()
     
-    def get_triggered_history(self, user_id: int, limit: int = 50) -> List[AlertHistory]:
+    async def get_triggered_history(self, user_id: int, limit: int = 50) -> List[AlertHistory]:
         """Get alert trigger history for a user."""
-        return self.db.query(AlertHistory).filter(
-            AlertHistory.user_id == user_id
-        ).order_by(AlertHistory.triggered_at.desc()).limit(limit).all()
+        result = await self.db.execute(
+            select(AlertHistory).where(
+                AlertHistory.user_id == user_id
+            ).order_by(AlertHistory.triggered_at.desc()).limit(limit)
+        )
+        return result.scalars().all()
+
+
+async def check_alerts_on_tick(price_data: dict):
+    """
+    Check alerts for the ticked symbol.
+    
+    Registered as a price feed callback so alerts fire in real time.
+    """
+    # Advance the rolling windows with this tick before evaluating it
+    market_signals.add_tick(price_data['symbol'], price_data['price'], price_data.get('timestamp'))
+    
+    async with AsyncSessionLocal() as db:
+        checker = AlertChecker(db)
+        await checker.check_alerts(price_data['symbol'], price_data['price'], price_data.get('timestamp'))
@@ -0,0 +1,275 @@
+"""
+In-memory alert evaluation with re-arming.
+
+Active alerts are loaded once (and reloaded every
+``alert_engine_reload_seconds`` to pick up changes made by other workers)
+and kept per symbol, so evaluating a tick touches no database. The alert
+routes push their changes in directly.
+
+One-shot alerts leave the engine when they fire. Re-arming alerts are
+disarmed when they fire and re-armed once the watched value moves back past
+the target by the hysteresis band; ``cooldown_seconds`` is the minimum time
+between fires. This state lives only here. The database is written only when
+an alert actually fires, so a price oscillating around a target produces
+neither writes nor repeated notifications.
+
+After a restart, a re-arming alert with a ``triggered_at`` starts disarmed,
+with its cooldown counted from that fire.
+
+``evaluate`` only reports which alerts fire. Every process holds its own
+engine, so the caller claims each fire with a conditional update of the
+alert row, stores it, and only then applies it with ``mark_fired``; a fire
+claimed by another worker or a failed write leaves this engine unchanged. Route changes (and fires) made while a reload is awaiting its
+query are replayed on top of the reloaded state rather than overwritten.
+
+Expression alerts are compiled into a shared ``ExpressionGraph`` and indexed
+under every symbol they reference. They fire when the expression becomes
+true and re-arm when it is false again.
+"""
+import asyncio
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.alert import Alert, AlertCondition
+from app.services.alert_expressions import ExpressionError, ExpressionGraph, parse_expression
+from app.services.indicators import to_epoch_seconds
+from app.services.market_signals import MarketSignals, market_signals
+
+
+def cooldown_seconds(alert: Alert) -> float:
+    """Minimum seconds between fires of a re-arming alert."""
+    value = alert.cooldown_seconds
+    return settings.alert_rearm_cooldown_seconds if value is None else value
+
+
+class _AlertState:
+    """An alert definition and its firing state."""
+
+    __slots__ = ("alert", "armed", "last_fired", "root")
+
+    def __init__(self, alert: Alert, root=None):
+        self.alert = alert
+        self.armed = not (alert.rearm and alert.triggered_at is not None)
+        self.last_fired = to_epoch_seconds(alert.triggered_at) if alert.triggered_at else None
+        self.root = root  # Expression graph node for expression alerts
+
+    def check(self, price: float, signals: MarketSignals) -> bool:
+        if self.root is not None:
+            return self.root.value is True
+        return self.alert.check_condition(price, signals)
+
+    def check_rearm(self, price: float, signals: MarketSignals) -> bool:
+        if self.root is not None:
+            return self.root.value is False
+        return self.alert.check_rearm(price, self.hysteresis_percent, signals)
+
+    @property
+    def hysteresis_percent(self) -> float:
+        value = self.alert.hysteresis_percent
+        return settings.alert_rearm_hysteresis_percent if value is None else value
+
+    @property
+    def cooldown_seconds(self) -> float:
+        return cooldown_seconds(self.alert)
+
+
+class AlertEngine:
+    """Evaluates active alerts from memory, indexed by symbol."""
+
+    def __init__(self, signals: MarketSignals = market_signals, reload_seconds: Optional[float] = None):
+        """
+        Args:
+            signals: Price windows and indicators for non-price conditions
+            reload_seconds: Reload interval (defaults to
+                ``alert_engine_reload_seconds``; 0 loads only once)
+        """
+        self.signals = signals
+        self.reload_seconds = settings.alert_engine_reload_seconds if reload_seconds is None else reload_seconds
+        self.graph = ExpressionGraph(signals)
+        # Expression alerts appear under each symbol they reference
+        self._by_symbol: Dict[str, Dict[int, _AlertState]] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        # Changes made while a load is in flight, replayed after it
+        # (alert id -> upserted alert, or None when removed)
+        self._loading = False
+        self._pending: Dict[int, Optional[Alert]] = {}
+
+    @property
+    def alert_count(self) -> int:
+        return len({alert_id for states in self._by_symbol.values() for alert_id in states})
+
+    def _add(self, alert: Alert, graph: ExpressionGraph) -> Optional[_AlertState]:
+        """Index an alert, compiling its expression into ``graph``."""
+        if alert.condition != AlertCondition.EXPRESSION:
+            state = _AlertState(alert)
+            self._by_symbol.setdefault(alert.symbol, {})[alert.id] = state
+            return state
+
+        try:
+            _, symbols = parse_expression(alert.expression or "")
+            state = _AlertState(alert, graph.add(alert.id, alert.expression))
+        except ExpressionError as e:
+            print(f"⚠ Skipping alert {alert.id} with invalid expression: {e}")
+            return None
+        for symbol in symbols:
+            self._by_symbol.setdefault(symbol, {})[alert.id] = state
+        return state
+
+    def _needs_load(self) -> bool:
+        if self._loaded_at is None:
+            return True
+        return self.reload_seconds > 0 and time.monotonic() - self._loaded_at >= self.reload_seconds
+
+    async def ensure_loaded(self, db: AsyncSession):
+        """Load alerts if never loaded or the reload interval has passed."""
+        if not self._needs_load():
+            return
+        async with self._lock:
+            if self._needs_load():
+                await self.load(db)
+
+    async def load(self, db: AsyncSession):
+        """
+        Replace alert definitions with the active, untriggered alerts in the DB.
+
+        Firing state is kept for alerts that are still present, and upserts
+        and removals made while the query runs are applied on top.
+        """
+        self._loading = True
+        self._pending = {}
+        try:
+            result = await db.execute(
+                select(Alert).where(Alert.is_active == True, Alert.is_triggered == False)
+            )
+            alerts = result.scalars().all()
+        finally:
+            # Nothing below awaits, so no further changes can interleave
+            self._loading = False
+            pending, self._pending = self._pending, {}
+
+        previous = {
+            alert_id: state for states in self._by_symbol.values() for alert_id, state in states.items()
+        }
+        graph = ExpressionGraph(self.signals)
+        graph.last_prices = self.graph.last_prices
+        self._by_symbol = {}
+
+        for alert in alerts:
+            db.expunge(alert)
+            state = self._add(alert, graph)
+            old = previous.get(alert.id)
+            if state is not None and old is not None and old.alert.triggered_at == alert.triggered_at:
+                state.armed = old.armed
+                state.last_fired = old.last_fired
+
+        self.graph = graph
+        self._loaded_at = time.monotonic()
+
+        for alert_id, alert in pending.items():
+            if alert is None:
+                self.remove(alert_id)
+            else:
+                self.upsert(alert)
+
+    def upsert(self, alert: Alert):
+        """Add or replace an alert after it was created or edited."""
+        self._unindex(alert.id)
+        if alert.is_active and not alert.is_triggered:
+            self._add(alert, self.graph)
+        if self._loading:
+            self._pending[alert.id] = alert
+
+    def remove(self, alert_id: int):
+        """Drop an alert after it was deleted, deactivated or fired for good."""
+        self._unindex(alert_id)
+        if self._loading:
+            self._pending[alert_id] = None
+
+    def _unindex(self, alert_id: int):
+        for states in self._by_symbol.values():
+            states.pop(alert_id, None)
+        self.graph.remove(alert_id)
+
+    def evaluate(self, symbol: str, price: float, timestamp: Optional[datetime] = None) -> List[Alert]:
+        """
+        Evaluate a symbol's alerts against a tick.
+
+        Firing state is not changed here: the caller persists and notifies,
+        then calls ``mark_fired`` for each alert.
+
+        Args:
+            symbol: Trading pair
+            price: Tick price
+            timestamp: Tick time, used for cooldowns (defaults to now)
+
+        Returns:
+            Alerts that fire on this tick
+        """
+        self.graph.on_tick(symbol, price)
+
+        states = self._by_symbol.get(symbol)
+        if not states:
+            return []
+
+        now = to_epoch_seconds(timestamp or datetime.utcnow())
+        fired = []
+
+        for state in list(states.values()):
+            alert = state.alert
+
+            if not state.armed:
+                if not state.check_rearm(price, self.signals):
+                    continue
+                state.armed = True
+
+            if state.last_fired is not None and now - state.last_fired < state.cooldown_seconds:
+                continue
+            if not state.check(price, self.signals):
+                continue
+
+            fired.append(alert)
+
+        return fired
+
+    def mark_fired(self, alert: Alert, triggered_price: float, fired_at: datetime):
+        """
+        Apply a persisted fire: remove a one-shot alert, disarm a re-arming one.
+
+        Args:
+            alert: Alert returned by ``evaluate``
+            triggered_price: Price recorded for the fire
+            fired_at: Tick time of the fire
+        """
+        alert.is_triggered = not alert.rearm
+        alert.triggered_at = fired_at
+        alert.triggered_price = triggered_price
+
+        if not alert.rearm:
+            self.remove(alert.id)
+            return
+
+        state = next(
+            (states[alert.id] for states in self._by_symbol.values() if alert.id in states),
+            None
+        )
+        if state is not None:
+            state.armed = False
+            state.last_fired = to_epoch_seconds(fired_at)
+        if self._loading:
+            # Keep the reload from re-arming it from a pre-fire row
+            self._pending[alert.id] = alert
+
+    def clear(self):
+        self._by_symbol = {}
+        self.graph = ExpressionGraph(self.signals)
+        self._loaded_at = None
+
+
+# Global instance
+alert_engine = AlertEngine()
@@ -0,0 +1,320 @@
+"""
+Alert expressions compiled to a shared evaluation graph.
+
+An expression is a Python-syntax boolean over symbol prices, e.g.::
+
+    ETHUSDT > 4000 and BTCUSDT < 90000
+    ETHUSDT / BTCUSDT < 0.035
+    rsi(BTCUSDT, "1h") > 70 or abs(move(SOLUSDT, 15)) >= 3
+
+Symbols stand for their latest price; ``rsi(SYMBOL, timeframe)`` is the live
+RSI and ``move(SYMBOL, minutes)`` the signed percent move within the window.
+Only arithmetic, comparisons, ``and``/``or``/``not`` and these functions are
+accepted; the source is parsed with ``ast`` and never executed.
+
+Every expression is compiled into one graph shared by all alerts. Identical
+subexpressions (``ETHUSDT / BTCUSDT`` in several alerts) become a single
+node. Inputs are indexed by symbol, so a tick recomputes only the nodes
+downstream of that symbol. Each node caches its value between ticks and
+propagation stops wherever a value does not change. A value is None while
+any input it depends on is unknown.
+"""
+import ast
+import heapq
+import operator
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from app.config import settings
+from app.services.market_signals import MarketSignals
+
+MAX_EXPRESSION_NODES = 64
+
+_BINARY_OPS: Dict[type, Tuple[str, Callable]] = {
+    ast.Add: ("add", operator.add),
+    ast.Sub: ("sub", operator.sub),
+    ast.Mult: ("mul", operator.mul),
+    ast.Div: ("div", operator.truediv),
+}
+
+_COMPARE_OPS: Dict[type, Tuple[str, Callable]] = {
+    ast.Lt: ("lt", operator.lt),
+    ast.LtE: ("le", operator.le),
+    ast.Gt: ("gt", operator.gt),
+    ast.GtE: ("ge", operator.ge),
+}
+
+_OPERATORS: Dict[str, Callable] = {
+    **{name: fn for name, fn in _BINARY_OPS.values()},
+    **{name: fn for name, fn in _COMPARE_OPS.values()},
+    "neg": operator.neg,
+    "abs": abs,
+}
+
+
+class ExpressionError(ValueError):
+    """An alert expression is invalid."""
+
+
+def _check_symbol(node: ast.AST) -> str:
+    if not isinstance(node, ast.Name) or node.id not in settings.supported_symbols:
+        raise ExpressionError(
+            f"Expected a symbol. Available: {', '.join(settings.supported_symbols)}"
+        )
+    return node.id
+
+
+def parse_expression(expression: str) -> Tuple[ast.AST, List[str]]:
+    """
+    Parse and validate an expression.
+
+    Returns:
+        Tuple of (expression AST, referenced symbols in order of appearance)
+
+    Raises:
+        ExpressionError: Syntax, unsupported construct, unknown symbol or
+            a non-boolean result
+    """
+    try:
+        tree = ast.parse(expression.strip(), mode="eval").body
+    except SyntaxError as e:
+        raise ExpressionError(f"Invalid expression syntax: {e.msg}")
+
+    symbols: List[str] = []
+    count = 0
+
+    def visit(node: ast.AST) -> bool:
+        """Validate a subtree; returns whether it is boolean."""
+        nonlocal count
+        count += 1
+        if count > MAX_EXPRESSION_NODES:
+            raise ExpressionError(f"Expression is too long (max {MAX_EXPRESSION_NODES} terms)")
+
+        if isinstance(node, ast.BoolOp):
+            if not all(visit(v) for v in node.values):
+                raise ExpressionError("'and'/'or' operands must be comparisons")
+            return True
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            if not visit(node.operand):
+                raise ExpressionError("'not' operand must be a comparison")
+            return True
+        if isinstance(node, ast.Compare):
+            if not all(type(op) in _COMPARE_OPS for op in node.ops):
+                raise ExpressionError("Supported comparisons: <, <=, >, >=")
+            if any(visit(v) for v in [node.left, *node.comparators]):
+                raise ExpressionError("Comparison operands must be numbers")
+            return True
+        if isinstance(node, ast.BinOp):
+            if type(node.op) not in _BINARY_OPS:
+                raise ExpressionError("Supported arithmetic: +, -, *, /")
+            if visit(node.left) or visit(node.right):
+                raise ExpressionError("Arithmetic operands must be numbers")
+            return False
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            if visit(node.operand):
+                raise ExpressionError("Arithmetic operands must be numbers")
+            return False
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+            return False
+        if isinstance(node, ast.Name):
+            symbols.append(_check_symbol(node))
+            return False
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+            name, args = node.func.id, node.args
+            if name == "abs" and len(args) == 1:
+                if visit(args[0]):
+                    raise ExpressionError("abs() takes a number")
+                return False
+            if name == "rsi" and len(args) == 2:
+                symbols.append(_check_symbol(args[0]))
+                if not (isinstance(args[1], ast.Constant) and args[1].value in settings.indicator_timeframes):
+                    raise ExpressionError(
+                        f"rsi() timeframe must be one of: {', '.join(settings.indicator_timeframes)}"
+                    )
+                return False
+            if name == "move" and len(args) == 2:
+                symbols.append(_check_symbol(args[0]))
+                minutes = args[1]
+                if not (isinstance(minutes, ast.Constant) and isinstance(minutes.value, int) and 1 <= minutes.value <= 1440):
+                    raise ExpressionError("move() window must be 1-1440 minutes")
+                return False
+            raise ExpressionError("Supported functions: rsi(SYMBOL, timeframe), move(SYMBOL, minutes), abs(x)")
+        raise ExpressionError(f"Unsupported expression element: {type(node).__name__}")
+
+    if not visit(tree):
+        raise ExpressionError("Expression must be a comparison, e.g. ETHUSDT / BTCUSDT < 0.035")
+
+    return tree, list(dict.fromkeys(symbols))
+
+
+class _Node:
+    """A shared graph node with its cached value."""
+
+    __slots__ = ("id", "key", "op", "arg", "children", "parents", "level", "refs", "value")
+
+    def __init__(self, node_id: int, key: tuple, op: str, arg, children: List["_Node"]):
+        self.id = node_id
+        self.key = key
+        self.op = op
+        self.arg = arg  # symbol / constant / (symbol, param) for leaves
+        self.children = children
+        self.parents: Set["_Node"] = set()
+        self.level = 1 + max((c.level for c in children), default=-1)
+        self.refs = 0
+        self.value = None
+
+    def __lt__(self, other: "_Node") -> bool:
+        return self.id < other.id
+
+
+class ExpressionGraph:
+    """Hash-consed DAG of all alert expressions, indexed by input symbol."""
+
+    def __init__(self, signals: MarketSignals):
+        self.signals = signals
+        self.last_prices: Dict[str, float] = {}
+        self._nodes: Dict[tuple, _Node] = {}
+        self._inputs: Dict[str, Set[_Node]] = {}
+        self._roots: Dict[int, _Node] = {}
+        self._next_id = 0
+
+    @property
+    def node_count(self) -> int:
+        return len(self._nodes)
+
+    def add(self, alert_id: int, expression: str) -> _Node:
+        """Compile an alert's expression into the graph and return its root."""
+        self.remove(alert_id)
+        tree, _ = parse_expression(expression)
+        root = self._compile(tree)
+        root.refs += 1
+        self._roots[alert_id] = root
+        return root
+
+    def remove(self, alert_id: int):
+        """Drop an alert's expression, deleting nodes no longer used."""
+        root = self._roots.pop(alert_id, None)
+        if root is not None:
+            self._release(root)
+
+    def root(self, alert_id: int) -> Optional[_Node]:
+        return self._roots.get(alert_id)
+
+    def _release(self, node: _Node):
+        node.refs -= 1
+        if node.refs > 0:
+            return
+        del self._nodes[node.key]
+        if node.op in ("price", "rsi", "move"):
+            symbol = node.arg if node.op == "price" else node.arg[0]
+            self._inputs[symbol].discard(node)
+        for child in node.children:
+            child.parents.discard(node)
+            self._release(child)
+
+    def _intern(self, op: str, arg=None, children: Optional[List[_Node]] = None) -> _Node:
+        children = children or []
+        key = (op, arg, tuple(c.id for c in children))
+        node = self._nodes.get(key)
+        if node is not None:
+            return node
+
+        self._next_id += 1
+        node = _Node(self._next_id, key, op, arg, children)
+        for child in children:
+            child.refs += 1
+            child.parents.add(node)
+        self._nodes[key] = node
+
+        if op in ("price", "rsi", "move"):
+            symbol = arg if op == "price" else arg[0]
+            self._inputs.setdefault(symbol, set()).add(node)
+        node.value = self._compute(node)
+        return node
+
+    def _compile(self, tree: ast.AST) -> _Node:
+        if isinstance(tree, ast.BoolOp):
+            op = "and" if isinstance(tree.op, ast.And) else "or"
+            return self._intern(op, children=[self._compile(v) for v in tree.values])
+        if isinstance(tree, ast.UnaryOp):
+            op = "not" if isinstance(tree.op, ast.Not) else "neg"
+            return self._intern(op, children=[self._compile(tree.operand)])
+        if isinstance(tree, ast.Compare):
+            # a < b < c is (a < b) and (b < c), sharing b
+            operands = [self._compile(v) for v in [tree.left, *tree.comparators]]
+            pairs = [
+                self._intern(_COMPARE_OPS[type(op)][0], children=[operands[i], operands[i + 1]])
+                for i, op in enumerate(tree.ops)
+            ]
+            return pairs[0] if len(pairs) == 1 else self._intern("and", children=pairs)
+        if isinstance(tree, ast.BinOp):
+            op = _BINARY_OPS[type(tree.op)][0]
+            return self._intern(op, children=[self._compile(tree.left), self._compile(tree.right)])
+        if isinstance(tree, ast.Constant):
+            return self._intern("const", float(tree.value))
+        if isinstance(tree, ast.Name):
+            return self._intern("price", tree.id)
+
+        # Function call (validated by parse_expression)
+        name, args = tree.func.id, tree.args
+        if name == "abs":
+            return self._intern("abs", children=[self._compile(args[0])])
+        return self._intern(name, (args[0].id, args[1].value))
+
+    def _compute(self, node: _Node):
+        op = node.op
+        if op == "const":
+            return node.arg
+        if op == "price":
+            return self.last_prices.get(node.arg)
+        if op == "rsi":
+            return self.signals.rsi(*node.arg)
+        if op == "move":
+            symbol, minutes = node.arg
+            price = self.last_prices.get(symbol)
+            return self.signals.percent_move(symbol, minutes * 60, price) if price is not None else None
+
+        values = [c.value for c in node.children]
+        if op == "and":
+            if any(v is False for v in values):
+                return False
+            return True if all(v is True for v in values) else None
+        if op == "or":
+            if any(v is True for v in values):
+                return True
+            return False if all(v is False for v in values) else None
+        if any(v is None for v in values):
+            return None
+        if op == "not":
+            return not values[0]
+        if op == "div" and values[1] == 0:
+            return None
+        return _OPERATORS[op](*values)
+
+    def on_tick(self, symbol: str, price: float):
+        """
+        Feed a tick and recompute the nodes downstream of its symbol.
+
+        Nodes are recomputed in level order, so each is computed once per
+        tick after all of its changed children.
+        """
+        self.last_prices[symbol] = price
+        inputs = self._inputs.get(symbol)
+        if not inputs:
+            return
+
+        heap: List[Tuple[int, _Node]] = []
+        queued: Set[_Node] = set()
+        for node in inputs:
+            heapq.heappush(heap, (node.level, node))
+            queued.add(node)
+
+        while heap:
+            _, node = heapq.heappop(heap)
+            value = self._compute(node)
+            if value == node.value and type(value) is type(node.value):
+                continue
+            node.value = value
+            for parent in node.parents:
+                if parent not in queued:
+                    queued.add(parent)
+                    heapq.heappush(heap, (parent.level, parent))
@@ -0,0 +1,96 @@
+"""
+Binance WebSocket client for real-time price streaming.
+"""
+import json
+from typing import List
+
+import httpx
+
+from app.config import settings
+from app.services.exchange import ExchangeAdapter
+
+
+class BinanceWebSocketClient(ExchangeAdapter):
+    """
+    WebSocket client for Binance spot 24h ticker streams.
+
+    Subscribes to ``<symbol>@ticker`` on the combined stream endpoint, whose
+    messages wrap each event as ``{"stream": ..., "data": {...}}``.
+    """
+
+    name = "binance"
+
+    def __init__(self):
+        super().__init__(settings.binance_ws_url, settings.binance_rest_url)
+        self._request_id = 0
+
+    async def subscribe(self):
+        """Subscribe to the ticker stream of every symbol."""
+        self._request_id += 1
+        await self.ws.send_json({
+            "method": "SUBSCRIBE",
+            "params": [f"{symbol.lower()}@ticker" for symbol in self.symbols],
+            "id": self._request_id
+        })
+
+    def _ticker(self, symbol: str, event: dict, polled: bool = False) -> dict:
+        """Normalize a 24hrTicker event (stream field names)."""
+        return self.normalize(
+            symbol,
+            float(event.get("c", 0)),
+            event.get("E"),
+            polled=polled,
+            high_24h=float(event.get("h", 0)),
+            low_24h=float(event.get("l", 0)),
+            volume_24h=float(event.get("v", 0)),
+            change_24h_percent=float(event.get("P", 0))
+        )
+
+    async def fetch_tickers(self, http: httpx.AsyncClient) -> List[dict]:
+        """Fetch the 24h tickers of all symbols in one request."""
+        response = await http.get(
+            f"{self.rest_url}/api/v3/ticker/24hr",
+            params={"symbols": json.dumps(self.symbols, separators=(",", ":"))}
+        )
+        response.raise_for_status()
+
+        # REST tickers spell out the stream event's one-letter fields
+        return [
+            self._ticker(ticker["symbol"], {
+                "c": ticker.get("lastPrice", 0),
+                "E": ticker.get("closeTime"),
+                "h": ticker.get("highPrice", 0),
+                "l": ticker.get("lowPrice", 0),
+                "v": ticker.get("volume", 0),
+                "P": ticker.get("priceChangePercent", 0)
+            }, polled=True)
+            for ticker in response.json()
+            if ticker.get("symbol") in self.symbols
+        ]
+
+    async def _handle_message(self, raw_data: str):
+        """Process incoming WebSocket message."""
+        try:
+            data = json.loads(raw_data)
+            event = data.get("data", data)
+
+            # Handle 24h ticker events
+            if event.get("e") == "24hrTicker":
+                symbol = event.get("s")
+                if symbol in self.symbols:
+                    self.emit(self._ticker(symbol, event))
+
+            # Handle subscription replies
+            elif "id" in data and "result" in data:
+                print(f"✓ Binance subscription confirmed")
+            elif "error" in data:
+                print(f"✗ Binance subscription failed: {data['error']}")
+
+        except json.JSONDecodeError:
+            print(f"Invalid JSON received from Binance: {raw_data[:100]}")
+        except Exception as e:
+            print(f"Binance message handling error: {e}")
+
+
+# Global instance
+binance_client = BinanceWebSocketClient()
@@ -0,0 +1,230 @@
+"""
+Vectorized valuation of every user's portfolio at once.
+
+Used for daily snapshots and risk checks, where running the
+per-user ``get_portfolio`` logic would cost one query and one Python loop per
+user. Holdings are loaded in a single query into columnar NumPy arrays and
+valued against a price vector; per-user totals are reduced with ``bincount``.
+
+A holding whose symbol has no known price is never valued at 0: users with
+any such holding are flagged (``unpriced``) and left out of snapshots rather
+than recorded with a bogus total.
+"""
+from datetime import date, datetime
+from typing import Dict, Optional
+
+import numpy as np
+from sqlalchemy import case, delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.portfolio import PortfolioHolding, PortfolioSnapshot
+from app.models.price import PriceCandle, PriceHistory
+from app.services.kline_backfill import BYBIT_INTERVALS
+from app.services.price_feed import price_feed
+
+
+class BulkPortfolioValuation:
+    """Values all portfolios together with NumPy."""
+
+    def load_holdings(self, db: Session) -> Dict[str, np.ndarray]:
+        """
+        Load every holding in one query as columnar arrays.
+
+        Symbols are dictionary-encoded: ``symbol_idx`` indexes ``symbols``.
+        A missing average buy price is stored as NaN.
+        """
+        rows = db.execute(
+            select(
+                PortfolioHolding.user_id,
+                PortfolioHolding.symbol,
+                PortfolioHolding.amount,
+                PortfolioHolding.average_buy_price
+            )
+        ).all()
+
+        symbol_codes: Dict[str, int] = {}
+        count = len(rows)
+
+        user_ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=count)
+        symbol_idx = np.fromiter(
+            (symbol_codes.setdefault(r[1], len(symbol_codes)) for r in rows),
+            dtype=np.int64,
+            count=count
+        )
+        amounts = np.fromiter((r[2] for r in rows), dtype=np.float64, count=count)
+        avg_prices = np.fromiter(
+            (r[3] if r[3] is not None else np.nan for r in rows),
+            dtype=np.float64,
+            count=count
+        )
+
+        return {
+            "user_ids": user_ids,
+            "symbols": np.array(list(symbol_codes), dtype=object),
+            "symbol_idx": symbol_idx,
+            "amounts": amounts,
+            "avg_prices": avg_prices
+        }
+
+    def resolve_prices(self, db: Session) -> Dict[str, float]:
+        """
+        Current prices per symbol.
+
+        Live feed prices come first. Symbols without one (e.g. inside a Celery
+        worker, where the feed is not running) take the close of their latest
+        backfilled ``price_candles`` row, which the kline backfill keeps
+        current, and then the latest ``price_history`` row.
+
+        Candles of several intervals open at the same time (every 4h candle
+        start is also a 1m candle start); the finest interval is taken so
+        the choice does not depend on row order.
+        """
+        prices = {s: p['price'] for s, p in price_feed.get_current_prices().items()}
+
+        # Latest candle per symbol, the finest interval first among equal starts
+        interval_seconds = case(
+            {name: seconds for name, (_, seconds) in BYBIT_INTERVALS.items()},
+            value=PriceCandle.interval
+        )
+        ranked = select(
+            PriceCandle.symbol,
+            PriceCandle.close,
+            func.row_number().over(
+                partition_by=PriceCandle.symbol,
+                order_by=(PriceCandle.start.desc(), interval_seconds.asc())
+            ).label("rank")
+        ).subquery()
+        rows = db.execute(
+            select(ranked.c.symbol, ranked.c.close).where(ranked.c.rank == 1)
+        ).all()
+        for symbol, close in rows:
+            prices.setdefault(symbol, close)
+
+        latest = select(
+            PriceHistory.symbol,
+            func.max(PriceHistory.timestamp).label("timestamp")
+        ).group_by(PriceHistory.symbol).subquery()
+        rows = db.execute(
+            select(PriceHistory.symbol, PriceHistory.price).join(
+                latest,
+                (PriceHistory.symbol == latest.c.symbol) &
+                (PriceHistory.timestamp == latest.c.timestamp)
+            )
+        ).all()
+        for symbol, price in rows:
+            prices.setdefault(symbol, price)
+
+        return prices
+
+    def value(self, holdings: Dict[str, np.ndarray], prices: Dict[str, float]) -> Dict[str, np.ndarray]:
+        """
+        Value all holdings and reduce to per-user totals.
+
+        Follows the same rules as ``GET /api/portfolio``: only holdings with a
+        positive average buy price count towards cost, and P&L is zero for
+        users without any cost basis. Symbols missing from ``prices`` are
+        counted per user in ``unpriced`` instead of being valued.
+
+        Returns:
+            Dict of per-user arrays, aligned on ``user_ids``
+        """
+        price_vector = np.array(
+            [prices.get(symbol, np.nan) for symbol in holdings["symbols"]],
+            dtype=np.float64
+        )
+        amounts = holdings["amounts"]
+        avg_prices = holdings["avg_prices"]
+
+        users, user_idx = np.unique(holdings["user_ids"], return_inverse=True)
+        n_users = len(users)
+
+        holding_prices = price_vector[holdings["symbol_idx"]]
+        unpriced = np.isnan(holding_prices)
+        values = amounts * np.nan_to_num(holding_prices)
+        has_cost_basis = avg_prices > 0  # NaN compares False
+        costs = np.where(has_cost_basis, amounts * np.nan_to_num(avg_prices), 0.0)
+
+        total_value = np.bincount(user_idx, weights=values, minlength=n_users)
+        total_cost = np.bincount(user_idx, weights=costs, minlength=n_users)
+        with_cost = total_cost > 0
+
+        total_pnl = np.where(with_cost, total_value - total_cost, 0.0)
+        total_pnl_percent = np.divide(
+            total_pnl * 100, total_cost,
+            out=np.zeros(n_users),
+            where=with_cost
+        )
+
+        return {
+            "user_ids": users,
+            "total_value": total_value,
+            "total_cost": total_cost,
+            "total_pnl": total_pnl,
+            "total_pnl_percent": total_pnl_percent,
+            "holdings_count": np.bincount(user_idx, minlength=n_users),
+            "unpriced": np.bincount(user_idx, weights=unpriced, minlength=n_users).astype(np.int64)
+        }
+
+    def priced_only(self, valuation: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Drop users holding any symbol without a price."""
+        keep = valuation["unpriced"] == 0
+        return {column: values[keep] for column, values in valuation.items()}
+
+    def write_snapshots(self, db: Session, valuation: Dict[str, np.ndarray], snapshot_date: date) -> int:
+        """
+        Bulk-write one snapshot row per user, replacing any for that date.
+
+        Returns:
+            Number of snapshot rows written
+        """
+        rows = [
+            {
+                "user_id": user_id,
+                "snapshot_date": snapshot_date,
+                "total_value": round(value, 2),
+                "total_cost": round(cost, 2),
+                "total_pnl": round(pnl, 2),
+                "total_pnl_percent": round(pnl_percent, 2),
+                "holdings_count": count
+            }
+            for user_id, value, cost, pnl, pnl_percent, count in zip(
+                valuation["user_ids"].tolist(),
+                valuation["total_value"].tolist(),
+                valuation["total_cost"].tolist(),
+                valuation["total_pnl"].tolist(),
+                valuation["total_pnl_percent"].tolist(),
+                valuation["holdings_count"].tolist()
+            )
+        ]
+
+        db.execute(delete(PortfolioSnapshot).where(PortfolioSnapshot.snapshot_date == snapshot_date))
+        if rows:
+            db.execute(insert(PortfolioSnapshot), rows)
+        db.commit()
+        return len(rows)
+
+    def snapshot_all(self, db: Session, snapshot_date: Optional[date] = None) -> dict:
+        """
+        Value every portfolio and write the day's snapshots.
+
+        Users holding a symbol without any known price get no snapshot that
+        day rather than one valuing the holding at 0.
+        """
+        holdings = self.load_holdings(db)
+        valuation = self.value(holdings, self.resolve_prices(db))
+        priced = self.priced_only(valuation)
+        written = self.write_snapshots(db, priced, snapshot_date or datetime.utcnow().date())
+
+        skipped = len(valuation["user_ids"]) - len(priced["user_ids"])
+        if skipped:
+            print(f"⚠ Skipped {skipped} portfolio snapshots with unpriced holdings")
+
+        return {
+            "holdings_valued": len(holdings["amounts"]),
+            "snapshots_written": written,
+            "users_skipped_unpriced": skipped
+        }
+
+
+# Global instance
+bulk_valuation = BulkPortfolioValuation()
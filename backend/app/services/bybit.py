@@ -2,146 +2,121 @@
 Bybit WebSocket client for real-time price streaming.
 """
 import json
-import asyncio
-from datetime import datetime
-from typing import Dict, Callable, Optional
-import aiohttp
+import time
+from typing import List
+
+import httpx
 
 from app.config import settings
+from app.core.metrics import BYBIT_MESSAGES, BYBIT_TICK_LAG
+from app.services.exchange import ExchangeAdapter, from_exchange_ms
+from app.services.orderbook import OrderBookManager, order_books
+from app.services.trade_flow import TradeFlow, trade_flow
+
+# Bybit spot accepts at most 10 topics per subscribe request
+SUBSCRIBE_BATCH_SIZE = 10
 
 
-class BybitWebSocketClient:
+class BybitWebSocketClient(ExchangeAdapter):
     """
     WebSocket client for Bybit real-time market data.
     
     Connects to Bybit's public spot WebSocket and streams
-    real-time ticker data for configured symbols.
+    real-time ticker data for configured symbols, plus their order books
+    and public trades when ``orderbook_enabled`` / ``trades_enabled`` are set.
     """
     
-    def __init__(self):
-        self.ws_url = settings.bybit_ws_url
-        self.symbols = settings.supported_symbols
-        self.ws: Optional[aiohttp.ClientWebSocketResponse] = None
-        self.session: Optional[aiohttp.ClientSession] = None
-        self.running = False
-        self.prices: Dict[str, dict] = {}
-        self.callbacks: list[Callable] = []
-        self._reconnect_delay = 5
+    name = "bybit"
     
-    def add_callback(self, callback: Callable):
-        """Add a callback function to be called on price updates."""
-        self.callbacks.append(callback)
+    def __init__(self, books: OrderBookManager = order_books, trades: TradeFlow = trade_flow):
+        super().__init__(settings.bybit_ws_url, settings.bybit_rest_url)
+        self.books = books
+        self.trades = trades
     
-    def remove_callback(self, callback: Callable):
-        """Remove a callback function."""
-        if callback in self.callbacks:
-            self.callbacks.remove(callback)
+    def _topics(self) -> list[str]:
+        topics = [f"tickers.{symbol}" for symbol in self.symbols]
+        if settings.orderbook_enabled:
+            topics += [f"orderbook.{settings.orderbook_depth}.{symbol}" for symbol in self.symbols]
+        if settings.trades_enabled:
+            topics += [f"publicTrade.{symbol}" for symbol in self.symbols]
+        return topics
     
-    async def _notify_callbacks(self, price_data: dict):
-        """Notify all registered callbacks of price update."""
-        for callback in self.callbacks:
-            try:
-                if asyncio.iscoroutinefunction(callback):
-                    await callback(price_data)
-                else:
-                    callback(price_data)
-            except Exception as e:
-                print(f"Callback error: {e}")
+    async def _subscribe(self, topics: list[str], op: str = "subscribe"):
+        for i in range(0, len(topics), SUBSCRIBE_BATCH_SIZE):
+            await self.ws.send_json({"op": op, "args": topics[i:i + SUBSCRIBE_BATCH_SIZE]})
     
-    def get_current_prices(self) -> Dict[str, dict]:
-        """Get the latest cached prices."""
-        return self.prices.copy()
+    async def _resync_book(self, symbol: str):
+        """Resubscribe to a book's stream so Bybit sends a fresh snapshot."""
+        topic = f"orderbook.{settings.orderbook_depth}.{symbol}"
+        print(f"⚠ Order book gap for {symbol}, resubscribing")
+        await self._subscribe([topic], "unsubscribe")
+        await self._subscribe([topic])
     
-    def get_price(self, symbol: str) -> Optional[dict]:
-        """Get the latest price for a specific symbol."""
-        return self.prices.get(symbol)
-    
-    async def connect(self):
-        """Establish WebSocket connection to Bybit."""
-        if self.session is None:
-            self.session = aiohttp.ClientSession()
-        
-        try:
-            self.ws = await self.session.ws_connect(self.ws_url)
-            print(f"✓ Connected to Bybit WebSocket")
-            
-            # Subscribe to ticker streams for all symbols
-            subscribe_msg = {
-                "op": "subscribe",
-                "args": [f"tickers.{symbol}" for symbol in self.symbols]
-            }
-            await self.ws.send_json(subscribe_msg)
-            print(f"✓ Subscribed to: {', '.join(self.symbols)}")
-            
-            return True
-        except Exception as e:
-            print(f"✗ Failed to connect to Bybit: {e}")
-            return False
+    async def subscribe(self):
+        """Subscribe to ticker (order book, trade) streams for all symbols."""
+        # Books rebuild from the snapshots sent on subscribe
+        self.books.reset()
+        await self._subscribe(self._topics())
     
-    async def disconnect(self):
-        """Close WebSocket connection."""
-        self.running = False
-        if self.ws:
-            await self.ws.close()
-        if self.session:
-            await self.session.close()
-        print("✗ Disconnected from Bybit WebSocket")
+    def _ticker(self, ticker_data: dict, exchange_ms: int = None, polled: bool = False) -> dict:
+        """Normalize a v5 spot ticker (stream and REST share the fields)."""
+        return self.normalize(
+            ticker_data["symbol"],
+            float(ticker_data.get("lastPrice", 0)),
+            exchange_ms,
+            polled=polled,
+            high_24h=float(ticker_data.get("highPrice24h", 0)),
+            low_24h=float(ticker_data.get("lowPrice24h", 0)),
+            volume_24h=float(ticker_data.get("volume24h", 0)),
+            change_24h_percent=float(ticker_data.get("price24hPcnt", 0)) * 100
+        )
     
-    async def listen(self):
-        """Listen for incoming WebSocket messages."""
-        self.running = True
+    async def fetch_tickers(self, http: httpx.AsyncClient) -> List[dict]:
+        """Fetch all spot tickers in one request and keep the tracked symbols."""
+        response = await http.get(
+            f"{self.rest_url}/v5/market/tickers",
+            params={"category": "spot"}
+        )
+        response.raise_for_status()
+        data = response.json()
+        if data.get("retCode") != 0:
+            raise RuntimeError(f"Bybit tickers request failed: {data.get('retMsg')}")
         
-        while self.running:
-            try:
-                if self.ws is None or self.ws.closed:
-                    success = await self.connect()
-                    if not success:
-                        await asyncio.sleep(self._reconnect_delay)
-                        continue
-                
-                async for msg in self.ws:
-                    if msg.type == aiohttp.WSMsgType.TEXT:
-                        await self._handle_message(msg.data)
-                    elif msg.type == aiohttp.WSMsgType.ERROR:
-                        print(f"WebSocket error: {self.ws.exception()}")
-                        break
-                    elif msg.type == aiohttp.WSMsgType.CLOSED:
-                        print("WebSocket closed by server")
-                        break
-                
-            except Exception as e:
-                print(f"WebSocket listen error: {e}")
-            
-            if self.running:
-                print(f"Reconnecting in {self._reconnect_delay}s...")
-                await asyncio.sleep(self._reconnect_delay)
+        return [
+            self._ticker(ticker_data, data.get("time"), polled=True)
+            for ticker_data in data["result"]["list"]
+            if ticker_data.get("symbol") in self.symbols
+        ]
     
     async def _handle_message(self, raw_data: str):
         """Process incoming WebSocket message."""
         try:
             data = json.loads(raw_data)
+            topic = data.get("topic", "")
+            
+            # Handle public trades (batched per message)
+            if topic.startswith("publicTrade."):
+                self.trades.add_trades(topic[len("publicTrade."):], data.get("data", []))
+            
+            # Handle order book snapshots and deltas
+            elif topic.startswith("orderbook."):
+                symbol = topic.rsplit(".", 1)[-1]
+                exchange_ts = from_exchange_ms(data["ts"]) if data.get("ts") else None
+                if not self.books.handle(symbol, data, exchange_ts):
+                    await self._resync_book(symbol)
             
             # Handle ticker updates
-            if data.get("topic", "").startswith("tickers."):
+            elif topic.startswith("tickers."):
                 ticker_data = data.get("data", {})
                 symbol = ticker_data.get("symbol")
                 
                 if symbol:
-                    price_data = {
-                        "symbol": symbol,
-                        "price": float(ticker_data.get("lastPrice", 0)),
-                        "high_24h": float(ticker_data.get("highPrice24h", 0)),
-                        "low_24h": float(ticker_data.get("lowPrice24h", 0)),
-                        "volume_24h": float(ticker_data.get("volume24h", 0)),
-                        "change_24h_percent": float(ticker_data.get("price24hPcnt", 0)) * 100,
-                        "timestamp": datetime.utcnow()
-                    }
-                    
-                    # Update cache
-                    self.prices[symbol] = price_data
+                    if data.get("ts"):
+                        BYBIT_TICK_LAG.labels(symbol).observe(max(0.0, time.time() - data["ts"] / 1000))
+                    BYBIT_MESSAGES.labels(symbol).inc()
                     
-                    # Notify callbacks
-                    await self._notify_callbacks(price_data)
+                    # Hand off to the price feed without waiting on subscribers
+                    self.emit(self._ticker(ticker_data, data.get("ts")))
             
             # Handle subscription confirmation
             elif data.get("op") == "subscribe":
@@ -149,7 +124,7 @@ class BybitWebSocketClient:
                     print(f"✓ Subscription confirmed")
                 else:
                     print(f"✗ Subscription failed: {data.get('ret_msg')}")
-                    
+        
         except json.JSONDecodeError:
             print(f"Invalid JSON received: {raw_data[:100]}")
         except Exception as e:
@@ -0,0 +1,177 @@
+"""
+Exchange adapter interface for streaming market data.
+
+An adapter owns one venue's WebSocket connection: it connects, subscribes,
+reconnects after failures and normalizes the venue's ticker messages into
+tick dicts, which it hands to ``sink`` (the consolidated ``PriceFeed``).
+Adapters can also fetch every symbol's ticker over REST in one request
+(``fetch_tickers``), which the feed polls while a stream is stale.
+Normalized ticks carry::
+
+    symbol, price, high_24h, low_24h, volume_24h, change_24h_percent,
+    exchange, exchange_ts, received_at, polled
+
+``polled`` is True for ticks fetched over REST rather than streamed.
+
+Timestamps are naive UTC datetimes; ``exchange_ts`` falls back to the
+receipt time when the venue sends none.
+"""
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import aiohttp
+import httpx
+
+from app.config import settings
+
+
+def from_exchange_ms(ms: int) -> datetime:
+    """Convert a venue's epoch-millisecond timestamp to naive UTC."""
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc).replace(tzinfo=None)
+
+
+class ExchangeAdapter:
+    """
+    Base class for venue WebSocket clients.
+
+    Subclasses set ``name``, send their subscriptions in ``subscribe`` and
+    parse messages in ``_handle_message``, calling ``emit`` for each tick.
+    """
+
+    name: str = ""
+
+    def __init__(self, ws_url: str, rest_url: str = "", symbols: Optional[List[str]] = None):
+        self.ws_url = ws_url
+        self.rest_url = rest_url
+        self.symbols = symbols or settings.supported_symbols
+        self.ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.running = False
+        self.prices: Dict[str, dict] = {}  # latest tick per symbol from this venue
+        self.sink: Optional[Callable[[dict], None]] = None
+        self._reconnect_delay = 5
+
+    @property
+    def connected(self) -> bool:
+        return self.ws is not None and not self.ws.closed
+
+    def get_current_prices(self) -> Dict[str, dict]:
+        """Get this venue's latest ticks."""
+        return self.prices.copy()
+
+    def get_price(self, symbol: str) -> Optional[dict]:
+        """Get this venue's latest tick for a symbol."""
+        return self.prices.get(symbol)
+
+    def emit(self, tick: dict):
+        """Record a normalized tick and pass it on without awaiting anyone."""
+        self.prices[tick["symbol"]] = tick
+        if self.sink is not None:
+            self.sink(tick)
+
+    def normalize(
+        self,
+        symbol: str,
+        price: float,
+        exchange_ms: Optional[int] = None,
+        polled: bool = False,
+        **fields
+    ) -> dict:
+        """
+        Build a normalized tick.
+
+        Args:
+            symbol: Trading pair in the app's format (e.g. "BTCUSDT")
+            price: Last traded price
+            exchange_ms: Venue timestamp in epoch milliseconds
+            polled: Whether the tick came from a REST poll
+            **fields: high_24h, low_24h, volume_24h, change_24h_percent
+        """
+        received_at = datetime.utcfromtimestamp(time.time())
+        return {
+            "symbol": symbol,
+            "price": price,
+            "high_24h": fields.get("high_24h"),
+            "low_24h": fields.get("low_24h"),
+            "volume_24h": fields.get("volume_24h"),
+            "change_24h_percent": fields.get("change_24h_percent"),
+            "exchange": self.name,
+            "exchange_ts": from_exchange_ms(exchange_ms) if exchange_ms else received_at,
+            "received_at": received_at,
+            "polled": polled
+        }
+
+    async def subscribe(self):
+        """Send the venue's subscribe messages on a fresh connection."""
+        raise NotImplementedError
+
+    async def _handle_message(self, raw_data: str):
+        """Parse one WebSocket text message."""
+        raise NotImplementedError
+
+    async def fetch_tickers(self, http: httpx.AsyncClient) -> List[dict]:
+        """
+        Fetch the tickers of all symbols over REST in a single request.
+
+        Args:
+            http: Shared (pooled) HTTP client
+
+        Returns:
+            Normalized ticks with ``polled`` set
+        """
+        raise NotImplementedError
+
+    async def connect(self) -> bool:
+        """Establish the WebSocket connection and subscribe."""
+        if self.session is None:
+            self.session = aiohttp.ClientSession()
+
+        try:
+            self.ws = await self.session.ws_connect(self.ws_url)
+            print(f"✓ Connected to {self.name} WebSocket")
+            await self.subscribe()
+            print(f"✓ Subscribed to {self.name}: {', '.join(self.symbols)}")
+            return True
+        except Exception as e:
+            print(f"✗ Failed to connect to {self.name}: {e}")
+            return False
+
+    async def disconnect(self):
+        """Close the WebSocket connection."""
+        self.running = False
+        if self.ws:
+            await self.ws.close()
+        if self.session:
+            await self.session.close()
+        print(f"✗ Disconnected from {self.name} WebSocket")
+
+    async def listen(self):
+        """Listen for incoming WebSocket messages, reconnecting on failure."""
+        self.running = True
+
+        while self.running:
+            try:
+                if self.ws is None or self.ws.closed:
+                    success = await self.connect()
+                    if not success:
+                        await asyncio.sleep(self._reconnect_delay)
+                        continue
+
+                async for msg in self.ws:
+                    if msg.type == aiohttp.WSMsgType.TEXT:
+                        await self._handle_message(msg.data)
+                    elif msg.type == aiohttp.WSMsgType.ERROR:
+                        print(f"{self.name} WebSocket error: {self.ws.exception()}")
+                        break
+                    elif msg.type == aiohttp.WSMsgType.CLOSED:
+                        print(f"{self.name} WebSocket closed by server")
+                        break
+
+            except Exception as e:
+                print(f"{self.name} WebSocket listen error: {e}")
+
+            if self.running:
+                print(f"Reconnecting to {self.name} in {self._reconnect_delay}s...")
+                await asyncio.sleep(self._reconnect_delay)
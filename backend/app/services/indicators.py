@@ -0,0 +1,466 @@
+"""
+Streaming candles and technical indicators.
+
+Ticks are aggregated into OHLCV candles per symbol and timeframe. When a
+candle closes its close is pushed into incremental indicator state (SMA,
+EMA, RSI, Bollinger Bands); VWAP accumulates per tick over the UTC day.
+Every update is O(1): rolling windows keep running sums instead of
+re-reading the window. Snapshots report "live" values that include the
+forming candle, computed from the closed state without mutating it.
+
+Candle series can be exported and restored (``export_state`` /
+``restore_state``) so a restart resumes from the last snapshot instead of
+rebuilding indicators from scratch.
+
+Per-candle volume is the volume traded between ticks, taken from the public
+trade stream (``TradeFlow``). Symbols without trade data fall back to the
+increases of the ticker's rolling 24h volume.
+"""
+import math
+from collections import deque
+from datetime import datetime, timezone
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.services.trade_flow import TradeFlow, trade_flow
+
+TIMEFRAME_SECONDS = {
+    "1m": 60,
+    "5m": 300,
+    "15m": 900,
+    "1h": 3600,
+    "4h": 14400,
+    "1d": 86400
+}
+
+
+def to_epoch_seconds(value: datetime) -> float:
+    """Naive datetimes are taken as UTC, like the rest of the app."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class SMA:
+    """Simple moving average with a running sum."""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.window: Deque[float] = deque()
+        self.total = 0.0
+
+    def update(self, value: float):
+        self.window.append(value)
+        self.total += value
+        if len(self.window) > self.period:
+            self.total -= self.window.popleft()
+
+    def peek(self, value: float) -> Optional[float]:
+        """The average if ``value`` were the next close."""
+        if len(self.window) + 1 < self.period:
+            return None
+        evicted = self.window[0] if len(self.window) == self.period else 0.0
+        return (self.total - evicted + value) / self.period
+
+
+class EMA:
+    """Exponential moving average seeded with the SMA of the first period."""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.alpha = 2 / (period + 1)
+        self.count = 0
+        self.value: Optional[float] = None
+
+    def _next(self, value: float) -> float:
+        if self.value is None:
+            return value
+        if self.count < self.period:
+            return (self.value * self.count + value) / (self.count + 1)
+        return self.value + self.alpha * (value - self.value)
+
+    def update(self, value: float):
+        self.value = self._next(value)
+        self.count += 1
+
+    def peek(self, value: float) -> Optional[float]:
+        if self.count + 1 < self.period:
+            return None
+        return self._next(value)
+
+
+class RSI:
+    """Relative Strength Index with Wilder smoothing."""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.count = 0  # price changes seen
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.last: Optional[float] = None
+
+    def _next(self, value: float) -> Optional[Tuple[float, float]]:
+        if self.last is None:
+            return None
+        change = value - self.last
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+        n = min(self.count + 1, self.period)
+        return (
+            (self.avg_gain * (n - 1) + gain) / n,
+            (self.avg_loss * (n - 1) + loss) / n
+        )
+
+    @staticmethod
+    def _rsi(avg_gain: float, avg_loss: float) -> float:
+        if avg_loss == 0:
+            return 100.0 if avg_gain > 0 else 50.0
+        return 100 - 100 / (1 + avg_gain / avg_loss)
+
+    def update(self, value: float):
+        averages = self._next(value)
+        if averages is not None:
+            self.avg_gain, self.avg_loss = averages
+            self.count += 1
+        self.last = value
+
+    def peek(self, value: float) -> Optional[float]:
+        averages = self._next(value)
+        if averages is None or self.count + 1 < self.period:
+            return None
+        return self._rsi(*averages)
+
+
+class Bollinger:
+    """
+    Bollinger Bands from running sums of the window and its squares.
+
+    The sums are recomputed from the window once per ``period`` updates
+    (amortized O(1)) so floating point drift cannot accumulate.
+    """
+
+    def __init__(self, period: int, stddev: float):
+        self.period = period
+        self.stddev = stddev
+        self.window: Deque[float] = deque()
+        self.total = 0.0
+        self.total_sq = 0.0
+        self._updates = 0
+
+    def update(self, value: float):
+        self.window.append(value)
+        self.total += value
+        self.total_sq += value * value
+        if len(self.window) > self.period:
+            evicted = self.window.popleft()
+            self.total -= evicted
+            self.total_sq -= evicted * evicted
+
+        self._updates += 1
+        if self._updates % self.period == 0:
+            self.total = math.fsum(self.window)
+            self.total_sq = math.fsum(v * v for v in self.window)
+
+    def peek(self, value: float) -> Optional[Tuple[float, float, float]]:
+        """(lower, middle, upper) if ``value`` were the next close."""
+        if len(self.window) + 1 < self.period:
+            return None
+        evicted = self.window[0] if len(self.window) == self.period else 0.0
+        mean = (self.total - evicted + value) / self.period
+        mean_sq = (self.total_sq - evicted * evicted + value * value) / self.period
+        band = self.stddev * math.sqrt(max(mean_sq - mean * mean, 0.0))
+        return mean - band, mean, mean + band
+
+
+class VWAP:
+    """Volume-weighted average price over the current UTC day."""
+
+    def __init__(self):
+        self.day: Optional[int] = None
+        self.price_volume = 0.0
+        self.volume = 0.0
+
+    def update(self, ts: float, price: float, volume: float):
+        day = int(ts // 86400)
+        if day != self.day:
+            self.day = day
+            self.price_volume = 0.0
+            self.volume = 0.0
+        self.price_volume += price * volume
+        self.volume += volume
+
+    @property
+    def value(self) -> Optional[float]:
+        return self.price_volume / self.volume if self.volume > 0 else None
+
+
+class Candle:
+    """An OHLCV candle."""
+
+    __slots__ = ("start", "open", "high", "low", "close", "volume")
+
+    def __init__(self, start: float, price: float, volume: float = 0.0):
+        self.start = start
+        self.open = self.high = self.low = self.close = price
+        self.volume = volume
+
+    def update(self, price: float, volume: float):
+        self.high = max(self.high, price)
+        self.low = min(self.low, price)
+        self.close = price
+        self.volume += volume
+
+    def to_row(self) -> list:
+        return [self.start, self.open, self.high, self.low, self.close, self.volume]
+
+    @classmethod
+    def from_row(cls, row: list) -> "Candle":
+        candle = cls(row[0], row[1], row[5])
+        candle.high, candle.low, candle.close = row[2], row[3], row[4]
+        return candle
+
+    def to_dict(self) -> dict:
+        return {
+            "start": datetime.utcfromtimestamp(self.start),
+            "open": self.open,
+            "high": self.high,
+            "low": self.low,
+            "close": self.close,
+            "volume": self.volume
+        }
+
+
+class CandleSeries:
+    """Candles and indicator state for one symbol and timeframe."""
+
+    def __init__(self, timeframe: str):
+        self.timeframe = timeframe
+        self.seconds = TIMEFRAME_SECONDS[timeframe]
+        self.current: Optional[Candle] = None
+        self.closed: Deque[Candle] = deque(maxlen=settings.candle_history_size)
+        self.sma = SMA(settings.indicator_sma_period)
+        self.ema = EMA(settings.indicator_ema_period)
+        self.rsi = RSI(settings.indicator_rsi_period)
+        self.bollinger = Bollinger(settings.indicator_bollinger_period, settings.indicator_bollinger_stddev)
+        # Flat candles filled for a gap; enough to roll every window over
+        self._max_gap = 2 * max(self.sma.period, self.ema.period, self.rsi.period, self.bollinger.period)
+
+    def _close(self, candle: Candle):
+        self.closed.append(candle)
+        self.sma.update(candle.close)
+        self.ema.update(candle.close)
+        self.rsi.update(candle.close)
+        self.bollinger.update(candle.close)
+
+    def add(self, ts: float, price: float, volume: float) -> bool:
+        """
+        Add a tick.
+
+        Returns:
+            True if this tick closed the previous candle
+        """
+        start = ts - ts % self.seconds
+        current = self.current
+
+        if current is None:
+            self.current = Candle(start, price, volume)
+            return False
+
+        if start <= current.start:
+            # Same candle, or a late tick for an already closed one
+            current.update(price, volume)
+            return False
+
+        self._close(current)
+        # Quiet periods produce flat candles so windows keep their time span
+        gap = min(int((start - current.start) // self.seconds) - 1, self._max_gap)
+        for i in range(gap, 0, -1):
+            self._close(Candle(start - i * self.seconds, current.close))
+        self.current = Candle(start, price, volume)
+        return True
+
+    def export(self) -> dict:
+        """Closed and forming candles as plain rows."""
+        return {
+            "closed": [candle.to_row() for candle in self.closed],
+            "current": self.current.to_row() if self.current else None
+        }
+
+    def restore(self, state: dict):
+        """Replay exported candles into a fresh series, rebuilding indicator state."""
+        for row in state["closed"]:
+            self._close(Candle.from_row(row))
+        if state["current"] is not None:
+            self.current = Candle.from_row(state["current"])
+
+    def snapshot(self) -> dict:
+        """Live indicator values including the forming candle."""
+        close = self.current.close if self.current else None
+        bands = self.bollinger.peek(close) if close is not None else None
+        return {
+            "timeframe": self.timeframe,
+            "candle": self.current.to_dict() if self.current else None,
+            "candles_closed": len(self.closed),
+            "sma": self.sma.peek(close) if close is not None else None,
+            "ema": self.ema.peek(close) if close is not None else None,
+            "rsi": self.rsi.peek(close) if close is not None else None,
+            "bollinger_lower": bands[0] if bands else None,
+            "bollinger_middle": bands[1] if bands else None,
+            "bollinger_upper": bands[2] if bands else None
+        }
+
+
+class IndicatorEngine:
+    """
+    Maintains candles and indicators for every symbol and timeframe.
+
+    Register ``on_price_update`` as a price feed callback. Listeners are
+    called with ``(symbol, snapshot)`` whenever a candle closes.
+    """
+
+    def __init__(self, timeframes: List[str], trades: Optional[TradeFlow] = None):
+        """
+        Args:
+            timeframes: Candle timeframes to maintain
+            trades: Source of traded volume (falls back to 24h volume deltas)
+        """
+        self.timeframes = timeframes
+        self.trades = trades
+        self.series: Dict[str, Dict[str, CandleSeries]] = {}
+        self.vwap: Dict[str, VWAP] = {}
+        self.listeners: List[Callable] = []
+        self._last_volume: Dict[str, float] = {}
+        self._last_traded: Dict[str, float] = {}
+
+    def add_listener(self, callback: Callable):
+        """Add an async callback called when a candle closes."""
+        self.listeners.append(callback)
+
+    def _series_for(self, symbol: str) -> Dict[str, CandleSeries]:
+        series = self.series.get(symbol)
+        if series is None:
+            series = {tf: CandleSeries(tf) for tf in self.timeframes}
+            self.series[symbol] = series
+            self.vwap[symbol] = VWAP()
+        return series
+
+    def add_tick(
+        self,
+        symbol: str,
+        ts: float,
+        price: float,
+        volume_24h: Optional[float] = None,
+        traded_volume: Optional[float] = None
+    ) -> List[str]:
+        """
+        Apply one tick.
+
+        Args:
+            symbol: Trading pair
+            ts: Tick time in epoch seconds
+            price: Tick price
+            volume_24h: Ticker's rolling 24h volume
+            traded_volume: Cumulative traded volume; used instead of
+                ``volume_24h`` when given
+
+        Returns:
+            Timeframes whose candle closed on this tick
+        """
+        volume = 0.0
+        if traded_volume is not None:
+            last = self._last_traded.get(symbol)
+            if last is not None and traded_volume > last:
+                volume = traded_volume - last
+            self._last_traded[symbol] = traded_volume
+        elif volume_24h is not None:
+            last = self._last_volume.get(symbol)
+            if last is not None and volume_24h > last:
+                volume = volume_24h - last
+            self._last_volume[symbol] = volume_24h
+
+        series = self._series_for(symbol)
+        self.vwap[symbol].update(ts, price, volume)
+        return [tf for tf, s in series.items() if s.add(ts, price, volume)]
+
+    async def on_price_update(self, price_data: dict):
+        """Price feed callback."""
+        symbol = price_data.get('symbol')
+        price = price_data.get('price')
+        if not symbol or not price:
+            return
+
+        ts = to_epoch_seconds(price_data.get('timestamp') or datetime.utcnow())
+        traded = self.trades.cumulative_volume(symbol) if self.trades is not None else None
+        closed = self.add_tick(symbol, ts, price, price_data.get('volume_24h'), traded)
+
+        if closed and self.listeners:
+            snapshot = self.snapshot(symbol, closed)
+            for listener in self.listeners:
+                try:
+                    await listener(symbol, snapshot)
+                except Exception as e:
+                    print(f"Indicator listener error: {e}")
+
+    def snapshot(self, symbol: str, timeframes: Optional[List[str]] = None) -> Optional[dict]:
+        """
+        Current candles and indicator values for a symbol.
+
+        Args:
+            symbol: Trading pair
+            timeframes: Limit to these timeframes (default: all)
+
+        Returns:
+            Dict with ``vwap`` and one entry per timeframe, or None if no
+            ticks have been seen for the symbol
+        """
+        series = self.series.get(symbol)
+        if series is None:
+            return None
+        return {
+            "symbol": symbol,
+            "vwap": self.vwap[symbol].value,
+            "timeframes": [
+                s.snapshot() for tf, s in series.items()
+                if timeframes is None or tf in timeframes
+            ]
+        }
+
+    def export_state(self) -> dict:
+        """Candles and VWAP accumulators per symbol, JSON-serializable."""
+        return {
+            symbol: {
+                "vwap": [self.vwap[symbol].day, self.vwap[symbol].price_volume, self.vwap[symbol].volume],
+                "timeframes": {tf: s.export() for tf, s in series.items()}
+            }
+            for symbol, series in self.series.items()
+        }
+
+    def restore_state(self, state: dict) -> int:
+        """
+        Restore candles exported by ``export_state``.
+
+        Symbols that already have ticks are left alone, as are timeframes
+        that are no longer configured.
+
+        Returns:
+            Number of symbols restored
+        """
+        restored = 0
+        for symbol, saved in state.items():
+            if symbol in self.series:
+                continue
+            series = self._series_for(symbol)
+            for tf, s in series.items():
+                if tf in saved["timeframes"]:
+                    s.restore(saved["timeframes"][tf])
+            vwap = self.vwap[symbol]
+            vwap.day, vwap.price_volume, vwap.volume = saved["vwap"]
+            restored += 1
+        return restored
+
+    def get(self, symbol: str, timeframe: str) -> Optional[CandleSeries]:
+        """The candle series for a symbol and timeframe, if tracked."""
+        return self.series.get(symbol, {}).get(timeframe)
+
+
+# Global instance
+indicator_engine = IndicatorEngine(settings.indicator_timeframes, trade_flow)
@@ -0,0 +1,293 @@
+"""
+Historical candle backfill from Bybit's kline REST API.
+
+For every tracked symbol and each interval in ``kline_backfill_days`` the
+backfill keeps ``price_candles`` filled from ``days`` ago up to now. Each
+series (symbol and interval) resumes from its last stored candle, which is
+fetched again because it may still have been forming. The missing range is
+split into windows of at most ``KLINE_LIMIT`` candles, and the windows of
+all series are fetched concurrently over one pooled HTTP client, bounded by
+``kline_backfill_concurrency`` requests in flight and
+``kline_backfill_rate_per_second`` request starts. Rate-limited requests are
+retried with backoff. Results are written with one bulk insert per series.
+Series fail on their own: a series with any failed window is logged and
+skipped (and retried on the next run) while the others are stored.
+
+Runs at startup and every ``kline_backfill_interval_seconds`` after that
+(one request per series once caught up). Symbols added to
+``supported_symbols`` have no stored candles, so their first run fills the
+whole window; ``request([symbol])`` schedules that fill on demand, e.g. when
+price history is asked for a symbol with no candles yet.
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import KLINE_BACKFILL_CANDLES, KLINE_BACKFILL_REQUESTS
+from app.models.price import PriceCandle
+from app.services.exchange import from_exchange_ms
+
+KLINE_LIMIT = 1000  # candles per request (Bybit maximum)
+MAX_ATTEMPTS = 4  # per request, when rate limited
+
+# Bybit interval codes and lengths in seconds
+BYBIT_INTERVALS = {
+    "1m": ("1", 60),
+    "3m": ("3", 180),
+    "5m": ("5", 300),
+    "15m": ("15", 900),
+    "30m": ("30", 1800),
+    "1h": ("60", 3600),
+    "2h": ("120", 7200),
+    "4h": ("240", 14400),
+    "6h": ("360", 21600),
+    "12h": ("720", 43200),
+    "1d": ("D", 86400)
+}
+
+# Candle interval served per price history period
+HISTORY_INTERVALS = {"1h": "1m", "24h": "15m", "7d": "1h", "30d": "4h"}
+
+
+class RateLimiter:
+    """Spaces request starts at most ``rate`` per second across tasks."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self._next = 0.0
+
+    async def acquire(self):
+        now = time.monotonic()
+        slot = max(now, self._next)
+        self._next = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class KlineBackfill:
+    """Fills and tops up ``price_candles`` from Bybit kline history."""
+
+    def __init__(self, base_url: Optional[str] = None, days: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            base_url: Bybit REST base URL (defaults to ``bybit_rest_url``)
+            days: Days of history kept per interval (defaults to ``kline_backfill_days``)
+        """
+        self.base_url = base_url or settings.bybit_rest_url
+        self.days = days or settings.kline_backfill_days
+        unknown = set(self.days) - set(BYBIT_INTERVALS)
+        if unknown:
+            raise ValueError(f"Unknown kline intervals {sorted(unknown)}. Available: {', '.join(BYBIT_INTERVALS)}")
+        self.concurrency = settings.kline_backfill_concurrency
+        self.limiter = RateLimiter(settings.kline_backfill_rate_per_second)
+        self.interval = settings.kline_backfill_interval_seconds
+        self.running = False
+        self._requested_at: Dict[str, float] = {}  # monotonic, per symbol
+        self._lock = asyncio.Lock()  # one backfill at a time
+
+    async def _last_starts(self, db: AsyncSession, symbols: List[str]) -> Dict[Tuple[str, str], datetime]:
+        result = await db.execute(
+            select(PriceCandle.symbol, PriceCandle.interval, func.max(PriceCandle.start)).where(
+                PriceCandle.symbol.in_(symbols)
+            ).group_by(PriceCandle.symbol, PriceCandle.interval)
+        )
+        return {(symbol, interval): start for symbol, interval, start in result.all()}
+
+    async def _fetch(
+        self,
+        http: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        symbol: str,
+        interval: str,
+        start_ms: int,
+        end_ms: int
+    ) -> List[list]:
+        """Fetch one window of klines (newest first, as Bybit returns them)."""
+        params = {
+            "category": "spot",
+            "symbol": symbol,
+            "interval": BYBIT_INTERVALS[interval][0],
+            "start": start_ms,
+            "end": end_ms,
+            "limit": KLINE_LIMIT
+        }
+        async with semaphore:
+            for attempt in range(MAX_ATTEMPTS):
+                await self.limiter.acquire()
+                response = await http.get(f"{self.base_url}/v5/market/kline", params=params)
+
+                # Bybit signals rate limits with HTTP 429 or retCode 10006
+                data = response.json() if response.status_code == 200 else {}
+                if response.status_code == 429 or data.get("retCode") == 10006:
+                    KLINE_BACKFILL_REQUESTS.labels("rate_limited").inc()
+                    await asyncio.sleep(2 ** attempt)
+                    continue
+
+                if response.status_code != 200:
+                    KLINE_BACKFILL_REQUESTS.labels("failed").inc()
+                    response.raise_for_status()
+                if data.get("retCode") != 0:
+                    KLINE_BACKFILL_REQUESTS.labels("failed").inc()
+                    raise RuntimeError(f"Bybit kline request failed: {data.get('retMsg')}")
+                KLINE_BACKFILL_REQUESTS.labels("ok").inc()
+                return data["result"]["list"]
+
+        raise RuntimeError(f"Bybit kline requests for {symbol} {interval} kept hitting the rate limit")
+
+    async def _fill(
+        self,
+        http: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        symbol: str,
+        interval: str,
+        since: datetime,
+        now: datetime
+    ) -> List[dict]:
+        """Fetch a series from ``since`` to ``now`` as candle rows in time order."""
+        step_ms = BYBIT_INTERVALS[interval][1] * 1000
+        since_ms = int((since - datetime(1970, 1, 1)).total_seconds() * 1000)
+        start_ms = since_ms - since_ms % step_ms
+        end_ms = int((now - datetime(1970, 1, 1)).total_seconds() * 1000)
+        window_ms = KLINE_LIMIT * step_ms
+
+        pages = await asyncio.gather(*(
+            self._fetch(http, semaphore, symbol, interval, window, min(window + window_ms - 1, end_ms))
+            for window in range(start_ms, end_ms + 1, window_ms)
+        ), return_exceptions=True)
+
+        # A missing window would leave a gap that resuming never refills,
+        # so the series fails as a whole
+        for page in pages:
+            if isinstance(page, BaseException):
+                raise page
+
+        rows = {}
+        for page in pages:
+            for kline in page:
+                start, open_, high, low, close, volume, turnover = kline[:7]
+                rows[int(start)] = {
+                    "symbol": symbol,
+                    "interval": interval,
+                    "start": from_exchange_ms(int(start)),
+                    "open": float(open_),
+                    "high": float(high),
+                    "low": float(low),
+                    "close": float(close),
+                    "volume": float(volume),
+                    "turnover": float(turnover)
+                }
+        return [rows[start] for start in sorted(rows)]
+
+    async def _store(self, db: AsyncSession, symbol: str, interval: str, rows: List[dict], cutoff: datetime):
+        """Replace the series from its first fetched candle on and prune past the window."""
+        series = (PriceCandle.symbol == symbol) & (PriceCandle.interval == interval)
+        # Keep the candle the window starts in
+        keep_from = cutoff - timedelta(seconds=BYBIT_INTERVALS[interval][1])
+        await db.execute(delete(PriceCandle).where(series, PriceCandle.start <= keep_from))
+        if rows:
+            await db.execute(delete(PriceCandle).where(series, PriceCandle.start >= rows[0]["start"]))
+            await db.execute(insert(PriceCandle), rows)
+            KLINE_BACKFILL_CANDLES.labels(interval).inc(len(rows))
+
+    async def backfill(self, symbols: Optional[List[str]] = None) -> dict:
+        """
+        Fill every interval of the given symbols up to now.
+
+        Args:
+            symbols: Symbols to fill (default: all supported symbols)
+
+        Returns:
+            Dict with ``series``, ``candles``, ``failed`` (series) and ``seconds``
+        """
+        symbols = symbols or settings.supported_symbols
+        async with self._lock:
+            return await self._backfill(symbols)
+
+    async def _backfill(self, symbols: List[str]) -> dict:
+        started = time.perf_counter()
+        now = datetime.utcnow()
+
+        async with AsyncSessionLocal() as db:
+            last_starts = await self._last_starts(db, symbols)
+
+            series = []
+            for symbol in symbols:
+                for interval, days in self.days.items():
+                    cutoff = now - timedelta(days=days)
+                    last = last_starts.get((symbol, interval))
+                    series.append((symbol, interval, cutoff, max(last, cutoff) if last else cutoff))
+
+            semaphore = asyncio.Semaphore(self.concurrency)
+            limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+            async with httpx.AsyncClient(timeout=settings.kline_backfill_timeout_seconds, limits=limits) as http:
+                results = await asyncio.gather(*(
+                    self._fill(http, semaphore, symbol, interval, since, now)
+                    for symbol, interval, _, since in series
+                ), return_exceptions=True)
+
+            candles = failed = 0
+            for (symbol, interval, cutoff, _), rows in zip(series, results):
+                if isinstance(rows, BaseException):
+                    failed += 1
+                    print(f"✗ Kline backfill failed for {symbol} {interval}: {rows!r}")
+                    continue
+                await self._store(db, symbol, interval, rows, cutoff)
+                await db.commit()
+                candles += len(rows)
+
+        return {
+            "series": len(series),
+            "candles": candles,
+            "failed": failed,
+            "seconds": round(time.perf_counter() - started, 3)
+        }
+
+    def request(self, symbols: List[str]):
+        """
+        Schedule a background backfill of symbols, at most once per symbol
+        every ``kline_backfill_interval_seconds``.
+
+        Requires a running event loop.
+        """
+        now = time.monotonic()
+        symbols = [s for s in symbols if now - self._requested_at.get(s, -self.interval) >= self.interval]
+        if not symbols:
+            return
+        for symbol in symbols:
+            self._requested_at[symbol] = now
+        asyncio.create_task(self._backfill_requested(symbols))
+
+    async def _backfill_requested(self, symbols: List[str]):
+        try:
+            result = await self.backfill(symbols)
+            print(f"✓ Backfilled {result['candles']} candles for {', '.join(symbols)}")
+        except Exception as e:
+            print(f"✗ Kline backfill failed for {', '.join(symbols)}: {e!r}")
+
+    async def run(self):
+        """Backfill now, then top up periodically until stopped."""
+        self.running = True
+        while self.running:
+            try:
+                result = await self.backfill()
+                print(
+                    f"✓ Backfilled {result['candles']} candles across {result['series']} series "
+                    f"({result['failed']} failed) in {result['seconds']}s"
+                )
+            except Exception as e:
+                print(f"✗ Kline backfill failed: {e!r}")
+            await asyncio.sleep(self.interval)
+
+    def stop(self):
+        self.running = False
+
+
+# Global instance
+kline_backfill = KlineBackfill()
@@ -0,0 +1,106 @@
+"""
+In-memory market signals for alert conditions beyond a fixed price.
+
+Percent-move alerts ("moves 3% within 15 minutes") read the windowed min and
+max price from monotonic deques, which cost amortized O(1) per tick and
+O(1) per read no matter how many alerts share the window. Windows are
+created on demand for each (symbol, window length) an alert uses and fill
+from the next tick on. Indicator alerts read the streaming indicator engine
+and volume alerts the per-second trade buckets.
+"""
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, Optional, Tuple
+
+from app.services.indicators import IndicatorEngine, indicator_engine, to_epoch_seconds
+from app.services.trade_flow import TradeFlow, trade_flow
+
+
+class MonotonicWindow:
+    """Sliding time window with O(1) min and max."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        # (ts, price) with prices decreasing (max) / increasing (min) from the front
+        self._max: Deque[Tuple[float, float]] = deque()
+        self._min: Deque[Tuple[float, float]] = deque()
+
+    def add(self, ts: float, price: float):
+        while self._max and self._max[-1][1] <= price:
+            self._max.pop()
+        self._max.append((ts, price))
+
+        while self._min and self._min[-1][1] >= price:
+            self._min.pop()
+        self._min.append((ts, price))
+
+        cutoff = ts - self.seconds
+        while self._max[0][0] < cutoff:
+            self._max.popleft()
+        while self._min[0][0] < cutoff:
+            self._min.popleft()
+
+    @property
+    def max(self) -> Optional[float]:
+        return self._max[0][1] if self._max else None
+
+    @property
+    def min(self) -> Optional[float]:
+        return self._min[0][1] if self._min else None
+
+
+class MarketSignals:
+    """Rolling price windows and indicator lookups for alert evaluation."""
+
+    def __init__(self, indicators: IndicatorEngine = indicator_engine, trades: Optional[TradeFlow] = trade_flow):
+        self.indicators = indicators
+        self.trades = trades
+        self.windows: Dict[str, Dict[int, MonotonicWindow]] = {}
+
+    def track(self, symbol: str, window_seconds: int):
+        """Start maintaining a window for a symbol (no-op if already tracked)."""
+        windows = self.windows.setdefault(symbol, {})
+        if window_seconds not in windows:
+            windows[window_seconds] = MonotonicWindow(window_seconds)
+
+    def add_tick(self, symbol: str, price: float, timestamp: Optional[datetime] = None):
+        """Push a tick into every tracked window for the symbol."""
+        windows = self.windows.get(symbol)
+        if not windows:
+            return
+        ts = to_epoch_seconds(timestamp or datetime.utcnow())
+        for window in windows.values():
+            window.add(ts, price)
+
+    def percent_move(self, symbol: str, window_seconds: int, price: float) -> Optional[float]:
+        """
+        Largest move into ``price`` within the window, in percent.
+
+        Positive for a rise from the window low, negative for a fall from the
+        window high; None until the window has data.
+        """
+        window = self.windows.get(symbol, {}).get(window_seconds)
+        if window is None or window.min is None:
+            self.track(symbol, window_seconds)
+            return None
+
+        up = (price - window.min) / window.min * 100
+        down = (window.max - price) / window.max * 100
+        return up if up >= down else -down
+
+    def rsi(self, symbol: str, timeframe: str) -> Optional[float]:
+        """Live RSI for a symbol and timeframe, if warmed up."""
+        series = self.indicators.get(symbol, timeframe)
+        if series is None or series.current is None:
+            return None
+        return series.rsi.peek(series.current.close)
+
+    def quote_volume(self, symbol: str, window_seconds: int) -> Optional[float]:
+        """Quote volume traded in the last ``window_seconds``, if trades are streamed."""
+        if self.trades is None:
+            return None
+        return self.trades.quote_volume(symbol, window_seconds)
+
+
+# Global instance
+market_signals = MarketSignals()
@@ -6,6 +6,7 @@ from typing import Optional
 import httpx
 
 from app.config import settings
+from app.core.tracing import tracer
 
 
 class NotificationService:
@@ -38,16 +39,17 @@ class NotificationService:
             return False
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.telegram_api_url}/sendMessage",
-                    json={
-                        "chat_id": chat_id,
-                        "text": message,
-                        "parse_mode": "Markdown"
-                    },
-                    timeout=10.0
-                )
+            with tracer.span("telegram.send_message", chat_id=chat_id):
+                async with httpx.AsyncClient() as client:
+                    response = await client.post(
+                        f"{self.telegram_api_url}/sendMessage",
+                        json={
+                            "chat_id": chat_id,
+                            "text": message,
+                            "parse_mode": "Markdown"
+                        },
+                        timeout=10.0
+                    )
                 
                 if response.status_code == 200:
                     print(f"✓ Telegram message sent to {chat_id}")
@@ -0,0 +1,288 @@
+"""
+Local order books maintained from Bybit ``orderbook.{depth}.{symbol}`` streams.
+
+Bybit sends a full snapshot on subscribe and deltas after it; a delta level
+with size 0 removes that price. Each side keeps its prices in a sorted list
+(bids negated so index 0 is the best level on both sides) next to a
+price -> size dict: a level update is one dict write plus, when a price
+appears or disappears, one ``bisect`` and a short list shift. At 50 levels
+that is a few microseconds per update regardless of the number of symbols.
+
+Every delta's update id ``u`` must follow the previous one. On a gap the book
+is marked out of sync, deltas are ignored and the caller resubscribes to get
+a fresh snapshot (asked again every ``RESYNC_RETRY_SECONDS`` until one
+arrives). A snapshot with ``u == 1`` (sent after a Bybit service
+restart) resets the book like any other snapshot.
+
+Summaries (best bid/ask, spread, mid, depth within a percentage of mid) are
+pushed to listeners at most every ``orderbook_push_interval_seconds`` per
+book, from a separate loop, so the WebSocket read loop never waits on them.
+"""
+import asyncio
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from app.config import settings
+from app.core.metrics import ORDERBOOK_RESYNCS, ORDERBOOK_UPDATE_SECONDS
+
+# Repeat a resync request if no snapshot has arrived after this long
+RESYNC_RETRY_SECONDS = 10.0
+
+
+class BookSide:
+    """One side of a book: sorted price keys and their sizes."""
+
+    __slots__ = ("sign", "keys", "sizes")
+
+    def __init__(self, descending: bool):
+        # Bids are stored as negated prices so both sides sort best-first
+        self.sign = -1.0 if descending else 1.0
+        self.keys: List[float] = []
+        self.sizes: Dict[float, float] = {}
+
+    def clear(self):
+        self.keys = []
+        self.sizes = {}
+
+    def update(self, levels: List[List[str]]):
+        """Apply ``[price, size]`` levels; size 0 deletes the level."""
+        keys, sizes, sign = self.keys, self.sizes, self.sign
+        for price, size in levels:
+            key = sign * float(price)
+            size = float(size)
+            if size == 0:
+                if sizes.pop(key, None) is not None:
+                    del keys[bisect_left(keys, key)]
+            else:
+                if key not in sizes:
+                    keys.insert(bisect_left(keys, key), key)
+                sizes[key] = size
+
+    def best(self) -> Optional[Tuple[float, float]]:
+        if not self.keys:
+            return None
+        key = self.keys[0]
+        return self.sign * key, self.sizes[key]
+
+    def levels(self, count: int) -> List[Tuple[float, float]]:
+        return [(self.sign * key, self.sizes[key]) for key in self.keys[:count]]
+
+    def depth_to(self, price: float) -> Tuple[float, float]:
+        """Total size and notional of levels at or better than ``price``."""
+        end = bisect_right(self.keys, self.sign * price)
+        quantity = notional = 0.0
+        for key in self.keys[:end]:
+            size = self.sizes[key]
+            quantity += size
+            notional += size * key * self.sign
+        return quantity, notional
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+
+class OrderBook:
+    """Local copy of one symbol's order book."""
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.bids = BookSide(descending=True)
+        self.asks = BookSide(descending=False)
+        self.update_id: Optional[int] = None
+        self.seq: Optional[int] = None
+        self.timestamp: Optional[datetime] = None
+        self.synced = False
+
+    def apply_snapshot(self, data: dict, timestamp: Optional[datetime] = None):
+        """Replace the book with a snapshot."""
+        self.bids.clear()
+        self.asks.clear()
+        self.bids.update(data.get("b", []))
+        self.asks.update(data.get("a", []))
+        self.update_id = data.get("u")
+        self.seq = data.get("seq")
+        self.timestamp = timestamp
+        self.synced = True
+
+    def apply_delta(self, data: dict, timestamp: Optional[datetime] = None) -> bool:
+        """
+        Apply a delta if it continues the sequence.
+
+        Returns:
+            False if the book is (now) out of sync and needs a snapshot
+        """
+        if not self.synced:
+            return False
+
+        update_id = data.get("u")
+        if update_id is not None and self.update_id is not None:
+            if update_id <= self.update_id:
+                return True  # Duplicate or replayed update
+            if update_id != self.update_id + 1:
+                self.synced = False
+                return False
+
+        self.bids.update(data.get("b", []))
+        self.asks.update(data.get("a", []))
+        self.update_id = update_id
+        self.seq = data.get("seq", self.seq)
+        self.timestamp = timestamp
+
+        # A crossed book means a missed update
+        best_bid, best_ask = self.bids.best(), self.asks.best()
+        if best_bid and best_ask and best_bid[0] >= best_ask[0]:
+            self.synced = False
+            return False
+        return True
+
+    @property
+    def mid(self) -> Optional[float]:
+        best_bid, best_ask = self.bids.best(), self.asks.best()
+        if not best_bid or not best_ask:
+            return None
+        return (best_bid[0] + best_ask[0]) / 2
+
+    def summary(self, depth_percent: Optional[float] = None, levels: int = 0) -> dict:
+        """
+        Top of book, spread and depth near mid.
+
+        Args:
+            depth_percent: Band around mid for the depth figures (defaults
+                to ``orderbook_depth_percent``)
+            levels: Number of price levels per side to include
+        """
+        depth_percent = settings.orderbook_depth_percent if depth_percent is None else depth_percent
+        best_bid, best_ask = self.bids.best(), self.asks.best()
+        mid = self.mid
+
+        summary = {
+            "symbol": self.symbol,
+            "synced": self.synced,
+            "update_id": self.update_id,
+            "timestamp": self.timestamp,
+            "best_bid": best_bid[0] if best_bid else None,
+            "best_bid_size": best_bid[1] if best_bid else None,
+            "best_ask": best_ask[0] if best_ask else None,
+            "best_ask_size": best_ask[1] if best_ask else None,
+            "mid": mid,
+            "spread": None,
+            "spread_bps": None,
+            "depth_percent": depth_percent,
+            "bid_depth": None,
+            "bid_depth_notional": None,
+            "ask_depth": None,
+            "ask_depth_notional": None,
+        }
+
+        if mid is not None:
+            spread = best_ask[0] - best_bid[0]
+            summary["spread"] = spread
+            summary["spread_bps"] = spread / mid * 10_000
+            band = mid * depth_percent / 100
+            summary["bid_depth"], summary["bid_depth_notional"] = self.bids.depth_to(mid - band)
+            summary["ask_depth"], summary["ask_depth_notional"] = self.asks.depth_to(mid + band)
+
+        if levels:
+            summary["bids"] = [{"price": p, "size": s} for p, s in self.bids.levels(levels)]
+            summary["asks"] = [{"price": p, "size": s} for p, s in self.asks.levels(levels)]
+
+        return summary
+
+
+class OrderBookManager:
+    """Order books for all symbols plus throttled pushes of their summaries."""
+
+    def __init__(self, push_interval: Optional[float] = None):
+        """
+        Args:
+            push_interval: Minimum seconds between pushes per book (defaults
+                to ``orderbook_push_interval_seconds``)
+        """
+        self.push_interval = settings.orderbook_push_interval_seconds if push_interval is None else push_interval
+        self.books: Dict[str, OrderBook] = {}
+        self.listeners: List[Callable] = []
+        self._dirty: Set[str] = set()
+        self._resync_requested: Dict[str, float] = {}
+        self._running = False
+
+    def add_listener(self, callback: Callable):
+        """Add an async callback called with each pushed book summary."""
+        self.listeners.append(callback)
+
+    def get(self, symbol: str) -> Optional[OrderBook]:
+        """A symbol's book, if it has been synced from a snapshot."""
+        book = self.books.get(symbol)
+        return book if book is not None and book.synced else None
+
+    def reset(self):
+        """Drop all books (on reconnect, before fresh snapshots arrive)."""
+        self.books = {}
+        self._dirty.clear()
+        self._resync_requested.clear()
+
+    def handle(self, symbol: str, message: dict, timestamp: Optional[datetime] = None) -> bool:
+        """
+        Apply an ``orderbook.*`` message.
+
+        Args:
+            symbol: Trading pair
+            message: Decoded message with ``type`` and ``data``
+            timestamp: Exchange time of the message
+
+        Returns:
+            False if the caller should resubscribe for a snapshot; returned
+            once per gap (and again if the snapshot does not arrive)
+        """
+        started = time.perf_counter()
+        book = self.books.get(symbol)
+        if book is None:
+            book = self.books[symbol] = OrderBook(symbol)
+
+        if message.get("type") == "snapshot":
+            book.apply_snapshot(message.get("data", {}), timestamp)
+            self._resync_requested.pop(symbol, None)
+            ok = True
+        else:
+            ok = book.apply_delta(message.get("data", {}), timestamp)
+
+        ORDERBOOK_UPDATE_SECONDS.observe(time.perf_counter() - started)
+        if ok:
+            self._dirty.add(symbol)
+            return True
+
+        now = time.monotonic()
+        requested = self._resync_requested.get(symbol)
+        if requested is not None and now - requested < RESYNC_RETRY_SECONDS:
+            return True
+        self._resync_requested[symbol] = now
+        ORDERBOOK_RESYNCS.labels(symbol).inc()
+        return False
+
+    async def run(self):
+        """Push summaries of changed books until stopped."""
+        self._running = True
+        while self._running:
+            await asyncio.sleep(self.push_interval)
+            if not self._dirty or not self.listeners:
+                continue
+
+            dirty, self._dirty = self._dirty, set()
+            for symbol in dirty:
+                book = self.get(symbol)
+                if book is None:
+                    continue
+                summary = book.summary()
+                for listener in self.listeners:
+                    try:
+                        await listener(summary)
+                    except Exception as e:
+                        print(f"Order book listener error: {e}")
+
+    def stop(self):
+        self._running = False
+
+
+# Global instance
+order_books = OrderBookManager()
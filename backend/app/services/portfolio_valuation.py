@@ -0,0 +1,227 @@
+"""
+In-memory portfolio valuation kept current by price ticks.
+
+Each user's holdings (amount and cost basis) are loaded once and kept in
+memory. A tick only touches users holding that symbol and adjusts their
+running totals by the price delta, so ``GET /api/portfolio`` returns a
+precomputed summary instead of querying and recomputing on every poll.
+
+State is per process, like the price feed cache it is fed from. Loaded
+portfolios are reloaded from the database after
+``portfolio_valuation_ttl_seconds``, which picks up changes made outside
+this process and recomputes totals from scratch, and the least recently
+used are evicted beyond ``portfolio_valuation_max_users``.
+"""
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.portfolio import PortfolioHolding
+from app.schemas.portfolio import HoldingResponse, PortfolioSummary
+from app.services.price_feed import price_feed
+
+
+class _Holding:
+    """Valuation state for a single holding."""
+
+    __slots__ = (
+        "id", "user_id", "symbol", "amount", "average_buy_price",
+        "created_at", "updated_at", "price", "value", "has_cost_basis", "cost"
+    )
+
+    def __init__(self, holding: PortfolioHolding, price: float):
+        self.id = holding.id
+        self.user_id = holding.user_id
+        self.symbol = holding.symbol
+        self.amount = holding.amount
+        self.average_buy_price = holding.average_buy_price
+        self.created_at = holding.created_at
+        self.updated_at = holding.updated_at
+        self.price = price
+        self.value = self.amount * price
+
+        # Only holdings with a cost basis count towards total cost
+        self.has_cost_basis = bool(self.average_buy_price and self.average_buy_price > 0)
+        self.cost = self.amount * self.average_buy_price if self.has_cost_basis else 0
+
+    def to_response(self) -> HoldingResponse:
+        pnl = 0
+        pnl_percent = 0
+        if self.has_cost_basis:
+            pnl = self.value - self.cost
+            pnl_percent = (pnl / self.cost) * 100 if self.cost > 0 else 0
+
+        return HoldingResponse(
+            id=self.id,
+            user_id=self.user_id,
+            symbol=self.symbol,
+            amount=self.amount,
+            average_buy_price=self.average_buy_price,
+            created_at=self.created_at,
+            updated_at=self.updated_at,
+            current_price=round(self.price, 2),
+            current_value=round(self.value, 2),
+            pnl=round(pnl, 2),
+            pnl_percent=round(pnl_percent, 2)
+        )
+
+
+class _UserPortfolio:
+    """A user's holdings with running totals and a cached summary."""
+
+    __slots__ = ("holdings", "total_value", "total_cost", "summary", "loaded_at")
+
+    def __init__(self, holdings: List[_Holding]):
+        self.holdings: Dict[str, _Holding] = {h.symbol: h for h in holdings}
+        self.summary: Optional[PortfolioSummary] = None
+        self.loaded_at = time.monotonic()
+        self.recompute()
+
+    def recompute(self):
+        """Recompute totals from scratch (on holding changes)."""
+        self.total_value = sum(h.value for h in self.holdings.values())
+        self.total_cost = sum(h.cost for h in self.holdings.values())
+        self.summary = None
+
+    def build_summary(self) -> PortfolioSummary:
+        total_pnl = self.total_value - self.total_cost if self.total_cost > 0 else 0
+        total_pnl_percent = (total_pnl / self.total_cost) * 100 if self.total_cost > 0 else 0
+
+        return PortfolioSummary(
+            total_value=round(self.total_value, 2),
+            total_pnl=round(total_pnl, 2),
+            total_pnl_percent=round(total_pnl_percent, 2),
+            holdings=[
+                h.to_response()
+                for h in sorted(self.holdings.values(), key=lambda h: h.id)
+            ]
+        )
+
+
+class PortfolioValuationService:
+    """
+    Keeps portfolio valuations current as prices change.
+
+    Users are loaded lazily on their first request; holding mutations made
+    through the API are applied with ``upsert_holding``/``remove_holding``.
+    Ticks adjust totals incrementally between reloads.
+    """
+
+    def __init__(self):
+        self.ttl_seconds = settings.portfolio_valuation_ttl_seconds
+        self.max_users = settings.portfolio_valuation_max_users
+        self._portfolios: "OrderedDict[int, _UserPortfolio]" = OrderedDict()
+        self._holders: Dict[str, Set[int]] = {}
+
+    def _current_price(self, symbol: str) -> float:
+        price_data = price_feed.get_price(symbol)
+        return price_data.get('price', 0) if price_data else 0
+
+    async def _load(self, db: AsyncSession, user_id: int) -> _UserPortfolio:
+        result = await db.execute(
+            select(PortfolioHolding).where(PortfolioHolding.user_id == user_id)
+        )
+        rows = result.scalars().all()
+
+        portfolio = _UserPortfolio([
+            _Holding(row, self._current_price(row.symbol)) for row in rows
+        ])
+        self._discard(user_id)
+        self._portfolios[user_id] = portfolio
+        for symbol in portfolio.holdings:
+            self._holders.setdefault(symbol, set()).add(user_id)
+
+        while len(self._portfolios) > self.max_users:
+            self._discard(next(iter(self._portfolios)))
+        return portfolio
+
+    def _discard(self, user_id: int):
+        """Drop a loaded portfolio and its symbol index entries."""
+        portfolio = self._portfolios.pop(user_id, None)
+        if portfolio is None:
+            return
+        for symbol in portfolio.holdings:
+            holders = self._holders.get(symbol)
+            if holders is not None:
+                holders.discard(user_id)
+                if not holders:
+                    del self._holders[symbol]
+
+    def needs_reload(self, user_id: int) -> bool:
+        """Whether a user's portfolio is not loaded or older than the TTL."""
+        portfolio = self._portfolios.get(user_id)
+        return portfolio is None or time.monotonic() - portfolio.loaded_at > self.ttl_seconds
+
+    async def get_summary(self, db: AsyncSession, user_id: int) -> PortfolioSummary:
+        """Get a user's portfolio summary, rebuilding it only after changes."""
+        if self.needs_reload(user_id):
+            portfolio = await self._load(db, user_id)
+        else:
+            portfolio = self._portfolios[user_id]
+            self._portfolios.move_to_end(user_id)
+
+        if portfolio.summary is None:
+            portfolio.summary = portfolio.build_summary()
+        return portfolio.summary
+
+    def peek_summary(self, user_id: int) -> Optional[PortfolioSummary]:
+        """Get a loaded user's summary without touching the database."""
+        portfolio = self._portfolios.get(user_id)
+        if portfolio is None:
+            return None
+        self._portfolios.move_to_end(user_id)
+
+        if portfolio.summary is None:
+            portfolio.summary = portfolio.build_summary()
+        return portfolio.summary
+
+    def upsert_holding(self, holding: PortfolioHolding):
+        """Apply a created or updated holding to a loaded portfolio."""
+        portfolio = self._portfolios.get(holding.user_id)
+        if portfolio is None:
+            return
+
+        portfolio.holdings[holding.symbol] = _Holding(holding, self._current_price(holding.symbol))
+        self._holders.setdefault(holding.symbol, set()).add(holding.user_id)
+        portfolio.recompute()
+
+    def remove_holding(self, user_id: int, symbol: str):
+        """Remove a deleted holding from a loaded portfolio."""
+        portfolio = self._portfolios.get(user_id)
+        if portfolio is None or symbol not in portfolio.holdings:
+            return
+
+        del portfolio.holdings[symbol]
+        self._holders.get(symbol, set()).discard(user_id)
+        portfolio.recompute()
+
+    def on_price_update(self, price_data: dict):
+        """
+        Apply a price tick to every loaded portfolio holding the symbol.
+
+        Registered as a price feed callback.
+        """
+        symbol = price_data.get('symbol')
+        price = price_data.get('price')
+        if symbol is None or price is None:
+            return
+
+        for user_id in self._holders.get(symbol, ()):
+            portfolio = self._portfolios[user_id]
+            holding = portfolio.holdings[symbol]
+            if price == holding.price:
+                continue
+
+            value = holding.amount * price
+            portfolio.total_value += value - holding.value
+            holding.price = price
+            holding.value = value
+            portfolio.summary = None
+
+
+# Global instance
+portfolio_valuation = PortfolioValuationService()
@@ -0,0 +1,276 @@
+"""
+Consolidated price feed over one or more exchange adapters.
+
+Every venue's normalized ticks flow into ``PriceFeed.ingest``, which merges
+them into one tick stream per symbol and fans it out to subscribers through
+the ``TickDispatcher``. Two merge modes (``price_feed_mode``):
+
+- ``latest``: last write wins by exchange timestamp. A tick older than the
+  one already published for the symbol is dropped, so a lagging venue never
+  moves the price backwards.
+- ``median``: each venue tick publishes the median of the symbol's latest
+  price on every venue that ticked within ``price_feed_venue_max_age_seconds``
+  of it. With three or more venues, one venue printing an outlier cannot
+  move the price alone.
+
+Published ticks keep the normalized fields (see ``app.services.exchange``)
+plus ``timestamp``, ``seq`` (per-process sequence id) and ``sources`` (the
+venues behind the price). With a single venue both modes pass its ticks
+through unchanged.
+
+Staleness is tracked per symbol from the time since its last streamed tick
+on any venue. Once that exceeds ``price_feed_stale_seconds`` the symbol is
+polled from every venue's batch REST ticker endpoint (one request per venue
+covers all symbols, over a shared connection pool) until a streamed tick
+arrives again. Polled ticks are merged like streamed ones but never count as
+stream activity.
+"""
+import asyncio
+import statistics
+import time
+from typing import Callable, Dict, List, Optional, Set
+
+import httpx
+
+from app.config import settings
+from app.core.metrics import PRICE_FEED_REST_POLLS, PRICE_FEED_STALE_SYMBOLS, PRICE_FEED_TICKS
+from app.services.binance import binance_client
+from app.services.bybit import bybit_client
+from app.services.exchange import ExchangeAdapter
+from app.services.tick_dispatcher import OverflowPolicy, TickDispatcher
+
+# Adapters selectable through ``price_feed_exchanges``
+EXCHANGE_ADAPTERS: Dict[str, ExchangeAdapter] = {
+    "bybit": bybit_client,
+    "binance": binance_client,
+}
+
+FEED_MODES = ("latest", "median")
+
+
+class PriceFeed:
+    """Merges venue ticks into one stream and fans it out to subscribers."""
+
+    def __init__(
+        self,
+        adapters: List[ExchangeAdapter],
+        mode: Optional[str] = None,
+        venue_max_age: Optional[float] = None
+    ):
+        """
+        Args:
+            adapters: Venues to consolidate
+            mode: "latest" or "median" (defaults to ``price_feed_mode``)
+            venue_max_age: Seconds a venue's price counts towards the median
+                (defaults to ``price_feed_venue_max_age_seconds``)
+        """
+        self.mode = mode or settings.price_feed_mode
+        if self.mode not in FEED_MODES:
+            raise ValueError(f"Unknown price feed mode {self.mode!r}. Available: {', '.join(FEED_MODES)}")
+        self.venue_max_age = settings.price_feed_venue_max_age_seconds if venue_max_age is None else venue_max_age
+        self.adapters = adapters
+        for adapter in adapters:
+            adapter.sink = self.ingest
+        self.symbols = list(dict.fromkeys(symbol for adapter in adapters for symbol in adapter.symbols))
+
+        self.prices: Dict[str, dict] = {}
+        self.dispatcher = TickDispatcher()
+        self._seq = 0  # per-process tick sequence id
+
+        # Staleness and REST fallback (monotonic times)
+        self.stale_after = settings.price_feed_stale_seconds
+        self.rest_fallback = settings.price_feed_rest_fallback
+        self.poll_interval = settings.price_feed_rest_poll_seconds
+        self.polling: Set[str] = set()  # symbols currently served by REST polling
+        self._streamed_at: Dict[str, float] = {}
+        self._published_at: Dict[str, float] = {}
+        self._started_at = time.monotonic()
+        self._running = False
+
+    def add_callback(
+        self,
+        callback: Callable,
+        policy: Optional[OverflowPolicy] = None,
+        maxsize: Optional[int] = None
+    ):
+        """
+        Add a callback function to be called on price updates.
+
+        Callbacks run on their own queue and task, never inside a venue's
+        read loop; ``policy`` and ``maxsize`` control what a slow callback
+        misses.
+        """
+        self.dispatcher.subscribe(callback, policy, maxsize)
+
+    def remove_callback(self, callback: Callable):
+        """Remove a callback function."""
+        self.dispatcher.unsubscribe(callback)
+
+    @property
+    def callbacks(self) -> list[Callable]:
+        return self.dispatcher.callbacks
+
+    def get_current_prices(self) -> Dict[str, dict]:
+        """Get the latest consolidated prices."""
+        return self.prices.copy()
+
+    def get_price(self, symbol: str) -> Optional[dict]:
+        """Get the latest consolidated price for a specific symbol."""
+        return self.prices.get(symbol)
+
+    def restore(self, prices: Dict[str, dict]) -> int:
+        """
+        Seed the cache with last-known prices (e.g. from a warm start).
+
+        Restored prices are served but not published, and stay stale until
+        a fresh tick for the symbol arrives.
+
+        Returns:
+            Number of prices restored
+        """
+        restored = 0
+        for symbol, tick in prices.items():
+            if symbol in self.symbols and symbol not in self.prices:
+                self.prices[symbol] = tick
+                restored += 1
+        return restored
+
+    def venues(self) -> Dict[str, bool]:
+        """Connection state per venue."""
+        return {adapter.name: adapter.connected for adapter in self.adapters}
+
+    def _stream_age(self, symbol: str, now: float) -> float:
+        return now - self._streamed_at.get(symbol, self._started_at)
+
+    def is_stale(self, symbol: str) -> bool:
+        """Whether the symbol has no price newer than ``price_feed_stale_seconds``."""
+        published = self._published_at.get(symbol)
+        return published is None or time.monotonic() - published > self.stale_after
+
+    def staleness(self) -> Dict[str, dict]:
+        """
+        Staleness state per symbol.
+
+        Returns:
+            ``{symbol: {stream_age_seconds, price_age_seconds, stale, polling}}``;
+            ``stale`` refers to the served price, so a symbol kept fresh by
+            REST polling is ``polling`` but not ``stale``
+        """
+        now = time.monotonic()
+        state = {}
+        for symbol in self.symbols:
+            published = self._published_at.get(symbol)
+            state[symbol] = {
+                "stream_age_seconds": round(self._stream_age(symbol, now), 1),
+                "price_age_seconds": round(now - published, 1) if published is not None else None,
+                "stale": self.is_stale(symbol),
+                "polling": symbol in self.polling
+            }
+        return state
+
+    def _median(self, tick: dict) -> dict:
+        symbol = tick["symbol"]
+        quotes = [
+            quote for quote in (adapter.prices.get(symbol) for adapter in self.adapters)
+            if quote is not None
+            and (tick["exchange_ts"] - quote["exchange_ts"]).total_seconds() <= self.venue_max_age
+        ]
+        if len(quotes) < 2:
+            return {**tick, "sources": [tick["exchange"]]}
+        return {
+            **tick,
+            "price": statistics.median(quote["price"] for quote in quotes),
+            "exchange_ts": max(quote["exchange_ts"] for quote in quotes),
+            "sources": sorted(quote["exchange"] for quote in quotes)
+        }
+
+    def ingest(self, tick: dict):
+        """
+        Merge one normalized venue tick and publish the result.
+
+        Called from the venue read loops and the REST fallback; never awaits.
+        """
+        now = time.monotonic()
+        if not tick.get("polled"):
+            self._streamed_at[tick["symbol"]] = now
+
+        if self.mode == "median":
+            tick = self._median(tick)
+        else:
+            current = self.prices.get(tick["symbol"]) or {}
+            if current.get("exchange_ts") is not None and tick["exchange_ts"] < current["exchange_ts"]:
+                PRICE_FEED_TICKS.labels(tick["exchange"], "out_of_order").inc()
+                return
+            tick = {**tick, "sources": [tick["exchange"]]}
+
+        PRICE_FEED_TICKS.labels(tick["exchange"], "published").inc()
+        self._seq += 1
+        tick["timestamp"] = tick["exchange_ts"]
+        tick["seq"] = self._seq
+
+        # Update cache
+        self.prices[tick["symbol"]] = tick
+        self._published_at[tick["symbol"]] = now
+
+        # Hand off to subscribers without waiting on them
+        self.dispatcher.publish(tick)
+
+    async def _poll(self, http: httpx.AsyncClient, symbols: Set[str]):
+        """Fetch every venue's REST tickers once and merge the stale symbols."""
+        results = await asyncio.gather(
+            *(adapter.fetch_tickers(http) for adapter in self.adapters),
+            return_exceptions=True
+        )
+        for adapter, result in zip(self.adapters, results):
+            if isinstance(result, NotImplementedError):
+                continue
+            if isinstance(result, Exception):
+                PRICE_FEED_REST_POLLS.labels(adapter.name, "failed").inc()
+                print(f"✗ {adapter.name} REST ticker poll failed: {result!r}")
+                continue
+
+            PRICE_FEED_REST_POLLS.labels(adapter.name, "ok").inc()
+            for tick in result:
+                if tick["symbol"] in symbols:
+                    adapter.emit(tick)
+
+    async def _poll_stale(self):
+        """Poll REST tickers for symbols with stale streams until they recover."""
+        limits = httpx.Limits(max_connections=len(self.adapters), max_keepalive_connections=len(self.adapters))
+        async with httpx.AsyncClient(timeout=settings.price_feed_rest_timeout_seconds, limits=limits) as http:
+            while self._running:
+                await asyncio.sleep(self.poll_interval)
+                now = time.monotonic()
+                stale = {symbol for symbol in self.symbols if self._stream_age(symbol, now) > self.stale_after}
+
+                for symbol in sorted(stale - self.polling):
+                    print(f"⚠ No {symbol} stream ticks for {self._stream_age(symbol, now):.0f}s, polling REST tickers")
+                for symbol in sorted(self.polling - stale):
+                    print(f"✓ {symbol} stream recovered, REST polling stopped")
+                self.polling = stale
+                PRICE_FEED_STALE_SYMBOLS.set(len(stale))
+
+                if stale and self._running:
+                    await self._poll(http, stale)
+
+    async def listen(self):
+        """Start fan-out and stream from every venue until disconnected."""
+        self.dispatcher.start()
+        self._running = True
+        self._started_at = time.monotonic()
+        tasks = [adapter.listen() for adapter in self.adapters]
+        if self.rest_fallback:
+            tasks.append(self._poll_stale())
+        await asyncio.gather(*tasks)
+
+    async def disconnect(self):
+        """Stop fan-out, REST polling and every venue connection."""
+        self._running = False
+        self.polling = set()
+        await self.dispatcher.stop()
+        for adapter in self.adapters:
+            await adapter.disconnect()
+
+
+# Global instance
+price_feed = PriceFeed([EXCHANGE_ADAPTERS[name] for name in settings.price_feed_exchanges])
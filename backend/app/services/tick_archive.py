@@ -0,0 +1,206 @@
+"""
+Append-only on-disk tick archive for backtesting and alert replay.
+
+Each symbol gets one file per UTC day (``{root}/{symbol}/{YYYY-MM-DD}.ticks``)
+holding fixed-width little-endian records of timestamp (ms), price and volume.
+Reads go through ``numpy.memmap`` so range queries return column views into
+the page cache instead of materialising rows.
+"""
+import asyncio
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+
+# One record per tick: exchange/receive time in epoch milliseconds, last price
+# and the 24h volume reported alongside it.
+TICK_DTYPE = np.dtype([("ts", "<i8"), ("price", "<f8"), ("volume", "<f8")])
+
+# Sub-minute resolutions served from the archive (bucket size in seconds)
+ARCHIVE_RESOLUTIONS = {"tick": 0, "1s": 1, "5s": 5, "15s": 15, "30s": 30}
+
+
+def to_epoch_ms(value) -> int:
+    """Convert a naive-UTC datetime (or epoch ms) to epoch milliseconds."""
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp() * 1000)
+    return int(value)
+
+
+def from_epoch_ms(ts: int) -> datetime:
+    """Convert epoch milliseconds to a naive-UTC datetime."""
+    return datetime.fromtimestamp(ts / 1000, tz=timezone.utc).replace(tzinfo=None)
+
+
+class TickArchive:
+    """
+    Columnar tick store with one append-only file per symbol per day.
+
+    ``append`` is cheap enough to run as a price feed callback: it only
+    buffers in memory. ``run`` flushes the buffers to disk on a fixed
+    interval from a worker thread so file I/O never blocks the event loop.
+    Only one write is ever in flight, so files stay sorted by time.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root or settings.tick_archive_dir)
+        self.flush_interval = settings.tick_archive_flush_interval
+        self.running = False
+        self._buffers: Dict[str, List[Tuple[int, float, float]]] = defaultdict(list)
+        self._last_ts: Dict[str, int] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._writing: Optional[asyncio.Future] = None
+
+    def _path(self, symbol: str, day: date) -> Path:
+        return self.root / symbol / f"{day.isoformat()}.ticks"
+
+    # -------------------------------------------------------------------------
+    # Writes
+    # -------------------------------------------------------------------------
+
+    def append(self, price_data: dict):
+        """Buffer a tick. Registered as a price feed callback."""
+        symbol = price_data.get("symbol")
+        if not symbol:
+            return
+
+        ts = to_epoch_ms(price_data.get("timestamp") or datetime.utcnow())
+
+        # Keep each file sorted by time so reads can binary search it;
+        # distinct ticks within the same millisecond are all kept
+        if ts < self._last_ts.get(symbol, -1):
+            return
+        self._last_ts[symbol] = ts
+
+        self._buffers[symbol].append((
+            ts,
+            float(price_data.get("price", 0)),
+            float(price_data.get("volume_24h") or 0)
+        ))
+
+    def flush(self):
+        """Write all buffered ticks to disk (blocking)."""
+        pending, self._buffers = self._buffers, defaultdict(list)
+        self._write(pending)
+
+    def _write(self, pending: Dict[str, List[Tuple[int, float, float]]]):
+        for symbol, rows in pending.items():
+            if not rows:
+                continue
+
+            records = np.array(rows, dtype=TICK_DTYPE)
+            days = records["ts"] // 86_400_000
+
+            # Rows are time ordered, so each day is one contiguous run
+            boundaries = np.flatnonzero(np.diff(days)) + 1
+            for chunk in np.split(records, boundaries):
+                day = from_epoch_ms(int(chunk["ts"][0])).date()
+                path = self._path(symbol, day)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                with open(path, "ab") as f:
+                    chunk.tofile(f)
+
+    async def run(self):
+        """Periodically flush buffered ticks until stopped."""
+        self.running = True
+        self._task = asyncio.current_task()
+        print(f"✓ Tick archive writing to {self.root}")
+
+        while self.running:
+            await asyncio.sleep(self.flush_interval)
+            pending, self._buffers = self._buffers, defaultdict(list)
+            if pending:
+                # Shielded so cancelling the loop never abandons a write
+                # that is still running in its thread
+                self._writing = asyncio.ensure_future(asyncio.to_thread(self._write, pending))
+                try:
+                    await asyncio.shield(self._writing)
+                except Exception as e:
+                    print(f"Tick archive flush error: {e}")
+
+    async def stop(self):
+        """Stop the flush loop, wait for any write in flight, then flush the rest."""
+        self.running = False
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._writing is not None:
+            await asyncio.gather(self._writing, return_exceptions=True)
+            self._writing = None
+        try:
+            await asyncio.to_thread(self.flush)
+        except Exception as e:
+            print(f"Tick archive flush error: {e}")
+
+    # -------------------------------------------------------------------------
+    # Reads
+    # -------------------------------------------------------------------------
+
+    def _open_day(self, symbol: str, day: date) -> Optional[np.memmap]:
+        path = self._path(symbol, day)
+        if not path.exists():
+            return None
+
+        # Ignore a trailing partial record left by an interrupted write
+        count = path.stat().st_size // TICK_DTYPE.itemsize
+        if count == 0:
+            return None
+        return np.memmap(path, dtype=TICK_DTYPE, mode="r", shape=(count,))
+
+    def read_range(self, symbol: str, start: datetime, end: datetime) -> np.ndarray:
+        """
+        Read archived ticks for a symbol in ``[start, end)``.
+
+        A range within a single day is returned as a zero-copy memmap view;
+        multi-day ranges are concatenated.
+
+        Returns:
+            Structured array with ``ts``, ``price`` and ``volume`` fields
+        """
+        start_ms = to_epoch_ms(start)
+        end_ms = to_epoch_ms(end)
+
+        chunks = []
+        day = from_epoch_ms(start_ms).date()
+        last_day = from_epoch_ms(end_ms).date()
+
+        while day <= last_day:
+            records = self._open_day(symbol, day)
+            if records is not None:
+                ts = records["ts"]
+                lo = np.searchsorted(ts, start_ms, side="left")
+                hi = np.searchsorted(ts, end_ms, side="left")
+                if hi > lo:
+                    chunks.append(records[lo:hi])
+            day += timedelta(days=1)
+
+        if not chunks:
+            return np.empty(0, dtype=TICK_DTYPE)
+        if len(chunks) == 1:
+            return chunks[0]
+        return np.concatenate(chunks)
+
+    @staticmethod
+    def downsample(records: np.ndarray, bucket_seconds: int) -> np.ndarray:
+        """
+        Reduce ticks to the last tick of each ``bucket_seconds`` bucket.
+
+        A bucket size of 0 returns the ticks unchanged.
+        """
+        if bucket_seconds <= 0 or len(records) == 0:
+            return records
+
+        buckets = records["ts"] // (bucket_seconds * 1000)
+        last_in_bucket = np.append(np.flatnonzero(np.diff(buckets)), len(records) - 1)
+        return records[last_in_bucket]
+
+
+# Global instance
+tick_archive = TickArchive()
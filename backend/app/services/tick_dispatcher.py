@@ -0,0 +1,196 @@
+"""
+Non-blocking fan-out of price ticks to subscribers.
+
+Each subscriber gets its own bounded queue and consumer task, so a slow
+subscriber (a broadcast to slow clients, an alert check waiting on the
+database) only delays itself. Publishing never awaits and never blocks the
+WebSocket read loop; when a queue is full its overflow policy decides what
+is dropped.
+"""
+import asyncio
+import enum
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.core.metrics import PRICE_CALLBACK_SECONDS, TICK_QUEUE_SECONDS, TICKS_DROPPED
+from app.core.tracing import tracer
+
+
+class OverflowPolicy(str, enum.Enum):
+    """What a full subscriber queue gives up."""
+    LATEST_PER_SYMBOL = "latest_per_symbol"  # Coalesce: only the newest pending tick per symbol
+    DROP_OLDEST = "drop_oldest"  # Keep every tick until full, then discard the oldest
+
+
+def callback_name(callback: Callable) -> str:
+    """Stable label for a subscriber callback."""
+    return f"{getattr(callback, '__module__', '')}.{getattr(callback, '__qualname__', repr(callback))}"
+
+
+class _Subscriber:
+    """A callback with its own pending ticks and consumer task."""
+
+    def __init__(self, callback: Callable, policy: OverflowPolicy, maxsize: int):
+        self.callback = callback
+        self.name = callback_name(callback)
+        self.policy = policy
+        self.maxsize = maxsize
+        self.is_async = asyncio.iscoroutinefunction(callback)
+        self.dropped = 0
+        self.task: Optional[asyncio.Task] = None
+
+        # Pending entries are (enqueued at, tick)
+        self._latest: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+        self._queue: deque = deque()
+        self._ready = asyncio.Event()
+
+    @property
+    def pending(self) -> int:
+        return len(self._latest) + len(self._queue)
+
+    def offer(self, price_data: dict):
+        """Enqueue a tick without blocking, applying the overflow policy."""
+        entry = (time.perf_counter(), price_data)
+
+        if self.policy == OverflowPolicy.LATEST_PER_SYMBOL:
+            symbol = price_data.get("symbol")
+            if symbol in self._latest:
+                # Replace in place so busy symbols keep their turn
+                self._latest[symbol] = entry
+                self._drop()
+            else:
+                if len(self._latest) >= self.maxsize:
+                    self._latest.popitem(last=False)
+                    self._drop()
+                self._latest[symbol] = entry
+        else:
+            if len(self._queue) >= self.maxsize:
+                self._queue.popleft()
+                self._drop()
+            self._queue.append(entry)
+
+        self._ready.set()
+
+    def _drop(self):
+        self.dropped += 1
+        TICKS_DROPPED.labels(self.name).inc()
+
+    def _take(self) -> Optional[Tuple[float, dict]]:
+        if self._latest:
+            return self._latest.popitem(last=False)[1]
+        if self._queue:
+            return self._queue.popleft()
+        return None
+
+    async def run(self):
+        """Deliver pending ticks to the callback until cancelled."""
+        while True:
+            await self._ready.wait()
+            entry = self._take()
+            if entry is None:
+                self._ready.clear()
+                continue
+
+            enqueued_at, price_data = entry
+            started = time.perf_counter()
+            TICK_QUEUE_SECONDS.labels(self.name).observe(started - enqueued_at)
+
+            try:
+                with tracer.span(
+                    "tick.deliver",
+                    start_time=price_data.get("exchange_ts"),
+                    callback=self.name,
+                    symbol=price_data.get("symbol"),
+                    seq=price_data.get("seq"),
+                    queued_ms=round((started - enqueued_at) * 1000, 3)
+                ):
+                    if self.is_async:
+                        await self.callback(price_data)
+                    else:
+                        self.callback(price_data)
+            except Exception as e:
+                print(f"Callback error ({self.name}): {e}")
+            finally:
+                PRICE_CALLBACK_SECONDS.labels(self.name).observe(time.perf_counter() - started)
+
+            # Let the read loop and other subscribers run between ticks
+            await asyncio.sleep(0)
+
+
+class TickDispatcher:
+    """
+    Publishes ticks to subscribers through per-subscriber queues.
+
+    Consumer tasks run while the dispatcher is started; subscribers added
+    before ``start`` begin consuming when it is called.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[Callable, _Subscriber] = {}
+        self._running = False
+
+    def subscribe(
+        self,
+        callback: Callable,
+        policy: Optional[OverflowPolicy] = None,
+        maxsize: Optional[int] = None
+    ):
+        """
+        Register a callback.
+
+        Args:
+            callback: Sync or async function taking the tick dict
+            policy: Overflow policy (defaults to ``tick_dispatch_policy``)
+            maxsize: Queue bound (defaults to ``tick_dispatch_queue_size``)
+        """
+        if callback in self._subscribers:
+            return
+
+        subscriber = _Subscriber(
+            callback,
+            OverflowPolicy(policy or settings.tick_dispatch_policy),
+            maxsize or settings.tick_dispatch_queue_size
+        )
+        self._subscribers[callback] = subscriber
+        if self._running:
+            subscriber.task = asyncio.create_task(subscriber.run())
+
+    def unsubscribe(self, callback: Callable):
+        subscriber = self._subscribers.pop(callback, None)
+        if subscriber is not None and subscriber.task is not None:
+            subscriber.task.cancel()
+
+    def publish(self, price_data: dict):
+        """Hand a tick to every subscriber; never blocks."""
+        for subscriber in self._subscribers.values():
+            subscriber.offer(price_data)
+
+    def start(self):
+        """Start consumer tasks (requires a running event loop)."""
+        self._running = True
+        for subscriber in self._subscribers.values():
+            if subscriber.task is None or subscriber.task.done():
+                subscriber.task = asyncio.create_task(subscriber.run())
+
+    async def stop(self):
+        """Cancel consumer tasks; pending ticks are discarded."""
+        self._running = False
+        tasks = [s.task for s in self._subscribers.values() if s.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for subscriber in self._subscribers.values():
+            subscriber.task = None
+
+    @property
+    def callbacks(self) -> List[Callable]:
+        return list(self._subscribers)
+
+    def stats(self) -> Dict[str, dict]:
+        """Queue depth and drop counts per subscriber."""
+        return {
+            s.name: {"policy": s.policy.value, "pending": s.pending, "dropped": s.dropped}
+            for s in self._subscribers.values()
+        }
@@ -0,0 +1,254 @@
+"""
+Per-second traded volume from Bybit ``publicTrade.{symbol}`` streams.
+
+Each symbol keeps a ring of ``trade_bucket_seconds`` one-second buckets
+(volume, taker-buy volume, quote volume and trade count) in preallocated
+numpy arrays, so memory per symbol is fixed however busy the market is. A
+slot also stores the epoch second it holds; a slot whose second is outside
+the queried range is simply treated as empty, so nothing is cleared when
+the ring wraps.
+
+Trades of the current second accumulate in plain Python floats and are
+written to the ring when the second changes (or before a read), keeping
+ingest to a few float additions per trade. Late trades within the ring go
+straight into their slot.
+"""
+import time
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.config import settings
+from app.core.metrics import TRADES_RECEIVED
+
+# Bucket sizes served by the API (seconds)
+TRADE_RESOLUTIONS = (1, 5, 15, 60)
+
+
+class SymbolTrades:
+    """Ring of one-second trade buckets for one symbol."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.seconds = np.full(size, -1, dtype=np.int64)
+        self.volume = np.zeros(size)
+        self.buy_volume = np.zeros(size)
+        self.quote_volume = np.zeros(size)
+        self.trades = np.zeros(size, dtype=np.int64)
+
+        # Running total since start; candle volume is taken from its increases
+        self.total_volume = 0.0
+        self.last_price: Optional[float] = None
+        self.version = 0  # Bumped per trade, for cached window sums
+
+        # Current second, not yet written to the ring
+        self._second = -1
+        self._volume = 0.0
+        self._buy_volume = 0.0
+        self._quote_volume = 0.0
+        self._trades = 0
+
+    def _store(self):
+        """Write the current second to its slot."""
+        if self._second < 0:
+            return
+        slot = self._second % self.size
+        self.seconds[slot] = self._second
+        self.volume[slot] = self._volume
+        self.buy_volume[slot] = self._buy_volume
+        self.quote_volume[slot] = self._quote_volume
+        self.trades[slot] = self._trades
+
+    def add(self, second: int, price: float, size: float, is_buy: bool):
+        """Record one trade."""
+        self.total_volume += size
+        self.version += 1
+
+        if second == self._second:
+            self._volume += size
+            self._quote_volume += price * size
+            self._trades += 1
+            if is_buy:
+                self._buy_volume += size
+            self.last_price = price
+            return
+
+        if second > self._second:
+            self._store()
+            self._second = second
+            self._volume = size
+            self._quote_volume = price * size
+            self._trades = 1
+            self._buy_volume = size if is_buy else 0.0
+            self.last_price = price
+            return
+
+        # Late trade for an earlier second still in the ring
+        if self._second - second >= self.size:
+            return
+        slot = second % self.size
+        if self.seconds[slot] != second:
+            self.seconds[slot] = second
+            self.volume[slot] = self.buy_volume[slot] = self.quote_volume[slot] = 0.0
+            self.trades[slot] = 0
+        self.volume[slot] += size
+        self.quote_volume[slot] += price * size
+        self.trades[slot] += 1
+        if is_buy:
+            self.buy_volume[slot] += size
+
+    def _slots(self, start: int, end: int):
+        start = max(start, end - self.size + 1)
+        wanted = np.arange(start, end + 1, dtype=np.int64)
+        slots = wanted % self.size
+        return wanted, slots, self.seconds[slots] == wanted
+
+    def total(self, column: str, start: int, end: int) -> float:
+        """Sum of one column over ``[start, end]``."""
+        self._store()
+        _, slots, valid = self._slots(start, end)
+        return float(getattr(self, column)[slots][valid].sum())
+
+    def window(self, start: int, end: int) -> Dict[str, np.ndarray]:
+        """
+        Per-second columns for ``[start, end]``, oldest first.
+
+        Seconds with no trades (or already overwritten) are zero.
+        """
+        self._store()
+        wanted, slots, valid = self._slots(start, end)
+        return {
+            "start": wanted,
+            "volume": np.where(valid, self.volume[slots], 0.0),
+            "buy_volume": np.where(valid, self.buy_volume[slots], 0.0),
+            "quote_volume": np.where(valid, self.quote_volume[slots], 0.0),
+            "trades": np.where(valid, self.trades[slots], 0),
+        }
+
+
+class TradeFlow:
+    """Trade buckets for all symbols."""
+
+    def __init__(self, bucket_seconds: Optional[int] = None):
+        """
+        Args:
+            bucket_seconds: Seconds kept per symbol (defaults to
+                ``trade_bucket_seconds``)
+        """
+        self.bucket_seconds = settings.trade_bucket_seconds if bucket_seconds is None else bucket_seconds
+        self.symbols: Dict[str, SymbolTrades] = {}
+        # (symbol, seconds) -> (end second, version, quote volume)
+        self._quote_cache: Dict[tuple, tuple] = {}
+
+    def get(self, symbol: str) -> Optional[SymbolTrades]:
+        return self.symbols.get(symbol)
+
+    def add_trades(self, symbol: str, trades: Iterable[dict]):
+        """
+        Record a ``publicTrade`` message's trades.
+
+        Args:
+            symbol: Trading pair
+            trades: Bybit trade entries (``T`` ms, ``p``, ``v``, ``S``)
+        """
+        book = self.symbols.get(symbol)
+        if book is None:
+            book = self.symbols[symbol] = SymbolTrades(self.bucket_seconds)
+
+        count = 0
+        add = book.add
+        for trade in trades:
+            add(trade["T"] // 1000, float(trade["p"]), float(trade["v"]), trade["S"] == "Buy")
+            count += 1
+        TRADES_RECEIVED.labels(symbol).inc(count)
+
+    def cumulative_volume(self, symbol: str) -> Optional[float]:
+        """Volume traded since startup, or None if no trades were seen."""
+        book = self.symbols.get(symbol)
+        return book.total_volume if book is not None else None
+
+    def quote_volume(self, symbol: str, seconds: int, now: Optional[float] = None) -> Optional[float]:
+        """
+        Quote volume over the last ``seconds`` seconds.
+
+        Cached until the second or the symbol's trades change, so alerts
+        sharing a window cost one sum per tick.
+        """
+        book = self.symbols.get(symbol)
+        if book is None:
+            return None
+        end = int(now if now is not None else time.time())
+        key = (symbol, seconds)
+        cached = self._quote_cache.get(key)
+        if cached is not None and cached[0] == end and cached[1] == book.version:
+            return cached[2]
+        value = book.total("quote_volume", end - seconds + 1, end)
+        self._quote_cache[key] = (end, book.version, value)
+        return value
+
+    def summary(self, symbol: str, seconds: int, now: Optional[float] = None) -> Optional[dict]:
+        """
+        Totals over the last ``seconds`` seconds.
+
+        Returns:
+            Dict with volume, buy/sell split, quote volume, trade count and
+            VWAP, or None if no trades were seen for the symbol
+        """
+        book = self.symbols.get(symbol)
+        if book is None:
+            return None
+        end = int(now if now is not None else time.time())
+        window = book.window(end - seconds + 1, end)
+        return self._totals(
+            int(window["start"][0]) if len(window["start"]) else end,
+            float(window["volume"].sum()),
+            float(window["buy_volume"].sum()),
+            float(window["quote_volume"].sum()),
+            int(window["trades"].sum())
+        )
+
+    def buckets(self, symbol: str, seconds: int, resolution: int = 1, now: Optional[float] = None) -> Optional[List[dict]]:
+        """
+        Buckets of ``resolution`` seconds covering the last ``seconds`` seconds.
+
+        Buckets are aligned to multiples of ``resolution``; the last one is
+        still filling.
+        """
+        book = self.symbols.get(symbol)
+        if book is None:
+            return None
+        end = int(now if now is not None else time.time())
+        first = (end - seconds + 1) // resolution * resolution
+        last = end // resolution * resolution + resolution - 1
+        window = book.window(first, last)
+
+        # A window clipped by the ring size may not start on a boundary
+        skip = (-int(window["start"][0])) % resolution
+        columns = {}
+        for name in ("volume", "buy_volume", "quote_volume", "trades"):
+            column = window[name][skip:]
+            columns[name] = column.reshape(-1, resolution).sum(axis=1)
+        starts = window["start"][skip::resolution]
+
+        return [
+            self._totals(int(start), float(volume), float(buy), float(quote), int(trades))
+            for start, volume, buy, quote, trades in zip(
+                starts, columns["volume"], columns["buy_volume"], columns["quote_volume"], columns["trades"]
+            )
+        ]
+
+    @staticmethod
+    def _totals(start: int, volume: float, buy: float, quote: float, trades: int) -> dict:
+        return {
+            "start": start,
+            "volume": volume,
+            "buy_volume": buy,
+            "sell_volume": volume - buy,
+            "quote_volume": quote,
+            "trades": trades,
+            "vwap": quote / volume if volume > 0 else None
+        }
+
+
+# Global instance
+trade_flow = TradeFlow()
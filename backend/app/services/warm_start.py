@@ -0,0 +1,173 @@
+"""
+Warm start: last-known prices and candles kept across restarts.
+
+The consolidated price cache and the indicator engine's candle series are
+snapshotted to a local JSON file every ``warm_start_interval_seconds`` and
+on shutdown. During startup, before the API serves traffic, the snapshot is
+loaded back: prices are served straight away (flagged stale by
+``PriceFeed.is_stale`` until a fresh tick arrives) and candles resume where
+they left off, so indicators need not warm up again. Snapshots older than
+``warm_start_max_age_seconds`` are ignored.
+
+Time from startup until current prices can be served is exported as
+``cryptoflyt_first_price_seconds``, labelled with whether the snapshot or
+the live stream provided them. The stream's first price is timed on every
+start, warm or cold, so the two can be compared.
+"""
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+from app.config import settings
+from app.core.metrics import FIRST_PRICE_SECONDS
+from app.services.indicators import IndicatorEngine, indicator_engine
+from app.services.price_feed import PriceFeed, price_feed
+
+SNAPSHOT_VERSION = 1
+
+# Tick fields stored as ISO strings in the snapshot
+DATETIME_FIELDS = ("exchange_ts", "received_at", "timestamp")
+
+
+class WarmStartStore:
+    """Snapshots prices and candles to disk and restores them on startup."""
+
+    def __init__(
+        self,
+        path: str,
+        feed: PriceFeed = price_feed,
+        indicators: IndicatorEngine = indicator_engine
+    ):
+        """
+        Args:
+            path: Snapshot file
+            feed: Price cache to snapshot and seed
+            indicators: Candle series to snapshot and restore
+        """
+        self.path = Path(path)
+        self.feed = feed
+        self.indicators = indicators
+        self.interval = settings.warm_start_interval_seconds
+        self.max_age = settings.warm_start_max_age_seconds
+        self.running = False
+        self.first_price_seconds: Dict[str, float] = {}  # per source
+        # The global instance is created at import, i.e. at process startup
+        self._started_at = time.perf_counter()
+
+    # -------------------------------------------------------------------------
+    # Snapshots
+    # -------------------------------------------------------------------------
+
+    def snapshot(self) -> dict:
+        """Current prices and candles as a JSON-serializable dict."""
+        return {
+            "version": SNAPSHOT_VERSION,
+            "saved_at": time.time(),
+            "prices": {
+                symbol: {k: v.isoformat() if isinstance(v, datetime) else v for k, v in tick.items()}
+                for symbol, tick in self.feed.get_current_prices().items()
+            },
+            "candles": self.indicators.export_state()
+        }
+
+    def _write(self, snapshot: dict):
+        # Write then rename so a crash mid-write keeps the previous snapshot
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(snapshot, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
+
+    def save(self):
+        """Write a snapshot (blocking)."""
+        self._write(self.snapshot())
+
+    async def run(self):
+        """Snapshot periodically until stopped."""
+        self.running = True
+        while self.running:
+            await asyncio.sleep(self.interval)
+            try:
+                # Capture on the loop, serialize and write off it
+                await asyncio.to_thread(self._write, self.snapshot())
+            except Exception as e:
+                print(f"Warm start snapshot error: {e}")
+
+    def stop(self):
+        """Stop the snapshot loop and write a final snapshot."""
+        self.running = False
+        try:
+            self.save()
+        except Exception as e:
+            print(f"Warm start snapshot error: {e}")
+
+    # -------------------------------------------------------------------------
+    # Restore
+    # -------------------------------------------------------------------------
+
+    def _read(self) -> Optional[dict]:
+        if not self.path.exists():
+            return None
+        try:
+            with open(self.path) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠ Warm start snapshot unreadable, starting cold: {e}")
+            return None
+
+        if snapshot.get("version") != SNAPSHOT_VERSION:
+            print("⚠ Warm start snapshot has an old format, starting cold")
+            return None
+        age = time.time() - snapshot["saved_at"]
+        if age > self.max_age:
+            print(f"⚠ Warm start snapshot is {age / 60:.0f} minutes old, starting cold")
+            return None
+        return snapshot
+
+    def load(self) -> bool:
+        """
+        Restore the last snapshot into the price cache and candle series.
+
+        Call during startup, before the price feed connects.
+
+        Returns:
+            True if any prices were restored
+        """
+        snapshot = self._read()
+        if snapshot is None:
+            return False
+
+        prices = {
+            symbol: {
+                k: datetime.fromisoformat(v) if k in DATETIME_FIELDS and isinstance(v, str) else v
+                for k, v in tick.items()
+            }
+            for symbol, tick in snapshot["prices"].items()
+        }
+        restored_prices = self.feed.restore(prices)
+        restored_candles = self.indicators.restore_state(snapshot["candles"])
+
+        age = time.time() - snapshot["saved_at"]
+        print(f"✓ Warm start: restored {restored_prices} prices and {restored_candles} candle sets ({age:.0f}s old)")
+        if restored_prices:
+            self._record_first_price("snapshot")
+        return restored_prices > 0
+
+    def _record_first_price(self, source: str):
+        seconds = time.perf_counter() - self._started_at
+        self.first_price_seconds[source] = seconds
+        FIRST_PRICE_SECONDS.labels(source).set(seconds)
+        print(f"✓ Prices available {seconds * 1000:.0f}ms after startup (from {source})")
+
+    async def on_price_update(self, price_data: dict):
+        """Price feed callback timing the first streamed price (REST polls aside)."""
+        if "stream" not in self.first_price_seconds and not price_data.get("polled"):
+            self._record_first_price("stream")
+
+
+# Global instance
+warm_start = WarmStartStore(settings.warm_start_path)
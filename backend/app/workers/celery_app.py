@@ -36,6 +36,10 @@ celery_app.conf.beat_schedule = {
         'task': 'app.workers.tasks.update_price_history',
         'schedule': 300.0,  # Run every 5 minutes
     },
+    'snapshot-portfolios': {
+        'task': 'app.workers.tasks.snapshot_portfolios',
+        'schedule': crontab(hour=0, minute=5),  # Daily, just after midnight UTC
+    },
 }
 
 if __name__ == '__main__':
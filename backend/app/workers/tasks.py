@@ -4,10 +4,11 @@ Celery background tasks for CryptoFlyt.
 import asyncio
 from datetime import datetime
 from app.workers.celery_app import celery_app
-from app.core.database import SessionLocal
+from app.core.database import SessionLocal, AsyncSessionLocal, async_engine
 from app.models.price import PriceHistory
-from app.services.bybit import bybit_client
+from app.services.price_feed import price_feed
 from app.services.alert_checker import AlertChecker
+from app.services.bulk_valuation import bulk_valuation
 from app.config import settings
 
 
@@ -17,20 +18,22 @@ def check_price_alerts():
     Periodic task to check if any price alerts should be triggered.
     Runs every 60 seconds.
     """
-    db = SessionLocal()
     try:
         # Get current prices
-        prices = bybit_client.get_current_prices()
-        
-        # Create AlertChecker instance
-        checker = AlertChecker(db)
+        prices = price_feed.get_current_prices()
         
         # Check alerts for each symbol (using asyncio to handle async methods)
         async def check_all_alerts():
             all_triggered = []
-            for symbol, price_data in prices.items():
-                triggered = await checker.check_alerts(symbol, price_data['price'])
-                all_triggered.extend(triggered)
+            try:
+                async with AsyncSessionLocal() as db:
+                    checker = AlertChecker(db)
+                    for symbol, price_data in prices.items():
+                        triggered = await checker.check_alerts(symbol, price_data['price'])
+                        all_triggered.extend(triggered)
+            finally:
+                # Pooled connections are bound to this run's event loop
+                await async_engine.dispose()
             return all_triggered
         
         # Run the async function
@@ -48,8 +51,6 @@ def check_price_alerts():
             'error': str(e),
             'timestamp': datetime.utcnow().isoformat()
         }
-    finally:
-        db.close()
 
 
 @celery_app.task(name='app.workers.tasks.update_price_history')
@@ -60,7 +61,7 @@ def update_price_history():
     """
     db = SessionLocal()
     try:
-        prices = bybit_client.get_current_prices()
+        prices = price_feed.get_current_prices()
         records_created = 0
         
         for symbol, data in prices.items():
@@ -94,6 +95,32 @@ def update_price_history():
         db.close()
 
 
+@celery_app.task(name='app.workers.tasks.snapshot_portfolios')
+def snapshot_portfolios():
+    """
+    Periodic task to value every portfolio and store daily snapshots.
+    Runs once a day.
+    """
+    db = SessionLocal()
+    try:
+        result = bulk_valuation.snapshot_all(db)
+        
+        return {
+            'status': 'success',
+            **result,
+            'timestamp': datetime.utcnow().isoformat()
+        }
+    except Exception as e:
+        db.rollback()
+        return {
+            'status': 'error',
+            'error': str(e),
+            'timestamp': datetime.utcnow().isoformat()
+        }
+    finally:
+        db.close()
+
+
 @celery_app.task(name='app.workers.tasks.send_notification')
 def send_notification(user_id: int, message: str, notification_type: str = 'alert'):
     """
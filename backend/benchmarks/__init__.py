@@ -0,0 +1 @@
+"""Performance benchmarks (no network required)."""
@@ -0,0 +1,54 @@
+"""
+Run the benchmark suite and emit one JSON report.
+
+Seeds a synthetic population once, starts the fake Bybit server and the
+API, then runs the ingest, alert evaluation and API benchmarks. Save the
+report per commit and diff the percentiles to spot regressions.
+
+Usage:
+    python -m benchmarks --output benchmarks/results/$(git rev-parse --short HEAD).json
+"""
+import argparse
+import asyncio
+import json
+import os
+
+from benchmarks import harness
+from benchmarks import bench_alert_eval, bench_api, bench_ingest
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=1000, help="Synthetic users")
+    parser.add_argument("--alerts-per-user", type=int, default=5)
+    parser.add_argument("--holdings-per-user", type=int, default=3)
+    parser.add_argument("--history-per-symbol", type=int, default=1000, help="price_history rows per symbol in the last hour")
+    parser.add_argument("--output", help="Also write the report to this file")
+    bench_ingest.add_arguments(parser)
+    bench_alert_eval.add_arguments(parser)
+    bench_api.add_arguments(parser)
+    args = parser.parse_args()
+
+    async def go():
+        with harness.quiet():
+            user_ids = harness.seed_population(
+                args.users, args.alerts_per_user, args.holdings_per_user, args.history_per_symbol
+            )
+            async with harness.bench_environment() as env:
+                return {
+                    "ingest": await bench_ingest.run(args, env),
+                    "alert_eval": await bench_alert_eval.run(args, env),
+                    "api": await bench_api.run(args, env, user_ids)
+                }
+
+    report = json.dumps(harness.report("suite", vars(args), asyncio.run(go())), indent=2)
+    print(report)
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+
+
+if __name__ == "__main__":
+    main()
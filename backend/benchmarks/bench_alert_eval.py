@@ -0,0 +1,64 @@
+"""
+Benchmark alert evaluation for one tick against the synthetic population.
+
+Times ``AlertChecker.check_alerts`` (evaluate the symbol's active alerts in
+the alert engine) per tick, cycling through the supported symbols. The
+first tick includes loading the alerts into the engine.
+
+Usage:
+    python -m benchmarks.bench_alert_eval --ticks 200
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks import harness
+from app.core.database import AsyncSessionLocal
+from app.services.alert_checker import AlertChecker
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    group = parser.add_argument_group("alert evaluation")
+    group.add_argument("--ticks", type=int, default=200, help="Ticks to evaluate")
+
+
+async def run(args, env: dict = None) -> dict:
+    latencies = []
+    triggered = 0
+
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        checker = AlertChecker(db, persist=False)
+        for i in range(args.ticks):
+            symbol = harness.SYMBOLS[i % len(harness.SYMBOLS)]
+            tick_started = time.perf_counter()
+            triggered += len(await checker.check_alerts(symbol, harness.BASE_PRICES[symbol]))
+            latencies.append(time.perf_counter() - tick_started)
+        await db.rollback()
+    elapsed = time.perf_counter() - started
+
+    return {
+        "triggered": triggered,
+        "check_alerts": harness.summarize(latencies, elapsed)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_arguments(parser)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--alerts-per-user", type=int, default=5)
+    args = parser.parse_args()
+
+    async def go():
+        with harness.quiet():
+            harness.seed_population(args.users, args.alerts_per_user, 0, 0)
+            return await run(args)
+
+    results = asyncio.run(go())
+    print(json.dumps(harness.report("alert_eval", vars(args), results), indent=2))
+
+
+if __name__ == "__main__":
+    main()
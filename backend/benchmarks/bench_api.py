@@ -0,0 +1,86 @@
+"""
+Benchmark request throughput and latency of hot API endpoints.
+
+Drives ``GET /api/portfolio`` (as randomly chosen synthetic users) and
+``GET /api/prices/history/{symbol}`` with a fixed number of concurrent
+workers against the API served on loopback.
+
+Usage:
+    python -m benchmarks.bench_api --requests 2000 --concurrency 32
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import httpx
+
+from benchmarks import harness
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    group = parser.add_argument_group("api")
+    group.add_argument("--requests", type=int, default=1000, help="Requests per endpoint")
+    group.add_argument("--concurrency", type=int, default=32, help="Concurrent workers")
+
+
+async def _load(client: httpx.AsyncClient, make_request, total: int, concurrency: int) -> dict:
+    latencies = []
+    errors = 0
+    remaining = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            method, url, headers = make_request()
+            started = time.perf_counter()
+            response = await client.request(method, url, headers=headers)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    return {"errors": errors, **harness.summarize(latencies, elapsed)}
+
+
+async def run(args, env: dict, user_ids: list) -> dict:
+    rng = random.Random(42)
+    tokens = {user_id: harness.token_for(user_id) for user_id in user_ids}
+
+    def portfolio_request():
+        token = tokens[rng.choice(user_ids)]
+        return "GET", "/api/portfolio", {"Authorization": f"Bearer {token}"}
+
+    def history_request():
+        symbol = rng.choice(harness.SYMBOLS)
+        return "GET", f"/api/prices/history/{symbol}?period=1h", None
+
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=f"http://{env['host']}", limits=limits, timeout=60) as client:
+        return {
+            "portfolio": await _load(client, portfolio_request, args.requests, args.concurrency),
+            "prices_history": await _load(client, history_request, args.requests, args.concurrency)
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_arguments(parser)
+    parser.add_argument("--users", type=int, default=1000)
+    args = parser.parse_args()
+
+    async def go():
+        with harness.quiet():
+            user_ids = harness.seed_population(args.users, 0, 3, 1000)
+            async with harness.bench_environment() as env:
+                return await run(args, env, user_ids)
+
+    results = asyncio.run(go())
+    print(json.dumps(harness.report("api", vars(args), results), indent=2))
+
+
+if __name__ == "__main__":
+    main()
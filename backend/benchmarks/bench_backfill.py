@@ -0,0 +1,143 @@
+"""
+Benchmark and check the kline candle backfill.
+
+Runs ``KlineBackfill`` against the fake Bybit server's kline endpoint
+(``--latency-ms`` per request, ``--server-rate-limit`` requests per second
+before HTTP 429) and reports, per scenario, wall time, requests, 429s and
+whether every series came back complete (no missing or wrong candles):
+
+- cold: empty table, concurrent fetches;
+- resume: an immediate second run, which should need one request per series;
+- serial: cold again with one request in flight, for comparison;
+- throttled: the server's limit lowered to ``--throttled-server-limit``
+  below the client's rate, so requests are rejected and must be retried.
+
+Finally ``GET /api/prices/history`` is checked to serve the stored candles.
+
+Usage:
+    python -m benchmarks.bench_backfill --concurrency 8 --latency-ms 50
+"""
+import argparse
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import httpx
+from sqlalchemy import delete
+
+from benchmarks import harness
+from benchmarks.fake_bybit import FakeBybitServer, fake_kline
+from app.core.database import SessionLocal, init_db
+from app.models.price import PriceCandle
+from app.services.kline_backfill import BYBIT_INTERVALS, KlineBackfill, RateLimiter
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    group = parser.add_argument_group("backfill")
+    group.add_argument("--concurrency", type=int, default=8, help="Kline requests in flight")
+    group.add_argument("--rate", type=float, default=50.0, help="Client request starts per second")
+    group.add_argument("--latency-ms", type=float, default=50.0, help="Fake server latency per request")
+    group.add_argument("--server-rate-limit", type=float, default=60.0, help="Fake server requests per second before 429")
+    group.add_argument("--throttled-server-limit", type=float, default=10.0, help="Server limit in the throttled scenario")
+
+
+def _clear():
+    db = SessionLocal()
+    try:
+        db.execute(delete(PriceCandle))
+        db.commit()
+    finally:
+        db.close()
+
+
+def _check(backfill: KlineBackfill, now: datetime) -> dict:
+    """Compare stored candles with what the fake server serves for each window."""
+    db = SessionLocal()
+    try:
+        missing = wrong = 0
+        for symbol in harness.SYMBOLS:
+            for interval, days in backfill.days.items():
+                seconds = BYBIT_INTERVALS[interval][1]
+                step = seconds * 1000
+                cutoff_ms = int((now - timedelta(days=days) - datetime(1970, 1, 1)).total_seconds() * 1000)
+                now_ms = int((now - datetime(1970, 1, 1)).total_seconds() * 1000)
+                expected = range(cutoff_ms - cutoff_ms % step, now_ms + 1, step)
+
+                stored = {
+                    int((row.start - datetime(1970, 1, 1)).total_seconds() * 1000): row.close
+                    for row in db.query(PriceCandle).filter(
+                        PriceCandle.symbol == symbol, PriceCandle.interval == interval
+                    )
+                }
+                for start in expected:
+                    if start not in stored:
+                        missing += 1
+                    elif abs(stored[start] - float(fake_kline(symbol, start, seconds)[4])) > 1e-6:
+                        wrong += 1
+        return {"missing": missing, "wrong": wrong}
+    finally:
+        db.close()
+
+
+async def _scenario(server: FakeBybitServer, backfill: KlineBackfill) -> dict:
+    requests, rejected = server.kline_requests, server.kline_rejected
+    result = await backfill.backfill(harness.SYMBOLS)
+    return {
+        **result,
+        "requests": server.kline_requests - requests,
+        "rejected_429": server.kline_rejected - rejected,
+        **_check(backfill, datetime.utcnow())
+    }
+
+
+async def run(args, env: dict = None) -> dict:
+    init_db()
+    server = FakeBybitServer(harness.free_port())
+    server.kline_latency = args.latency_ms / 1000
+    server.kline_rate_limit = args.server_rate_limit
+    await server.start()
+
+    def make(concurrency: int, rate: float) -> KlineBackfill:
+        backfill = KlineBackfill(base_url=f"http://127.0.0.1:{server.port}")
+        backfill.concurrency = concurrency
+        backfill.limiter = RateLimiter(rate)
+        return backfill
+
+    results = {}
+    try:
+        _clear()
+        backfill = make(args.concurrency, args.rate)
+        results["cold"] = await _scenario(server, backfill)
+        results["resume"] = await _scenario(server, backfill)
+
+        _clear()
+        await asyncio.sleep(1.0)  # let the server's rate window drain
+        results["serial"] = await _scenario(server, make(1, args.rate))
+
+        _clear()
+        await asyncio.sleep(1.0)
+        server.kline_rate_limit = args.throttled_server_limit
+        results["throttled"] = await _scenario(server, make(args.concurrency, args.throttled_server_limit * 10))
+        server.kline_rate_limit = args.server_rate_limit
+
+        transport = httpx.ASGITransport(app=harness.app.main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://api") as client:
+            body = (await client.get("/api/prices/history/BTCUSDT", params={"period": "24h"})).json()
+        results["history_24h"] = {"resolution": body["resolution"], "points": len(body["data"])}
+    finally:
+        await server.stop()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    with harness.quiet():
+        results = asyncio.run(run(args))
+    print(json.dumps(harness.report("backfill", vars(args), results), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark tick ingest and price WebSocket fan-out.
+
+Streams ticker frames from the fake Bybit server into the running API and
+measures, at N simulated browser clients on ``/api/prices/ws``, delivery
+throughput and the latency from the frame's exchange timestamp to receipt.
+Every tick also runs the registered callbacks (alert checks against the
+synthetic alert population, portfolio valuation, tick archive).
+
+Usage:
+    python -m benchmarks.bench_ingest --clients 50 --rate 50 --duration 5
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timezone
+
+import aiohttp
+
+from benchmarks import harness
+from benchmarks.fake_bybit import recorded_frames, synthetic_frames
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    group = parser.add_argument_group("ingest")
+    group.add_argument("--clients", type=int, default=50, help="Simulated browser clients")
+    group.add_argument("--rate", type=float, default=50.0, help="Bybit frames per second")
+    group.add_argument("--duration", type=float, default=5.0, help="Seconds of streaming")
+    group.add_argument("--frames", help="Recorded Bybit frames (JSON lines); synthetic if omitted")
+
+
+async def _client(session: aiohttp.ClientSession, url: str, latencies: list, received: list, index: int):
+    async with session.ws_connect(url) as ws:
+        async for msg in ws:
+            if msg.type != aiohttp.WSMsgType.TEXT or msg.data in ("ping", "pong"):
+                continue
+            payload = json.loads(msg.data)
+            if payload.get("type") != "update":
+                continue
+
+            exchange_ts = payload["data"].get("exchange_ts")
+            if exchange_ts:
+                sent = datetime.fromisoformat(exchange_ts).replace(tzinfo=timezone.utc).timestamp()
+                latencies.append(time.time() - sent)
+            received[index] += 1
+
+
+async def run(args, env: dict) -> dict:
+    fake = env["fake_bybit"]
+    frames = recorded_frames(args.frames) if args.frames else synthetic_frames(harness.SYMBOLS, harness.BASE_PRICES)
+
+    latencies: list = []
+    received = [0] * args.clients
+    url = f"ws://{env['host']}/api/prices/ws"
+
+    async with aiohttp.ClientSession() as session:
+        tasks = [
+            asyncio.create_task(_client(session, url, latencies, received, i))
+            for i in range(args.clients)
+        ]
+        await asyncio.sleep(0.5)  # let clients connect and take their snapshot
+
+        sent_before = fake.frames_sent
+        started = time.perf_counter()
+        await fake.stream(frames, args.rate, args.duration)
+        sent = fake.frames_sent - sent_before
+
+        # Wait for the backlog to drain (coalescing subscribers may deliver
+        # fewer frames than were sent, so stop once delivery goes quiet)
+        last_delivered, last_change = -1, time.perf_counter()
+        while min(received) < sent and time.perf_counter() - last_change < 1.0:
+            if sum(received) != last_delivered:
+                last_delivered, last_change = sum(received), time.perf_counter()
+            await asyncio.sleep(0.05)
+        elapsed = (last_change if min(received) < sent else time.perf_counter()) - started
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    delivered = sum(received)
+    return {
+        "frames_sent": sent,
+        "frames_delivered_min_per_client": min(received) if received else 0,
+        "delivered_total": delivered,
+        "elapsed_seconds": round(elapsed, 3),
+        "ingest_rate_per_s": round(sent / elapsed, 1),
+        "tick_to_client": harness.summarize(latencies, elapsed)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_arguments(parser)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--alerts-per-user", type=int, default=5)
+    args = parser.parse_args()
+
+    async def go():
+        with harness.quiet():
+            harness.seed_population(args.users, args.alerts_per_user, 3, 1000)
+            async with harness.bench_environment() as env:
+                return await run(args, env)
+
+    results = asyncio.run(go())
+    print(json.dumps(harness.report("ingest", vars(args), results), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+Benchmark and check the consolidated multi-venue price feed.
+
+Runs ``PriceFeed`` against local fake venue servers (two Bybit, one
+Binance) and reports, per merge mode:
+
+- latest: Binance lags Bybit by ``--lag-ms``, so its ticks must be dropped
+  as out of order; then the Bybit server goes away and the feed must keep
+  publishing from Binance (failover gap reported).
+- median: three venues, one of which prints an outlier every
+  ``--outlier-every`` frames; no published price may follow the outlier.
+- fallback: the Bybit socket stays open but goes silent while its REST
+  tickers keep moving; the feed must switch to REST polling after
+  ``--stale-seconds`` and stop polling once the stream resumes.
+
+Usage:
+    python -m benchmarks.bench_price_feed --rate 200 --duration 3
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+
+from benchmarks import harness
+from benchmarks.fake_binance import FakeBinanceServer, ticker_frame
+from benchmarks.fake_bybit import FakeBybitServer
+from app.services.binance import BinanceWebSocketClient
+from app.services.bybit import BybitWebSocketClient
+from app.services.orderbook import OrderBookManager
+from app.services.price_feed import PriceFeed
+from app.services.tick_dispatcher import OverflowPolicy
+from app.services.trade_flow import TradeFlow
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    group = parser.add_argument_group("price feed")
+    group.add_argument("--rate", type=float, default=200.0, help="Frames per second per venue")
+    group.add_argument("--duration", type=float, default=3.0, help="Seconds of streaming per scenario")
+    group.add_argument("--lag-ms", type=int, default=2000, help="Binance timestamp lag in the latest scenario")
+    group.add_argument("--outlier-every", type=int, default=10, help="Outlier frequency in the median scenario")
+    group.add_argument("--stale-seconds", type=float, default=1.0, help="Staleness threshold in the fallback scenario")
+    group.add_argument("--poll-seconds", type=float, default=0.25, help="REST poll interval in the fallback scenario")
+
+
+def _bybit_frame(symbol: str, price: float) -> dict:
+    return {"topic": f"tickers.{symbol}", "type": "snapshot", "data": {"symbol": symbol, "lastPrice": f"{price:.6f}"}}
+
+
+def _bybit(port: int, name: str = "bybit") -> BybitWebSocketClient:
+    adapter = BybitWebSocketClient(books=OrderBookManager(), trades=TradeFlow())
+    adapter.ws_url = f"ws://127.0.0.1:{port}/v5/public/spot"
+    adapter.name = name
+    adapter._reconnect_delay = 0.5
+    return adapter
+
+
+def _binance(port: int) -> BinanceWebSocketClient:
+    adapter = BinanceWebSocketClient()
+    adapter.ws_url = f"ws://127.0.0.1:{port}/stream"
+    adapter._reconnect_delay = 0.5
+    return adapter
+
+
+class _Recorder:
+    """Price feed subscriber recording what it receives."""
+
+    def __init__(self):
+        self.ticks = []
+
+    async def __call__(self, tick: dict):
+        self.ticks.append((time.time(), tick))
+
+
+async def _run_feed(feed: PriceFeed, servers: list, body) -> tuple:
+    recorder = _Recorder()
+    feed.add_callback(recorder.__call__, OverflowPolicy.DROP_OLDEST, maxsize=100_000)
+    for server in servers:
+        await server.start()
+    task = asyncio.create_task(feed.listen())
+    try:
+        if not await harness.wait_for(lambda: all(s.clients for s in servers), timeout=10):
+            raise RuntimeError("Price feed did not connect to every fake venue")
+        result = await body()
+        await asyncio.sleep(0.2)  # let the dispatcher drain
+        return recorder.ticks, result
+    finally:
+        await feed.disconnect()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        for server in servers:
+            await server.stop()
+
+
+def _paced(rate: float, duration: float):
+    """Yield step indices at ``rate`` per second."""
+    async def steps():
+        interval = 1.0 / rate
+        started = time.perf_counter()
+        for i in range(int(rate * duration)):
+            delay = started + i * interval - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            yield i
+    return steps()
+
+
+async def _latest(args) -> dict:
+    bybit_server = FakeBybitServer(harness.free_port())
+    binance_server = FakeBinanceServer(harness.free_port())
+    feed = PriceFeed([_bybit(bybit_server.port), _binance(binance_server.port)], mode="latest")
+    rng = np.random.default_rng(1)
+    price = harness.BASE_PRICES["BTCUSDT"]
+
+    async def body():
+        async for _ in _paced(args.rate, args.duration):
+            price_now = price * float(np.exp(rng.normal(0, 0.0005)))
+            now_ms = int(time.time() * 1000)
+            await bybit_server.send(_bybit_frame("BTCUSDT", price_now), now_ms)
+            await binance_server.send(ticker_frame("BTCUSDT", price_now), now_ms - args.lag_ms)
+
+        # Bybit goes away; Binance catches up and carries the feed alone
+        await bybit_server.stop()
+        failed_at = time.time()
+        async for _ in _paced(args.rate, args.duration):
+            await binance_server.send(ticker_frame("BTCUSDT", price))
+        return failed_at
+
+    ticks, failed_at = await _run_feed(feed, [bybit_server, binance_server], body)
+    before = [t for received, t in ticks if received < failed_at]
+    after = [received for received, t in ticks if received >= failed_at and t["exchange"] == "binance"]
+    latencies = [received - t["exchange_ts"].timestamp() for received, t in ticks if t["exchange"] == "bybit"]
+
+    return {
+        "published_before_failover": len(before),
+        "binance_published_before_failover": sum(1 for t in before if t["exchange"] == "binance"),
+        "published_after_failover": len(after),
+        "failover_gap_ms": round((after[0] - failed_at) * 1000, 1) if after else None,
+        "tick_to_subscriber": harness.summarize(latencies, args.duration)
+    }
+
+
+async def _median(args) -> dict:
+    servers = [FakeBybitServer(harness.free_port()), FakeBybitServer(harness.free_port()), FakeBinanceServer(harness.free_port())]
+    feed = PriceFeed(
+        [_bybit(servers[0].port), _bybit(servers[1].port, "bybit-b"), _binance(servers[2].port)],
+        mode="median"
+    )
+    rng = np.random.default_rng(2)
+    walk = {}
+
+    async def body():
+        price = harness.BASE_PRICES["ETHUSDT"]
+        async for i in _paced(args.rate, args.duration):
+            price *= float(np.exp(rng.normal(0, 0.0005)))
+            outlier = price * 1.5 if i % args.outlier_every == 0 else price
+            walk[i] = price
+            await servers[0].send(_bybit_frame("ETHUSDT", price))
+            await servers[1].send(_bybit_frame("ETHUSDT", price * 1.0001))
+            await servers[2].send(ticker_frame("ETHUSDT", outlier))
+
+    ticks, _ = await _run_feed(feed, servers, body)
+    prices = np.array([t["price"] for _, t in ticks if len(t["sources"]) == 3])
+    reference = max(walk.values()) if walk else 0.0
+
+    return {
+        "published": len(ticks),
+        "published_from_three_venues": int(len(prices)),
+        "max_published_vs_walk_high": round(float(prices.max() / reference), 5) if len(prices) else None,
+        "outliers_passed": int((prices > reference * 1.01).sum())
+    }
+
+
+async def _fallback(args) -> dict:
+    server = FakeBybitServer(harness.free_port())
+    adapter = _bybit(server.port)
+    adapter.rest_url = f"http://127.0.0.1:{server.port}"
+    adapter.symbols = ["BTCUSDT"]
+    feed = PriceFeed([adapter], mode="latest")
+    feed.stale_after = args.stale_seconds
+    feed.poll_interval = args.poll_seconds
+    feed.rest_fallback = True
+    rng = np.random.default_rng(3)
+    price = harness.BASE_PRICES["BTCUSDT"]
+    marks = {}
+
+    async def body():
+        nonlocal price
+        async for _ in _paced(args.rate, args.duration):
+            price *= float(np.exp(rng.normal(0, 0.0005)))
+            await server.send(_bybit_frame("BTCUSDT", price))
+
+        # Stream goes silent with the socket open; REST tickers keep moving
+        marks["silent_at"] = time.time()
+        marks["stale_flagged"] = False
+        async for _ in _paced(20, args.stale_seconds + args.duration):
+            price *= float(np.exp(rng.normal(0, 0.0005)))
+            server.tickers["BTCUSDT"] = _bybit_frame("BTCUSDT", price)["data"]
+            marks["stale_flagged"] |= feed.is_stale("BTCUSDT")
+        marks["polling_while_silent"] = sorted(feed.polling)
+
+        marks["resumed_at"] = time.time()
+        async for _ in _paced(args.rate, args.duration):
+            price *= float(np.exp(rng.normal(0, 0.0005)))
+            await server.send(_bybit_frame("BTCUSDT", price))
+        marks["polling_after_resume"] = sorted(feed.polling)
+
+    ticks, _ = await _run_feed(feed, [server], body)
+    polled = [received for received, t in ticks if t["polled"]]
+    settle = marks["resumed_at"] + 2 * args.poll_seconds
+
+    return {
+        "published": len(ticks),
+        "polled_published": len(polled),
+        "rest_requests": server.rest_requests,
+        "first_polled_after_silence_ms": round((polled[0] - marks["silent_at"]) * 1000, 1) if polled else None,
+        "price_flagged_stale": marks["stale_flagged"],
+        "polling_while_silent": marks["polling_while_silent"],
+        "polling_after_resume": marks["polling_after_resume"],
+        "polled_after_resume": sum(1 for received in polled if received > settle)
+    }
+
+
+async def run(args, env: dict = None) -> dict:
+    return {
+        "latest": await _latest(args),
+        "median": await _median(args),
+        "fallback": await _fallback(args)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    with harness.quiet():
+        results = asyncio.run(run(args))
+    print(json.dumps(harness.report("price_feed", vars(args), results), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Benchmark time-to-first-useful-response after a restart.
+
+Runs the API as a subprocess against the local fake Bybit server and polls
+``GET /api/prices/current/BTCUSDT`` from process spawn until it returns 200:
+
+- cold: no warm start snapshot, so prices wait for the first streamed tick
+  (the fake server starts streaming ``--first-tick-delay`` seconds after a
+  client connects, standing in for connect and subscribe latency);
+- warm: the same restart after the cold run shut down gracefully and wrote
+  its snapshot, so prices are served (flagged stale) from startup.
+
+Each run also reports the server's own ``cryptoflyt_first_price_seconds``
+per source; the stream is timed on both runs, the snapshot on the warm one.
+
+Usage:
+    python -m benchmarks.bench_warm_start --first-tick-delay 1.0
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks import harness
+from benchmarks.fake_bybit import FakeBybitServer, synthetic_frames
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    group = parser.add_argument_group("warm start")
+    group.add_argument("--first-tick-delay", type=float, default=1.0, help="Seconds from connect to the first streamed tick")
+    group.add_argument("--rate", type=float, default=50.0, help="Frames per second once streaming")
+    group.add_argument("--stream-seconds", type=float, default=2.0, help="Streaming before the cold run shuts down")
+
+
+async def _stream(server: FakeBybitServer, rate: float, delay: float):
+    """Stream frames to connected clients, starting ``delay`` seconds after each connect."""
+    frames = synthetic_frames(harness.SYMBOLS, harness.BASE_PRICES)
+    connected_since = None
+    while True:
+        await asyncio.sleep(1.0 / rate)
+        if not server.clients:
+            connected_since = None
+            continue
+        connected_since = connected_since or time.monotonic()
+        if time.monotonic() - connected_since >= delay:
+            await server.send(next(frames))
+
+
+async def _first_price_metrics(client: httpx.AsyncClient, deadline: float) -> dict:
+    """Wait for the stream's first-price gauge and return the gauge per source."""
+    prefix = 'cryptoflyt_first_price_seconds{source="'
+    while True:
+        text = (await client.get("/metrics")).text
+        sources = {
+            line[len(prefix):].split('"', 1)[0]: round(float(line.rsplit(" ", 1)[1]) * 1000, 1)
+            for line in text.splitlines() if line.startswith(prefix)
+        }
+        if "stream" in sources or time.perf_counter() >= deadline:
+            return sources
+        await asyncio.sleep(0.05)
+
+
+async def _start(port: int, snapshot_path: str) -> tuple:
+    """Spawn the API and time it until it serves a current price."""
+    env = {**os.environ, "WARM_START_PATH": snapshot_path, "WARM_START_INTERVAL_SECONDS": "3600"}
+    spawned = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+
+    result = {"ready_ms": None, "first_price_ms": None, "stale": None, "server_first_price_ms": {}}
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=5) as client:
+        deadline = spawned + 60
+        while time.perf_counter() < deadline and result["first_price_ms"] is None:
+            try:
+                response = await client.get("/api/prices/current/BTCUSDT")
+            except httpx.TransportError:
+                await asyncio.sleep(0.01)
+                continue
+            elapsed_ms = round((time.perf_counter() - spawned) * 1000, 1)
+            if result["ready_ms"] is None:
+                result["ready_ms"] = elapsed_ms
+            if response.status_code == 200:
+                result["first_price_ms"] = elapsed_ms
+                result["stale"] = response.json()["stale"]
+            else:
+                await asyncio.sleep(0.01)
+        result["server_first_price_ms"] = await _first_price_metrics(client, deadline)
+    return process, result
+
+
+def _stop(process: subprocess.Popen):
+    """Graceful shutdown, which writes the final snapshot."""
+    process.send_signal(signal.SIGINT)
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+async def run(args, env: dict = None) -> dict:
+    snapshot_path = os.path.join(harness.WORKDIR, "warm_start.json")
+    if os.path.exists(snapshot_path):
+        os.remove(snapshot_path)
+
+    server = FakeBybitServer(harness.FAKE_BYBIT_PORT)
+    await server.start()
+    streamer = asyncio.create_task(_stream(server, args.rate, args.first_tick_delay))
+    results = {}
+    try:
+        process, results["cold"] = await _start(harness.free_port(), snapshot_path)
+        await asyncio.sleep(args.stream_seconds)
+        _stop(process)
+        results["snapshot_bytes"] = os.path.getsize(snapshot_path) if os.path.exists(snapshot_path) else 0
+
+        process, results["warm"] = await _start(harness.free_port(), snapshot_path)
+        _stop(process)
+    finally:
+        streamer.cancel()
+        await asyncio.gather(streamer, return_exceptions=True)
+        await server.stop()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    with harness.quiet():
+        results = asyncio.run(run(args))
+    print(json.dumps(harness.report("warm_start", vars(args), results), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Fake Binance combined-stream WebSocket server for benchmarks.
+
+Speaks just enough of ``/stream``: answers ``SUBSCRIBE`` requests and sends
+``24hrTicker`` events wrapped as ``{"stream": ..., "data": ...}``.
+"""
+import json
+import time
+from typing import Optional
+
+from aiohttp import WSMsgType, web
+
+from benchmarks.fake_bybit import FakeBybitServer
+
+
+def ticker_frame(symbol: str, price: float) -> dict:
+    """A Binance 24h ticker event for ``symbol`` at ``price``."""
+    return {
+        "stream": f"{symbol.lower()}@ticker",
+        "data": {
+            "e": "24hrTicker",
+            "s": symbol,
+            "c": f"{price:.6f}",
+            "h": f"{price * 1.02:.6f}",
+            "l": f"{price * 0.98:.6f}",
+            "v": "12345.678",
+            "P": "1.23"
+        }
+    }
+
+
+class FakeBinanceServer(FakeBybitServer):
+    """Serves ``/stream`` on loopback and sends ticker events on demand."""
+
+    async def _handle(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.clients.append(ws)
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                data = json.loads(msg.data)
+                if data.get("method") == "SUBSCRIBE":
+                    await ws.send_json({"result": None, "id": data.get("id")})
+        finally:
+            self.clients.remove(ws)
+        return ws
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/stream", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, "127.0.0.1", self.port).start()
+
+    async def send(self, frame: dict, ts: Optional[int] = None):
+        """Send one event to every client, stamping ``E`` (default: send time)."""
+        frame["data"]["E"] = ts if ts is not None else int(time.time() * 1000)
+        text = json.dumps(frame)
+        for ws in list(self.clients):
+            await ws.send_str(text)
+        self.frames_sent += 1
@@ -0,0 +1,190 @@
+"""
+Fake Bybit public WebSocket server for benchmarks.
+
+Accepts the same subscribe handshake as Bybit and replays ticker frames to
+every connected client at a fixed rate. Frames come from a recording (one
+raw Bybit message per line, e.g. captured with ``websocat``) or from a
+synthetic random walk. Each frame's ``ts`` is rewritten to the send time so
+receivers can measure latency from "exchange" to client.
+
+Also serves ``GET /v5/market/tickers`` with the last ticker sent (or set)
+per symbol, for the price feed's REST fallback, and ``GET /v5/market/kline``
+with deterministic candles (``fake_kline``) for the candle backfill, with
+optional per-request latency and a requests-per-second limit answered with
+HTTP 429 like Bybit's. Symbols in ``kline_unlisted`` are rejected with
+Bybit's "not supported symbols" error.
+"""
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from typing import Iterator, List, Optional
+
+import numpy as np
+from aiohttp import WSMsgType, web
+
+
+def synthetic_frames(symbols: List[str], base_prices: dict, seed: int = 7) -> Iterator[dict]:
+    """Endless round-robin ticker frames following a random walk per symbol."""
+    rng = np.random.default_rng(seed)
+    prices = dict(base_prices)
+    while True:
+        for symbol in symbols:
+            prices[symbol] *= float(np.exp(rng.normal(0, 0.0005)))
+            price = prices[symbol]
+            yield {
+                "topic": f"tickers.{symbol}",
+                "type": "snapshot",
+                "data": {
+                    "symbol": symbol,
+                    "lastPrice": f"{price:.6f}",
+                    "highPrice24h": f"{price * 1.02:.6f}",
+                    "lowPrice24h": f"{price * 0.98:.6f}",
+                    "volume24h": "12345.678",
+                    "price24hPcnt": "0.0123"
+                }
+            }
+
+
+def recorded_frames(path: str) -> Iterator[dict]:
+    """Endlessly replay ticker frames from a recording."""
+    with open(path) as f:
+        frames = [json.loads(line) for line in f if line.strip()]
+    frames = [f for f in frames if f.get("topic", "").startswith("tickers.")]
+    if not frames:
+        raise ValueError(f"No ticker frames in {path}")
+    while True:
+        yield from frames
+
+
+KLINE_INTERVAL_SECONDS = {"1": 60, "3": 180, "5": 300, "15": 900, "30": 1800, "60": 3600,
+                          "120": 7200, "240": 14400, "360": 21600, "720": 43200, "D": 86400}
+
+
+def fake_kline(symbol: str, start_ms: int, seconds: int) -> list:
+    """A deterministic Bybit kline row for the candle opening at ``start_ms``."""
+    base = 100.0 + sum(map(ord, symbol))
+    close = base * (1 + 0.05 * math.sin(start_ms / 3.6e7))
+    open_ = base * (1 + 0.05 * math.sin((start_ms - seconds * 1000) / 3.6e7))
+    volume = 10.0 + start_ms % 7
+    return [
+        str(start_ms), f"{open_:.6f}", f"{max(open_, close) * 1.001:.6f}",
+        f"{min(open_, close) * 0.999:.6f}", f"{close:.6f}", f"{volume:.3f}", f"{volume * close:.3f}"
+    ]
+
+
+class FakeBybitServer:
+    """Serves ``/v5/public/spot`` on loopback and streams frames on demand."""
+
+    def __init__(self, port: int):
+        self.port = port
+        self.clients: List[web.WebSocketResponse] = []
+        self.frames_sent = 0
+        self.tickers: dict = {}  # last ticker data per symbol, served over REST
+        self.rest_requests = 0
+        self.kline_requests = 0
+        self.kline_rejected = 0
+        self.kline_latency = 0.0  # seconds per kline request
+        self.kline_rate_limit: Optional[float] = None  # kline requests per second before 429s
+        self.kline_unlisted: set = set()  # symbols answered with retCode 10001
+        self._kline_times: deque = deque()
+        self._runner: Optional[web.AppRunner] = None
+
+    async def _handle(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.clients.append(ws)
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                data = json.loads(msg.data)
+                if data.get("op") == "subscribe":
+                    await ws.send_json({"op": "subscribe", "success": True, "ret_msg": ""})
+        finally:
+            self.clients.remove(ws)
+        return ws
+
+    async def _handle_tickers(self, request: web.Request) -> web.Response:
+        self.rest_requests += 1
+        return web.json_response({
+            "retCode": 0,
+            "retMsg": "OK",
+            "result": {"category": "spot", "list": list(self.tickers.values())},
+            "time": int(time.time() * 1000)
+        })
+
+    async def _handle_kline(self, request: web.Request) -> web.Response:
+        self.kline_requests += 1
+        now = time.monotonic()
+        while self._kline_times and now - self._kline_times[0] > 1.0:
+            self._kline_times.popleft()
+        if self.kline_rate_limit is not None and len(self._kline_times) >= self.kline_rate_limit:
+            self.kline_rejected += 1
+            return web.Response(status=429, text="Too many visits")
+        self._kline_times.append(now)
+        if self.kline_latency:
+            await asyncio.sleep(self.kline_latency)
+
+        query = request.query
+        if query["symbol"] in self.kline_unlisted:
+            return web.json_response({"retCode": 10001, "retMsg": "Not supported symbols", "result": {}})
+        seconds = KLINE_INTERVAL_SECONDS[query["interval"]]
+        step = seconds * 1000
+        end = min(int(query["end"]), int(time.time() * 1000))
+        first = int(query["start"]) + (-int(query["start"])) % step
+        starts = list(range(first, end + 1, step))[-int(query.get("limit", 200)):]
+
+        return web.json_response({
+            "retCode": 0,
+            "retMsg": "OK",
+            "result": {
+                "category": "spot",
+                "symbol": query["symbol"],
+                "list": [fake_kline(query["symbol"], start, seconds) for start in reversed(starts)]
+            },
+            "time": int(time.time() * 1000)
+        })
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/v5/public/spot", self._handle)
+        app.router.add_get("/v5/market/tickers", self._handle_tickers)
+        app.router.add_get("/v5/market/kline", self._handle_kline)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, "127.0.0.1", self.port).start()
+
+    async def stop(self):
+        for ws in list(self.clients):
+            await ws.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def send(self, frame: dict, ts: Optional[int] = None):
+        """Send one frame to every client, stamping ``ts`` (default: send time)."""
+        frame["ts"] = ts if ts is not None else int(time.time() * 1000)
+        if frame.get("topic", "").startswith("tickers."):
+            self.tickers[frame["data"]["symbol"]] = frame["data"]
+        text = json.dumps(frame)
+        for ws in list(self.clients):
+            await ws.send_str(text)
+        self.frames_sent += 1
+
+    async def stream(self, frames: Iterator[dict], rate: float, duration: float):
+        """
+        Send frames to every client at ``rate`` frames per second.
+
+        Sleeps only when ahead of schedule, so when the receiver cannot keep
+        up the backlog shows up as latency rather than a lower send rate.
+        """
+        interval = 1.0 / rate
+        started = time.perf_counter()
+        count = int(rate * duration)
+        for i in range(count):
+            delay = started + i * interval - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            await self.send(next(frames))
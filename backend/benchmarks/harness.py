@@ -0,0 +1,233 @@
+"""
+Shared benchmark harness.
+
+Importing this module points the app at throwaway storage and at a local
+fake Bybit server, so it must be imported before ``app``. Nothing touches
+the network beyond loopback.
+"""
+import asyncio
+import contextlib
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import List, Sequence
+
+import numpy as np
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+WORKDIR = tempfile.mkdtemp(prefix="cryptoflyt-bench-")
+FAKE_BYBIT_PORT = free_port()
+
+# Settings are read at import time
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(WORKDIR, 'bench.db')}"
+os.environ["TICK_ARCHIVE_DIR"] = os.path.join(WORKDIR, "ticks")
+os.environ["BYBIT_WS_URL"] = f"ws://127.0.0.1:{FAKE_BYBIT_PORT}/v5/public/spot"
+os.environ["BYBIT_REST_URL"] = f"http://127.0.0.1:{FAKE_BYBIT_PORT}"
+os.environ.setdefault("TRACING_BACKEND", "none")
+
+import uvicorn  # noqa: E402
+
+# Import the app entry point first so models and services resolve cleanly
+import app.main  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.core.database import SessionLocal, init_db  # noqa: E402
+from app.core.security import create_access_token, get_password_hash  # noqa: E402
+from app.models.alert import Alert, AlertCondition  # noqa: E402
+from app.models.portfolio import PortfolioHolding  # noqa: E402
+from app.models.price import PriceHistory  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+
+SYMBOLS = list(settings.supported_symbols)
+BASE_PRICES = {"BTCUSDT": 97000.0, "ETHUSDT": 3400.0, "SOLUSDT": 190.0, "XRPUSDT": 2.3, "DOGEUSDT": 0.38}
+
+
+# =============================================================================
+# Reporting
+# =============================================================================
+
+def summarize(latencies: Sequence[float], elapsed: float, unit: str = "ms") -> dict:
+    """Throughput and latency percentiles for a list of latencies in seconds."""
+    values = np.asarray(latencies, dtype=np.float64) * (1000 if unit == "ms" else 1)
+    if len(values) == 0:
+        return {"count": 0, "throughput_per_s": 0.0}
+
+    return {
+        "count": int(len(values)),
+        "throughput_per_s": round(len(values) / elapsed, 1) if elapsed > 0 else None,
+        f"p50_{unit}": round(float(np.percentile(values, 50)), 3),
+        f"p99_{unit}": round(float(np.percentile(values, 99)), 3),
+        f"max_{unit}": round(float(values.max()), 3)
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            stderr=subprocess.DEVNULL,
+            text=True
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+def report(name: str, params: dict, results: dict) -> dict:
+    return {
+        "benchmark": name,
+        "commit": git_commit(),
+        "run_at": datetime.utcnow().isoformat(),
+        "python": sys.version.split()[0],
+        "params": params,
+        "results": results
+    }
+
+
+@contextlib.contextmanager
+def quiet():
+    """Send the app's console logging to stderr so stdout stays valid JSON."""
+    with contextlib.redirect_stdout(sys.stderr):
+        yield
+
+
+# =============================================================================
+# Synthetic populations
+# =============================================================================
+
+def seed_population(users: int, alerts_per_user: int, holdings_per_user: int, history_per_symbol: int, seed: int = 42) -> List[int]:
+    """
+    Bulk-insert users with alerts, holdings and price history.
+
+    Alert targets are far from current prices so ticks evaluate every alert
+    without triggering any.
+
+    Returns:
+        The ids of the created users
+    """
+    rng = np.random.default_rng(seed)
+    init_db()
+
+    db = SessionLocal()
+    try:
+        # One bcrypt hash shared by every synthetic user
+        hashed = get_password_hash("benchmark")
+        db.bulk_insert_mappings(User, [
+            {"email": f"bench{i}@example.com", "username": f"bench{i}", "hashed_password": hashed}
+            for i in range(users)
+        ])
+        db.commit()
+        user_ids = [u for (u,) in db.query(User.id).order_by(User.id).all()]
+
+        alert_rows, holding_rows = [], []
+        for user_id in user_ids:
+            for j in range(alerts_per_user):
+                symbol = SYMBOLS[(user_id + j) % len(SYMBOLS)]
+                above = bool(rng.random() < 0.5)
+                factor = rng.uniform(2.0, 3.0) if above else rng.uniform(0.1, 0.5)
+                alert_rows.append({
+                    "user_id": user_id,
+                    "symbol": symbol,
+                    "target_price": BASE_PRICES[symbol] * factor,
+                    "condition": AlertCondition.ABOVE if above else AlertCondition.BELOW,
+                    "is_active": True,
+                    "is_triggered": False,
+                    "notify_telegram": False
+                })
+            for j in range(min(holdings_per_user, len(SYMBOLS))):
+                symbol = SYMBOLS[(user_id + j) % len(SYMBOLS)]
+                holding_rows.append({
+                    "user_id": user_id,
+                    "symbol": symbol,
+                    "amount": float(rng.uniform(0.01, 10.0)),
+                    "average_buy_price": BASE_PRICES[symbol] * float(rng.uniform(0.5, 1.5))
+                })
+        db.bulk_insert_mappings(Alert, alert_rows)
+        db.bulk_insert_mappings(PortfolioHolding, holding_rows)
+
+        now = datetime.utcnow()
+        history_rows = []
+        for symbol in SYMBOLS:
+            walk = BASE_PRICES[symbol] * np.exp(np.cumsum(rng.normal(0, 0.001, history_per_symbol)))
+            for k, price in enumerate(walk.tolist()):
+                history_rows.append({
+                    "symbol": symbol,
+                    "price": price,
+                    "timestamp": datetime.utcfromtimestamp(now.timestamp() - (history_per_symbol - k) * 3600 / history_per_symbol)
+                })
+        db.bulk_insert_mappings(PriceHistory, history_rows)
+        db.commit()
+        return user_ids
+    finally:
+        db.close()
+
+
+def token_for(user_id: int) -> str:
+    return create_access_token({"sub": str(user_id)})
+
+
+# =============================================================================
+# In-process API server
+# =============================================================================
+
+@contextlib.asynccontextmanager
+async def running_server():
+    """Serve the app with uvicorn on a loopback port; yields ``host:port``."""
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(
+        app.main.app,
+        host="127.0.0.1",
+        port=port,
+        log_level="warning",
+        lifespan="on"
+    ))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.01)
+
+    try:
+        yield f"127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        await task
+
+
+async def wait_for(predicate, timeout: float, interval: float = 0.01) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        await asyncio.sleep(interval)
+    return predicate()
+
+
+@contextlib.asynccontextmanager
+async def bench_environment():
+    """
+    Fake Bybit server plus the API served against it.
+
+    Yields:
+        Dict with the API ``host`` and the ``fake_bybit`` server
+    """
+    from benchmarks.fake_bybit import FakeBybitServer
+
+    fake = FakeBybitServer(FAKE_BYBIT_PORT)
+    await fake.start()
+    try:
+        async with running_server() as host:
+            if not await wait_for(lambda: fake.clients, timeout=15):
+                raise RuntimeError("App did not connect to the fake Bybit server")
+            yield {"host": host, "fake_bybit": fake}
+    finally:
+        await fake.stop()
@@ -0,0 +1,27 @@
+"""
+Shared test setup.
+
+Points the app at throwaway storage before it is imported (settings are read
+at import time), so tests never touch a real database or the network beyond
+loopback servers they start themselves.
+"""
+import os
+import tempfile
+
+import pytest
+
+WORKDIR = tempfile.mkdtemp(prefix="cryptoflyt-tests-")
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(WORKDIR, 'test.db')}"
+os.environ["TICK_ARCHIVE_DIR"] = os.path.join(WORKDIR, "ticks")
+os.environ["WARM_START_PATH"] = os.path.join(WORKDIR, "warm_start.json")
+os.environ.setdefault("TRACING_BACKEND", "none")
+
+# Import the app entry point first so models and services resolve cleanly
+import app.main  # noqa: E402,F401
+from app.core.database import init_db  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    init_db()
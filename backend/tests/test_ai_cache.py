@@ -0,0 +1,71 @@
+"""
+The analysis cache keeps the local fallback (served when the model call
+failed) only briefly and never in place of a real analysis.
+"""
+import asyncio
+
+from app.services.ai_cache import AnalysisCache
+
+PRICES = {"BTCUSDT": {"price": 97000.0, "change_24h_percent": 1.0}}
+
+
+class _Model:
+    """Compute function that fails over to the fallback while ``down``."""
+
+    def __init__(self):
+        self.down = False
+        self.calls = 0
+
+    async def __call__(self, prices: dict, symbols: list) -> dict:
+        self.calls += 1
+        return {"analysis": "local" if self.down else "model", "fallback": self.down}
+
+
+def _cache(model: _Model, ttl: float = 60.0, fallback_ttl: float = 0.05) -> AnalysisCache:
+    return AnalysisCache(model, ttl_seconds=ttl, max_stale_seconds=600.0, bucket_percent=0.5, fallback_ttl_seconds=fallback_ttl)
+
+
+def test_fallback_is_cached_briefly():
+    model = _Model()
+    model.down = True
+    cache = _cache(model)
+
+    async def scenario():
+        first = await cache.get(PRICES, ["BTCUSDT"])
+        second = await cache.get(PRICES, ["BTCUSDT"])
+        await asyncio.sleep(0.06)
+        model.down = False
+        # Expired fallbacks are recomputed, not served stale
+        third = await cache.get(PRICES, ["BTCUSDT"])
+        return first, second, third
+
+    first, second, third = asyncio.run(scenario())
+
+    assert first == ({"analysis": "local", "fallback": True}, False)
+    assert second[1] is True
+    assert third == ({"analysis": "model", "fallback": False}, False)
+    assert model.calls == 2
+
+
+def test_fallback_does_not_replace_a_real_analysis():
+    model = _Model()
+    cache = _cache(model, ttl=0.01)
+
+    async def scenario():
+        await cache.get(PRICES, ["BTCUSDT"])
+        await asyncio.sleep(0.02)
+        model.down = True
+        stale, cached = await cache.get(PRICES, ["BTCUSDT"])
+        await asyncio.sleep(0)  # let the background refresh run
+        await asyncio.gather(*cache._background)
+        return stale, cached
+
+    stale, cached = asyncio.run(scenario())
+
+    assert (stale["analysis"], cached) == ("model", True)
+    assert model.calls == 2
+    assert cache.peek(["BTCUSDT"])["analysis"] == "model"
+
+    # A digest computed while the model was down does not replace it either
+    cache.put(["BTCUSDT"], PRICES, {"analysis": "local", "fallback": True})
+    assert cache.peek(["BTCUSDT"])["analysis"] == "model"
@@ -0,0 +1,143 @@
+"""
+Model calls run on a bounded pool with a deadline; a timed-out call keeps
+its worker until its thread finishes, and consecutive failures open a
+circuit breaker that lets one trial call through after its reset time.
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.services.ai_analysis import MockGenerativeModel
+from app.services.ai_executor import AICircuitOpenError, AIExecutor, AITimeoutError, CircuitBreaker
+
+
+def _executor(workers: int = 2, timeout: float = 5.0, failures: int = 2, reset: float = 0.2) -> AIExecutor:
+    return AIExecutor(workers=workers, timeout_seconds=timeout, failure_threshold=failures, reset_seconds=reset)
+
+
+def _run(executor: AIExecutor, scenario):
+    try:
+        return asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+
+def _generate(executor: AIExecutor, model: MockGenerativeModel, timeout=None):
+    return executor.call("test", model.generate_content, "prompt", timeout=timeout)
+
+
+def test_call_returns_the_model_result():
+    executor = _executor()
+
+    response = _run(executor, lambda: _generate(executor, MockGenerativeModel()))
+
+    assert "Mock model response" in response.text
+    assert executor.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_deadline_expiry_keeps_the_worker_until_the_thread_finishes():
+    executor = _executor(workers=1, failures=5)
+    slow = MockGenerativeModel(latency=0.3)
+
+    async def scenario():
+        started = time.monotonic()
+        with pytest.raises(AITimeoutError):
+            await _generate(executor, slow, timeout=0.05)
+        waited = time.monotonic() - started
+        busy_after_timeout = executor.busy
+
+        # The only worker is still running the timed-out call
+        with pytest.raises(AITimeoutError):
+            await _generate(executor, MockGenerativeModel(), timeout=0.05)
+
+        await asyncio.sleep(0.35)
+        return waited, busy_after_timeout, executor.busy
+
+    waited, busy_after_timeout, busy_later = _run(executor, scenario)
+
+    assert waited < 0.2
+    assert busy_after_timeout == 1
+    assert busy_later == 0
+    assert executor.breaker.failures == 2
+
+
+def test_semaphore_limits_concurrent_calls():
+    executor = _executor(workers=2)
+    model = MockGenerativeModel(latency=0.1)
+
+    async def scenario():
+        peak = 0
+
+        async def watch():
+            nonlocal peak
+            while True:
+                peak = max(peak, executor.busy)
+                await asyncio.sleep(0.005)
+
+        watcher = asyncio.create_task(watch())
+        started = time.monotonic()
+        results = await asyncio.gather(*[_generate(executor, model) for _ in range(6)])
+        elapsed = time.monotonic() - started
+        watcher.cancel()
+        return results, peak, elapsed
+
+    results, peak, elapsed = _run(executor, scenario)
+
+    assert len(results) == 6
+    assert peak == 2
+    # Six 0.1s calls through two workers take three rounds
+    assert elapsed >= 0.3
+
+
+def test_breaker_opens_then_half_opens_then_closes():
+    executor = _executor(failures=2, reset=0.2)
+    failing = MockGenerativeModel(failure_rate=1.0)
+    healthy = MockGenerativeModel(latency=0.05)
+    breaker = executor.breaker
+
+    async def scenario():
+        states = [breaker.state]
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await _generate(executor, failing)
+        states.append(breaker.state)
+
+        # Open: rejected without reaching the model
+        with pytest.raises(AICircuitOpenError):
+            await _generate(executor, healthy)
+
+        await asyncio.sleep(0.25)
+        states.append(breaker.state)
+
+        # Half-open: one trial call; others are rejected while it runs
+        trial = asyncio.create_task(_generate(executor, healthy))
+        await asyncio.sleep(0.01)
+        with pytest.raises(AICircuitOpenError):
+            await _generate(executor, healthy)
+        await trial
+        states.append(breaker.state)
+        return states
+
+    states = _run(executor, scenario)
+
+    assert states == [CircuitBreaker.CLOSED, CircuitBreaker.OPEN, CircuitBreaker.HALF_OPEN, CircuitBreaker.CLOSED]
+    assert breaker.failures == 0
+
+
+def test_failed_trial_reopens_the_breaker():
+    executor = _executor(failures=1, reset=0.1)
+    breaker = executor.breaker
+
+    async def scenario():
+        with pytest.raises(AITimeoutError):
+            await _generate(executor, MockGenerativeModel(latency=0.2), timeout=0.02)
+        assert breaker.state == CircuitBreaker.OPEN
+
+        await asyncio.sleep(0.15)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        with pytest.raises(RuntimeError):
+            await _generate(executor, MockGenerativeModel(failure_rate=1.0))
+        return breaker.state
+
+    assert _run(executor, scenario) == CircuitBreaker.OPEN
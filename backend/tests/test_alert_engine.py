@@ -0,0 +1,170 @@
+"""
+The alert engine keeps route changes made during a reload; the checker
+claims each fire in the database so only one worker fires (and notifies) it,
+and only disarms alerts once their fires are stored.
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.database import AsyncSessionLocal
+from app.models.alert import Alert, AlertCondition
+from app.models.user import User
+from app.services.alert_checker import AlertChecker
+from app.services.alert_engine import AlertEngine
+from app.services.alert_replay import RecordingNotifier
+
+
+def _alert(alert_id: int, **fields) -> Alert:
+    return Alert(**{
+        "id": alert_id, "user_id": 1, "symbol": "BTCUSDT", "condition": AlertCondition.ABOVE,
+        "target_price": 100.0, "is_active": True, "is_triggered": False, "rearm": False, **fields
+    })
+
+
+class _QueryHook:
+    """Session stand-in that runs ``hook`` while the load query is in flight."""
+
+    def __init__(self, db, hook):
+        self.db = db
+        self.hook = hook
+
+    async def execute(self, statement):
+        result = await self.db.execute(statement)
+        self.hook()
+        return result
+
+    def expunge(self, instance):
+        self.db.expunge(instance)
+
+
+def _load(engine: AlertEngine, hook):
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            await engine.load(_QueryHook(db, hook))
+    asyncio.run(scenario())
+
+
+def test_upsert_during_load_survives_it():
+    engine = AlertEngine(reload_seconds=0)
+    alert = _alert(900_001)
+
+    _load(engine, lambda: engine.upsert(alert))
+
+    assert [a.id for a in engine.evaluate("BTCUSDT", 101.0)] == [alert.id]
+
+
+def test_remove_during_load_survives_it():
+    engine = AlertEngine(reload_seconds=0)
+    alert = _alert(900_002)
+    engine.upsert(alert)
+
+    # The removed alert is still in the (stale) rows the load returns
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            db.add(_alert(900_002))
+            await db.commit()
+            try:
+                await engine.load(_QueryHook(db, lambda: engine.remove(alert.id)))
+            finally:
+                await db.rollback()
+                await db.delete(await db.get(Alert, 900_002))
+                await db.commit()
+    asyncio.run(scenario())
+
+    assert engine.evaluate("BTCUSDT", 101.0) == []
+
+
+class _FailingCommit(Exception):
+    pass
+
+
+def _stored_alert(alert_id: int, **fields) -> Alert:
+    """Insert an alert (and its user) and return a detached copy of it."""
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            if await db.get(User, 1) is None:
+                db.add(User(
+                    id=1, email="alerts@example.com", username="alerts", hashed_password="x",
+                    telegram_chat_id="42", telegram_notifications=True
+                ))
+            db.add(_alert(alert_id, **fields))
+            await db.commit()
+            alert = await db.get(Alert, alert_id)
+            db.expunge(alert)
+            return alert
+    return asyncio.run(scenario())
+
+
+def _stored_copy(alert: Alert) -> Alert:
+    """A second worker's detached copy of a stored alert."""
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            copy = await db.get(Alert, alert.id)
+            db.expunge(copy)
+            return copy
+    return asyncio.run(scenario())
+
+
+def _engine_with(alert: Alert) -> AlertEngine:
+    engine = AlertEngine(reload_seconds=0)
+    engine._loaded_at = 0  # skip the DB load
+    engine.upsert(alert)
+    return engine
+
+
+def _check(engine: AlertEngine, notifier: RecordingNotifier, price: float, timestamp=None) -> list:
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            return await AlertChecker(db, notifier=notifier, engine=engine).check_alerts("BTCUSDT", price, timestamp)
+    return asyncio.run(scenario())
+
+
+def test_failed_commit_leaves_alert_armed_and_nobody_notified():
+    alert = _stored_alert(900_003)
+    engine = _engine_with(alert)
+    notifier = RecordingNotifier()
+
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            async def commit():
+                raise _FailingCommit()
+            db.commit = commit
+            with pytest.raises(_FailingCommit):
+                await AlertChecker(db, notifier=notifier, engine=engine).check_alerts("BTCUSDT", 101.0)
+            await db.rollback()
+    asyncio.run(scenario())
+
+    assert notifier.sent == []
+    assert alert.is_triggered is False
+    assert [a.id for a in engine.evaluate("BTCUSDT", 101.0)] == [alert.id]
+
+
+def test_one_shot_alert_fires_in_one_worker_only():
+    alert = _stored_alert(900_004)
+    workers = [_engine_with(alert), _engine_with(_stored_copy(alert))]
+    notifier = RecordingNotifier()
+
+    fired = [_check(engine, notifier, 101.0) for engine in workers]
+
+    assert [len(f) for f in fired] == [1, 0]
+    assert len(notifier.sent) == 1
+    # Both engines dropped it: one fired it, the other lost the claim
+    assert all(engine.evaluate("BTCUSDT", 101.0) == [] for engine in workers)
+
+
+def test_rearming_alert_is_claimed_once_per_cooldown():
+    alert = _stored_alert(900_005, rearm=True, cooldown_seconds=300)
+    workers = [_engine_with(alert), _engine_with(_stored_copy(alert))]
+    notifier = RecordingNotifier()
+    now = datetime.utcnow()
+
+    fired = [_check(engine, notifier, 101.0, now) for engine in workers]
+    assert [len(f) for f in fired] == [1, 0]
+
+    # Past the cooldown the next worker to see it fire claims it
+    fired = _check(workers[1], notifier, 101.0, now + timedelta(seconds=301))
+    assert len(fired) == 1
+    assert len(notifier.sent) == 2
+
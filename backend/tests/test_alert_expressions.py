@@ -0,0 +1,170 @@
+"""
+Alert expressions are validated without being executed and compiled into
+one shared graph: identical subexpressions are a single node, kept while
+any alert uses them, and a tick recomputes each downstream node once, in
+level order, stopping where a value does not change.
+"""
+import pytest
+
+from app.config import settings
+from app.services.alert_expressions import ExpressionError, ExpressionGraph, parse_expression
+from app.services.indicators import IndicatorEngine
+from app.services.market_signals import MarketSignals
+
+
+class _RecordingGraph(ExpressionGraph):
+    """Graph that records the nodes it computes."""
+
+    def __init__(self):
+        super().__init__(MarketSignals(IndicatorEngine(settings.indicator_timeframes), trades=None))
+        self.computed = []
+
+    def _compute(self, node):
+        self.computed.append(node)
+        return super()._compute(node)
+
+    def tick(self, symbol: str, price: float) -> list:
+        """Feed a tick and return the ops of the nodes it recomputed."""
+        self.computed = []
+        self.on_tick(symbol, price)
+        return [node.op for node in self.computed]
+
+
+def test_parse_returns_the_referenced_symbols():
+    _, symbols = parse_expression('ETHUSDT / BTCUSDT < 0.035 or rsi(SOLUSDT, "1h") > 70 and BTCUSDT > 1')
+
+    assert symbols == ["ETHUSDT", "BTCUSDT", "SOLUSDT"]
+
+
+@pytest.mark.parametrize("expression", [
+    "__import__('os').system('true') > 0",
+    "BTCUSDT.real > 0",
+    "eval('BTCUSDT') > 0",
+    "(lambda: 1)() > 0",
+    "move(BTCUSDT, minutes=15) > 1",
+    "[BTCUSDT][0] > 0",
+    "BTCUSDT ** 2 > 0",
+    "BTCUSDT == 1",
+    "PEPEUSDT > 1",
+    "rsi(BTCUSDT, '2h') > 70",
+    "move(BTCUSDT, 0) > 1",
+    "BTCUSDT + 1",
+    "BTCUSDT > 1 and ETHUSDT",
+    "BTCUSDT >",
+])
+def test_parse_rejects_anything_outside_the_dsl(expression):
+    with pytest.raises(ExpressionError):
+        parse_expression(expression)
+
+
+def test_parse_rejects_overlong_expressions():
+    with pytest.raises(ExpressionError):
+        parse_expression(" + ".join(["BTCUSDT"] * 40) + " > 0")
+
+
+def test_identical_subexpressions_are_one_node():
+    graph = _RecordingGraph()
+    low = graph.add(1, "ETHUSDT / BTCUSDT < 0.035")
+    high = graph.add(2, "ETHUSDT / BTCUSDT > 0.05")
+
+    ratio = low.children[0]
+    assert high.children[0] is ratio
+    assert ratio.refs == 2
+    # ETHUSDT, BTCUSDT, the ratio, two constants and two comparisons
+    assert graph.node_count == 7
+
+    # Re-adding the same expression reuses every node
+    graph.add(3, "ETHUSDT / BTCUSDT < 0.035")
+    assert graph.node_count == 7
+    assert low.refs == 2
+
+
+def test_shared_subexpression_survives_removing_one_alert():
+    graph = _RecordingGraph()
+    graph.add(1, "ETHUSDT / BTCUSDT < 0.035")
+    graph.add(2, "ETHUSDT / BTCUSDT > 0.05")
+
+    graph.remove(1)
+
+    root = graph.root(2)
+    assert graph.root(1) is None
+    assert root.children[0].refs == 1
+    assert graph.node_count == 5
+
+    graph.tick("BTCUSDT", 100.0)
+    graph.tick("ETHUSDT", 6.0)
+    assert root.value is True
+
+    graph.remove(2)
+    assert graph.node_count == 0
+    assert all(not nodes for nodes in graph._inputs.values())
+
+
+def test_tick_recomputes_only_nodes_downstream_of_its_symbol():
+    graph = _RecordingGraph()
+    graph.add(1, "BTCUSDT > 100")
+    graph.add(2, "ETHUSDT > 100")
+
+    assert graph.tick("BTCUSDT", 150.0) == ["price", "gt"]
+    assert graph.tick("SOLUSDT", 150.0) == []
+
+
+def test_propagation_stops_where_a_value_is_unchanged():
+    graph = _RecordingGraph()
+    root = graph.add(1, "BTCUSDT > 100 and ETHUSDT > 100")
+    graph.tick("ETHUSDT", 150.0)
+
+    assert graph.tick("BTCUSDT", 150.0) == ["price", "gt", "and"]
+    assert root.value is True
+
+    # The comparison stays True, so the "and" is not recomputed
+    assert graph.tick("BTCUSDT", 200.0) == ["price", "gt"]
+    # An unchanged price stops at the input
+    assert graph.tick("BTCUSDT", 200.0) == ["price"]
+
+
+def test_nodes_are_recomputed_once_per_tick_in_level_order():
+    graph = _RecordingGraph()
+    # BTCUSDT feeds the product and, directly, the sum above it
+    root = graph.add(1, "BTCUSDT * BTCUSDT + BTCUSDT > 100")
+
+    assert graph.tick("BTCUSDT", 10.0) == ["price", "mul", "add", "gt"]
+    assert root.value is True
+    levels = [node.level for node in graph.computed]
+    assert levels == sorted(levels)
+    assert len(set(graph.computed)) == len(graph.computed)
+
+
+def test_unknown_inputs_leave_the_value_unknown():
+    graph = _RecordingGraph()
+    ratio = graph.add(1, "ETHUSDT / BTCUSDT < 0.035")
+    both = graph.add(2, "BTCUSDT > 100 and ETHUSDT > 100")
+    either = graph.add(3, 'rsi(BTCUSDT, "1h") > 70 or BTCUSDT > 100')
+    moved = graph.add(4, "abs(move(SOLUSDT, 15)) >= 3")
+
+    assert [r.value for r in (ratio, both, either, moved)] == [None, None, None, None]
+
+    graph.tick("BTCUSDT", 50.0)
+    assert ratio.value is None  # ETHUSDT still unknown
+    assert both.value is False  # decided by its known operand
+    assert either.value is None  # RSI has no candles yet
+
+    graph.tick("BTCUSDT", 150.0)
+    assert both.value is None
+    assert either.value is True
+
+    # move() needs a window of prices, not just one
+    graph.tick("SOLUSDT", 190.0)
+    assert moved.value is None
+
+
+def test_division_by_zero_is_unknown():
+    graph = _RecordingGraph()
+    root = graph.add(1, "ETHUSDT / BTCUSDT < 0.035")
+    graph.tick("ETHUSDT", 3400.0)
+
+    graph.tick("BTCUSDT", 0.0)
+    assert root.value is None
+
+    graph.tick("BTCUSDT", 100_000.0)
+    assert root.value is True
@@ -0,0 +1,67 @@
+"""
+Bulk valuation prices symbols from the latest backfilled candle when the
+live feed has no price, and skips snapshots of users it cannot fully price.
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import delete
+
+from app.core.database import SessionLocal
+from app.models.price import PriceCandle
+from app.services.bulk_valuation import BulkPortfolioValuation
+
+
+@pytest.fixture
+def db():
+    db = SessionLocal()
+    db.execute(delete(PriceCandle))
+    db.commit()
+    try:
+        yield db
+    finally:
+        db.execute(delete(PriceCandle))
+        db.commit()
+        db.close()
+
+
+def _candle(symbol: str, interval: str, start: datetime, close: float) -> PriceCandle:
+    return PriceCandle(
+        symbol=symbol, interval=interval, start=start,
+        open=close, high=close, low=close, close=close, volume=1.0, turnover=close
+    )
+
+
+def test_latest_candle_prefers_the_finest_interval_at_the_same_start(db):
+    opened = datetime(2026, 1, 1, 12, 0)
+    for interval, close in (("4h", 90.0), ("1m", 100.0), ("15m", 95.0), ("1h", 92.0)):
+        db.add(_candle("DOGEUSDT", interval, opened, close))
+    db.add(_candle("XRPUSDT", "1m", opened, 2.0))
+    db.add(_candle("XRPUSDT", "1h", opened + timedelta(hours=1), 2.5))
+    db.commit()
+
+    prices = BulkPortfolioValuation().resolve_prices(db)
+
+    assert prices["DOGEUSDT"] == 100.0
+    # A later start wins whatever its interval
+    assert prices["XRPUSDT"] == 2.5
+
+
+def test_users_with_unpriced_holdings_are_left_out():
+    valuation = BulkPortfolioValuation()
+    holdings = {
+        "user_ids": np.array([1, 1, 2]),
+        "symbols": np.array(["BTCUSDT", "PEPEUSDT"], dtype=object),
+        "symbol_idx": np.array([0, 1, 0]),
+        "amounts": np.array([1.0, 100.0, 2.0]),
+        "avg_prices": np.array([50.0, 0.1, 60.0])
+    }
+
+    result = valuation.value(holdings, {"BTCUSDT": 100.0})
+    priced = valuation.priced_only(result)
+
+    assert list(result["unpriced"]) == [1, 0]
+    assert list(priced["user_ids"]) == [2]
+    assert priced["total_value"][0] == pytest.approx(200.0)
+    assert priced["total_pnl"][0] == pytest.approx(80.0)
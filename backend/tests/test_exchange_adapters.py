@@ -0,0 +1,147 @@
+"""
+Exchange adapters normalize each venue's ticker messages into one tick
+shape, and the consolidated feed merges them.
+"""
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services.binance import BinanceWebSocketClient
+from app.services.bybit import BybitWebSocketClient
+from app.services.exchange import from_exchange_ms
+from app.services.price_feed import PriceFeed
+
+EXCHANGE_MS = 1_700_000_000_123
+
+TICK_FIELDS = {
+    "symbol", "price", "high_24h", "low_24h", "volume_24h", "change_24h_percent",
+    "exchange", "exchange_ts", "received_at", "polled"
+}
+
+
+def _collect(adapter) -> list:
+    ticks = []
+    adapter.sink = ticks.append
+    return ticks
+
+
+def test_bybit_ticker_is_normalized():
+    adapter = BybitWebSocketClient()
+    ticks = _collect(adapter)
+    asyncio.run(adapter._handle_message(json.dumps({
+        "topic": "tickers.BTCUSDT",
+        "ts": EXCHANGE_MS,
+        "type": "snapshot",
+        "data": {
+            "symbol": "BTCUSDT",
+            "lastPrice": "97000.5",
+            "highPrice24h": "98000",
+            "lowPrice24h": "96000",
+            "volume24h": "1234.5",
+            "price24hPcnt": "0.0123"
+        }
+    })))
+
+    assert len(ticks) == 1
+    tick = ticks[0]
+    assert set(tick) == TICK_FIELDS
+    assert tick["symbol"] == "BTCUSDT"
+    assert tick["price"] == 97000.5
+    assert tick["high_24h"] == 98000.0
+    assert tick["low_24h"] == 96000.0
+    assert tick["volume_24h"] == 1234.5
+    assert tick["change_24h_percent"] == pytest.approx(1.23)  # Bybit sends a fraction
+    assert tick["exchange"] == "bybit"
+    assert tick["exchange_ts"] == from_exchange_ms(EXCHANGE_MS)
+    assert tick["polled"] is False
+    assert adapter.get_price("BTCUSDT") is tick
+
+
+def test_binance_ticker_is_normalized():
+    adapter = BinanceWebSocketClient()
+    ticks = _collect(adapter)
+    asyncio.run(adapter._handle_message(json.dumps({
+        "stream": "ethusdt@ticker",
+        "data": {
+            "e": "24hrTicker",
+            "E": EXCHANGE_MS,
+            "s": "ETHUSDT",
+            "c": "3400.25",
+            "h": "3500",
+            "l": "3300",
+            "v": "42.5",
+            "P": "1.23"
+        }
+    })))
+
+    assert len(ticks) == 1
+    tick = ticks[0]
+    assert set(tick) == TICK_FIELDS
+    assert tick["symbol"] == "ETHUSDT"
+    assert tick["price"] == 3400.25
+    assert tick["high_24h"] == 3500.0
+    assert tick["low_24h"] == 3300.0
+    assert tick["volume_24h"] == 42.5
+    assert tick["change_24h_percent"] == pytest.approx(1.23)  # Binance sends a percent
+    assert tick["exchange"] == "binance"
+    assert tick["exchange_ts"] == from_exchange_ms(EXCHANGE_MS)
+    assert tick["polled"] is False
+
+
+def test_binance_ignores_untracked_symbols_and_replies():
+    adapter = BinanceWebSocketClient()
+    ticks = _collect(adapter)
+    asyncio.run(adapter._handle_message(json.dumps({
+        "stream": "pepeusdt@ticker",
+        "data": {"e": "24hrTicker", "E": EXCHANGE_MS, "s": "PEPEUSDT", "c": "0.1"}
+    })))
+    asyncio.run(adapter._handle_message(json.dumps({"result": None, "id": 1})))
+
+    assert ticks == []
+
+
+def test_missing_exchange_timestamp_falls_back_to_receipt_time():
+    tick = BybitWebSocketClient().normalize("BTCUSDT", 1.0)
+
+    assert tick["exchange_ts"] == tick["received_at"]
+
+
+def _tick(adapter, price: float, seconds: float) -> dict:
+    tick = adapter.normalize("BTCUSDT", price)
+    tick["exchange_ts"] = datetime(2024, 1, 1) + timedelta(seconds=seconds)
+    return tick
+
+
+def test_latest_mode_drops_out_of_order_ticks():
+    bybit, binance = BybitWebSocketClient(), BinanceWebSocketClient()
+    feed = PriceFeed([bybit, binance], mode="latest")
+
+    bybit.emit(_tick(bybit, 100.0, seconds=2))
+    binance.emit(_tick(binance, 90.0, seconds=1))
+
+    price = feed.get_price("BTCUSDT")
+    assert price["price"] == 100.0
+    assert price["sources"] == ["bybit"]
+    assert price["timestamp"] == price["exchange_ts"]
+
+
+def test_median_mode_merges_recent_venues():
+    bybit, binance = BybitWebSocketClient(), BinanceWebSocketClient()
+    feed = PriceFeed([bybit, binance], mode="median", venue_max_age=5)
+
+    bybit.emit(_tick(bybit, 100.0, seconds=0))
+    binance.emit(_tick(binance, 110.0, seconds=1))
+    assert feed.get_price("BTCUSDT")["price"] == 105.0
+    assert feed.get_price("BTCUSDT")["sources"] == ["binance", "bybit"]
+
+    # A venue quiet for longer than venue_max_age no longer counts
+    binance.emit(_tick(binance, 120.0, seconds=10))
+    assert feed.get_price("BTCUSDT")["price"] == 120.0
+    assert feed.get_price("BTCUSDT")["sources"] == ["binance"]
+
+
+def test_unknown_feed_mode_is_rejected():
+    with pytest.raises(ValueError):
+        PriceFeed([BybitWebSocketClient()], mode="average")
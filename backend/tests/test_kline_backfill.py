@@ -0,0 +1,177 @@
+"""
+The kline backfill fills ``price_candles`` in windows of at most
+``KLINE_LIMIT`` candles, resumes from the last stored candle and prunes
+candles that fall out of the kept window; a failing series does not stop the
+others from being stored.
+"""
+import asyncio
+import socket
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete
+
+from app.core.database import SessionLocal
+from app.models.price import PriceCandle
+from app.services.kline_backfill import KLINE_LIMIT, KlineBackfill, RateLimiter
+from benchmarks.fake_bybit import FakeBybitServer, fake_kline
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture(autouse=True)
+def clear_candles():
+    db = SessionLocal()
+    try:
+        db.execute(delete(PriceCandle))
+        db.commit()
+    finally:
+        db.close()
+
+
+def _stored(symbol: str, interval: str) -> list:
+    db = SessionLocal()
+    try:
+        return db.query(PriceCandle).filter(
+            PriceCandle.symbol == symbol, PriceCandle.interval == interval
+        ).order_by(PriceCandle.start.asc()).all()
+    finally:
+        db.close()
+
+
+def _ms(value: datetime) -> int:
+    return int((value - EPOCH).total_seconds() * 1000)
+
+
+def _backfill(server: FakeBybitServer, days: dict) -> KlineBackfill:
+    backfill = KlineBackfill(base_url=f"http://127.0.0.1:{server.port}", days=days)
+    backfill.limiter = RateLimiter(1000)
+    return backfill
+
+
+async def _run(scenario):
+    server = FakeBybitServer(_free_port())
+    await server.start()
+    try:
+        return await scenario(server)
+    finally:
+        await server.stop()
+
+
+def test_cold_backfill_fills_the_window_in_limit_sized_requests():
+    async def scenario(server):
+        started = datetime.utcnow()
+        result = await _backfill(server, {"1m": 1}).backfill(["BTCUSDT"])
+        return server.kline_requests, result, started
+
+    requests, result, started = asyncio.run(_run(scenario))
+
+    candles = _stored("BTCUSDT", "1m")
+    starts = [_ms(c.start) for c in candles]
+
+    # A day of minutes plus the partial first candle spans two windows
+    assert requests == 2
+    assert result["series"] == 1
+    assert result["candles"] == len(candles) > KLINE_LIMIT
+    assert all(b - a == 60_000 for a, b in zip(starts, starts[1:]))
+
+    # Starts at the candle the window opens in, ends at the forming one
+    cutoff_ms = _ms(started - timedelta(days=1))
+    assert starts[0] == cutoff_ms - cutoff_ms % 60_000
+    assert starts[-1] >= _ms(started) - 60_000
+
+    for candle in candles:
+        assert candle.close == pytest.approx(float(fake_kline("BTCUSDT", _ms(candle.start), 60)[4]))
+
+
+def test_resume_refetches_only_the_last_candle_onwards():
+    async def scenario(server):
+        backfill = _backfill(server, {"1m": 1, "15m": 2})
+        await backfill.backfill(["BTCUSDT"])
+        first = _stored("BTCUSDT", "1m")
+        requests = server.kline_requests
+        result = await backfill.backfill(["BTCUSDT"])
+        return first, server.kline_requests - requests, result
+
+    first, requests, result = asyncio.run(_run(scenario))
+    second = _stored("BTCUSDT", "1m")
+
+    # One request per series, re-reading the candle that may still have been forming
+    assert requests == 2
+    assert result["candles"] <= 2 * 3
+    assert _ms(second[-1].start) >= _ms(first[-1].start)
+    starts = [_ms(c.start) for c in second]
+    assert len(starts) == len(set(starts))
+    assert all(b - a == 60_000 for a, b in zip(starts, starts[1:]))
+
+
+def test_candles_past_the_window_are_pruned():
+    db = SessionLocal()
+    try:
+        db.add(PriceCandle(
+            symbol="BTCUSDT", interval="1m", start=datetime.utcnow() - timedelta(days=3),
+            open=1, high=1, low=1, close=1, volume=1, turnover=1
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+    asyncio.run(_run(lambda server: _backfill(server, {"1m": 1}).backfill(["BTCUSDT"])))
+
+    oldest = _stored("BTCUSDT", "1m")[0].start
+    assert oldest >= datetime.utcnow() - timedelta(days=1, minutes=2)
+
+
+def test_rate_limited_requests_are_retried():
+    async def scenario(server):
+        server.kline_rate_limit = 1
+        backfill = _backfill(server, {"1m": 1})
+        result = await backfill.backfill(["BTCUSDT"])
+        return server.kline_rejected, result
+
+    rejected, result = asyncio.run(_run(scenario))
+
+    assert rejected >= 1
+    assert result["candles"] == len(_stored("BTCUSDT", "1m")) > KLINE_LIMIT
+
+
+def test_failed_series_do_not_block_the_others():
+    async def scenario(server):
+        server.kline_unlisted = {"ETHUSDT"}
+        return await _backfill(server, {"1m": 1, "15m": 2}).backfill(["BTCUSDT", "ETHUSDT"])
+
+    result = asyncio.run(_run(scenario))
+
+    assert result["series"] == 4
+    assert result["failed"] == 2
+    assert _stored("ETHUSDT", "1m") == []
+    assert len(_stored("BTCUSDT", "1m")) > KLINE_LIMIT
+    assert len(_stored("BTCUSDT", "15m")) > 0
+    assert result["candles"] == len(_stored("BTCUSDT", "1m")) + len(_stored("BTCUSDT", "15m"))
+
+
+def test_request_backfills_in_the_background_once_per_interval():
+    async def scenario(server):
+        backfill = _backfill(server, {"15m": 1})
+        backfill.request(["SOLUSDT"])
+        backfill.request(["SOLUSDT"])  # already requested within the interval
+        await asyncio.sleep(0)
+        async with backfill._lock:  # wait for the requested run
+            pass
+        return server.kline_requests
+
+    requests = asyncio.run(_run(scenario))
+
+    assert requests == 1
+    assert len(_stored("SOLUSDT", "15m")) > 0
+
+
+def test_unknown_interval_is_rejected():
+    with pytest.raises(ValueError):
+        KlineBackfill(base_url="http://127.0.0.1:1", days={"2m": 1})
@@ -0,0 +1,124 @@
+"""
+Order books are rebuilt from Bybit snapshots and kept current by deltas
+whose update ids ``u`` follow on; a gap drops the book out of sync and asks
+the caller, once, to resubscribe for a fresh snapshot.
+"""
+import pytest
+
+from app.services.orderbook import OrderBook, OrderBookManager
+
+
+def _snapshot(update_id: int = 100) -> dict:
+    return {"type": "snapshot", "data": {
+        "s": "BTCUSDT",
+        "b": [["100.0", "1.0"], ["99.5", "2.0"], ["99.0", "3.0"]],
+        "a": [["100.5", "1.5"], ["101.0", "2.5"], ["101.5", "3.5"]],
+        "u": update_id,
+        "seq": 1000
+    }}
+
+
+def _delta(update_id: int, bids=(), asks=()) -> dict:
+    return {"type": "delta", "data": {
+        "s": "BTCUSDT", "b": [list(level) for level in bids], "a": [list(level) for level in asks],
+        "u": update_id, "seq": 1000 + update_id
+    }}
+
+
+def _synced_manager() -> OrderBookManager:
+    manager = OrderBookManager(push_interval=0)
+    assert manager.handle("BTCUSDT", _snapshot()) is True
+    return manager
+
+
+def test_snapshot_builds_the_book():
+    book = _synced_manager().get("BTCUSDT")
+
+    assert book.bids.best() == (100.0, 1.0)
+    assert book.asks.best() == (100.5, 1.5)
+    assert book.bids.levels(3) == [(100.0, 1.0), (99.5, 2.0), (99.0, 3.0)]
+    assert book.asks.levels(3) == [(100.5, 1.5), (101.0, 2.5), (101.5, 3.5)]
+    assert book.update_id == 100
+    assert book.mid == 100.25
+
+
+def test_contiguous_deltas_update_the_best_levels():
+    manager = _synced_manager()
+
+    assert manager.handle("BTCUSDT", _delta(101, bids=[("100.25", "0.5")])) is True
+    assert manager.handle("BTCUSDT", _delta(102, asks=[("100.5", "4.0"), ("100.75", "1.0")])) is True
+
+    book = manager.get("BTCUSDT")
+    assert book.update_id == 102
+    assert book.seq == 1102
+    assert book.bids.best() == (100.25, 0.5)
+    assert book.asks.best() == (100.5, 4.0)
+    assert book.asks.levels(2) == [(100.5, 4.0), (100.75, 1.0)]
+
+    summary = book.summary()
+    assert summary["best_bid"] == 100.25
+    assert summary["best_ask"] == 100.5
+    assert summary["spread"] == pytest.approx(0.25)
+
+
+def test_zero_size_deletes_the_level():
+    manager = _synced_manager()
+
+    manager.handle("BTCUSDT", _delta(101, bids=[("100.0", "0")], asks=[("100.5", "0"), ("105.0", "0")]))
+
+    book = manager.get("BTCUSDT")
+    assert book.bids.best() == (99.5, 2.0)
+    assert book.asks.best() == (101.0, 2.5)
+    assert len(book.bids) == 2
+    assert len(book.asks) == 2  # deleting an absent level is a no-op
+    assert 100.0 not in [price for price, _ in book.bids.levels(10)]
+
+
+def test_replayed_delta_is_ignored():
+    manager = _synced_manager()
+    manager.handle("BTCUSDT", _delta(101, bids=[("100.0", "5.0")]))
+
+    assert manager.handle("BTCUSDT", _delta(101, bids=[("100.0", "9.0")])) is True
+    assert manager.get("BTCUSDT").bids.best() == (100.0, 5.0)
+
+
+def test_gap_requests_one_resync_until_a_snapshot_arrives():
+    manager = _synced_manager()
+
+    # u jumps from 100 to 102: the book stops accepting deltas
+    assert manager.handle("BTCUSDT", _delta(102, bids=[("100.25", "1.0")])) is False
+    assert manager.get("BTCUSDT") is None
+    assert manager.books["BTCUSDT"].bids.best() == (100.0, 1.0)
+
+    # Further deltas are dropped without asking again
+    assert manager.handle("BTCUSDT", _delta(103, bids=[("100.25", "1.0")])) is True
+    assert manager.books["BTCUSDT"].bids.best() == (100.0, 1.0)
+
+    # A fresh snapshot resyncs the book and deltas follow on from it
+    assert manager.handle("BTCUSDT", _snapshot(update_id=200)) is True
+    assert manager.handle("BTCUSDT", _delta(201, bids=[("100.25", "1.0")])) is True
+    assert manager.get("BTCUSDT").bids.best() == (100.25, 1.0)
+
+    # The next gap asks again
+    assert manager.handle("BTCUSDT", _delta(205)) is False
+
+
+def test_crossed_book_is_out_of_sync():
+    book = OrderBook("BTCUSDT")
+    book.apply_snapshot(_snapshot()["data"])
+
+    assert book.apply_delta(_delta(101, bids=[("100.5", "1.0")])["data"]) is False
+    assert book.synced is False
+
+
+def test_depth_counts_levels_within_the_band():
+    book = _synced_manager().get("BTCUSDT")
+
+    # 1% of the 100.25 mid reaches 99.2475 and 101.2525
+    summary = book.summary(depth_percent=1.0, levels=2)
+
+    assert summary["bid_depth"] == pytest.approx(3.0)
+    assert summary["bid_depth_notional"] == pytest.approx(100.0 * 1.0 + 99.5 * 2.0)
+    assert summary["ask_depth"] == pytest.approx(4.0)
+    assert summary["ask_depth_notional"] == pytest.approx(100.5 * 1.5 + 101.0 * 2.5)
+    assert summary["bids"] == [{"price": 100.0, "size": 1.0}, {"price": 99.5, "size": 2.0}]
@@ -0,0 +1,125 @@
+"""
+Symbols whose streams go quiet are polled from the venues' REST tickers
+until streamed ticks arrive again.
+"""
+import asyncio
+import socket
+import time
+
+import httpx
+
+from app.services.binance import BinanceWebSocketClient
+from app.services.bybit import BybitWebSocketClient
+from app.services.price_feed import PriceFeed
+from benchmarks.fake_bybit import FakeBybitServer
+
+PRICES = {"BTCUSDT": 97000.0, "ETHUSDT": 3400.0, "SOLUSDT": 190.0, "XRPUSDT": 2.3, "DOGEUSDT": 0.38}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _server() -> FakeBybitServer:
+    server = FakeBybitServer(_free_port())
+    server.tickers = {
+        symbol: {
+            "symbol": symbol,
+            "lastPrice": str(price),
+            "highPrice24h": str(price * 1.02),
+            "lowPrice24h": str(price * 0.98),
+            "volume24h": "100",
+            "price24hPcnt": "0.01"
+        }
+        for symbol, price in PRICES.items()
+    }
+    await server.start()
+    return server
+
+
+def _bybit(server: FakeBybitServer) -> BybitWebSocketClient:
+    adapter = BybitWebSocketClient()
+    adapter.rest_url = f"http://127.0.0.1:{server.port}"
+    return adapter
+
+
+async def _wait_for(predicate, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        await asyncio.sleep(0.01)
+    return predicate()
+
+
+def test_poll_publishes_only_stale_symbols():
+    async def scenario():
+        server = await _server()
+        try:
+            feed = PriceFeed([_bybit(server)])
+            async with httpx.AsyncClient() as http:
+                await feed._poll(http, {"BTCUSDT"})
+            return server, feed
+        finally:
+            await server.stop()
+
+    server, feed = asyncio.run(scenario())
+
+    assert server.rest_requests == 1
+    assert set(feed.get_current_prices()) == {"BTCUSDT"}
+    tick = feed.get_price("BTCUSDT")
+    assert tick["price"] == PRICES["BTCUSDT"]
+    assert tick["polled"] is True
+    assert not feed.is_stale("BTCUSDT")
+    # A polled tick serves a fresh price but does not count as the stream recovering
+    assert "BTCUSDT" not in feed._streamed_at
+
+
+def test_failed_venue_does_not_block_others():
+    async def scenario():
+        server = await _server()
+        try:
+            binance = BinanceWebSocketClient()
+            binance.rest_url = f"http://127.0.0.1:{_free_port()}"  # nothing listening
+            feed = PriceFeed([_bybit(server), binance])
+            async with httpx.AsyncClient() as http:
+                await feed._poll(http, set(PRICES))
+            return feed
+        finally:
+            await server.stop()
+
+    feed = asyncio.run(scenario())
+
+    assert set(feed.get_current_prices()) == set(PRICES)
+    assert {tick["exchange"] for tick in feed.get_current_prices().values()} == {"bybit"}
+
+
+def test_stale_stream_falls_back_to_polling_and_recovers():
+    async def scenario():
+        server = await _server()
+        adapter = _bybit(server)
+        feed = PriceFeed([adapter])
+        feed.stale_after = 0.2
+        feed.poll_interval = 0.05
+        feed._running = True
+        poller = asyncio.create_task(feed._poll_stale())
+        try:
+            # No stream ticks at all: every symbol goes stale and is polled
+            assert await _wait_for(lambda: feed.polling == set(PRICES))
+            assert await _wait_for(lambda: set(feed.get_current_prices()) == set(PRICES))
+            assert all(tick["polled"] for tick in feed.get_current_prices().values())
+
+            # A streamed tick takes the symbol off polling (stamped ahead so
+            # a poll still in flight cannot supersede it)
+            adapter.emit(adapter.normalize("BTCUSDT", 98000.0, int((time.time() + 60) * 1000)))
+            assert await _wait_for(lambda: "BTCUSDT" not in feed.polling)
+            assert feed.polling == set(PRICES) - {"BTCUSDT"}
+            assert feed.get_price("BTCUSDT")["polled"] is False
+        finally:
+            feed._running = False
+            await poller
+            await server.stop()
+
+    asyncio.run(scenario())
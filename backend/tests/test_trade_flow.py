@@ -0,0 +1,90 @@
+"""
+Trades are bucketed per second in a fixed-size ring; windows read across
+the point where the ring wraps and ignore slots overwritten since.
+"""
+import pytest
+
+from app.services.trade_flow import TradeFlow
+
+RING_SECONDS = 10
+
+
+def _trade(second: int, price: float, size: float, side: str = "Buy") -> dict:
+    return {"T": second * 1000 + 250, "p": str(price), "v": str(size), "S": side}
+
+
+def _flow(trades: list) -> TradeFlow:
+    flow = TradeFlow(bucket_seconds=RING_SECONDS)
+    flow.add_trades("BTCUSDT", trades)
+    return flow
+
+
+def _second(second: int) -> list:
+    """One buy and one sell in ``second``, priced and sized by it."""
+    return [_trade(second, 100.0 + second, 1.0, "Buy"), _trade(second, 100.0 + second, 0.5 * second, "Sell")]
+
+
+def test_ring_keeps_only_the_last_ring_of_seconds():
+    flow = _flow([t for second in range(1, 26) for t in _second(second)])
+    book = flow.get("BTCUSDT")
+
+    # Seconds 16-25 are held; slot 5 was reused for 5, 15 and then 25
+    window = book.window(1, 25)
+    assert list(window["start"]) == list(range(16, 26))
+    assert list(window["trades"]) == [2] * 10
+    assert book.seconds[25 % RING_SECONDS] == 25
+    assert book.total_volume == pytest.approx(sum(1.0 + 0.5 * s for s in range(1, 26)))
+
+
+def test_window_across_the_wrap_boundary():
+    flow = _flow([t for second in range(1, 26) for t in _second(second)])
+    seconds = range(18, 26)  # slots 8, 9, 0, 1, ..., 5
+
+    summary = flow.summary("BTCUSDT", len(seconds), now=25.9)
+
+    buy = 1.0 * len(seconds)
+    sell = sum(0.5 * s for s in seconds)
+    quote = sum((100.0 + s) * (1.0 + 0.5 * s) for s in seconds)
+    assert summary["start"] == 18
+    assert summary["trades"] == 2 * len(seconds)
+    assert summary["buy_volume"] == pytest.approx(buy)
+    assert summary["sell_volume"] == pytest.approx(sell)
+    assert summary["volume"] == pytest.approx(buy + sell)
+    assert summary["quote_volume"] == pytest.approx(quote)
+    assert summary["vwap"] == pytest.approx(quote / (buy + sell))
+    assert flow.quote_volume("BTCUSDT", len(seconds), now=25.9) == pytest.approx(quote)
+
+
+def test_overwritten_and_quiet_seconds_count_as_empty():
+    # Trades at 3 and 14 share slot 4; 5-13 and 15-16 are quiet
+    flow = _flow([_trade(3, 100.0, 2.0), _trade(14, 110.0, 1.0, "Sell")])
+
+    window = flow.get("BTCUSDT").window(7, 16)
+    assert list(window["start"]) == list(range(7, 17))
+    assert list(window["volume"]) == [0.0] * 7 + [1.0, 0.0, 0.0]
+
+    summary = flow.summary("BTCUSDT", 10, now=16)
+    assert summary["volume"] == 1.0
+    assert summary["buy_volume"] == 0.0
+    assert summary["vwap"] == 110.0
+    assert flow.summary("BTCUSDT", 5, now=30)["vwap"] is None
+
+
+def test_late_trade_lands_in_its_slot_unless_it_left_the_ring():
+    flow = _flow([_trade(20, 100.0, 1.0), _trade(18, 90.0, 2.0), _trade(5, 80.0, 4.0)])
+
+    summary = flow.summary("BTCUSDT", RING_SECONDS, now=20)
+    assert summary["volume"] == 3.0
+    assert summary["vwap"] == pytest.approx((100.0 + 180.0) / 3.0)
+
+
+def test_buckets_align_across_the_wrap_boundary():
+    flow = _flow([t for second in range(1, 26) for t in _second(second)])
+
+    buckets = flow.buckets("BTCUSDT", 10, resolution=5, now=24)
+
+    # Slots 5-9 then 0-4; second 15 was overwritten by 25
+    assert [b["start"] for b in buckets] == [15, 20]
+    assert [b["trades"] for b in buckets] == [8, 10]
+    assert buckets[1]["buy_volume"] == pytest.approx(5.0)
+    assert buckets[1]["sell_volume"] == pytest.approx(0.5 * sum(range(20, 25)))
@@ -4,11 +4,14 @@
 import React, { useState } from 'react';
 import { Brain, RefreshCw, TrendingUp, TrendingDown, Minus } from 'lucide-react';
 import { pricesAPI } from '../services/api';
+import { usePriceStore } from '../store';
 
 const SYMBOLS = ['BTCUSDT', 'ETHUSDT', 'SOLUSDT', 'XRPUSDT', 'DOGEUSDT'];
+const DIGEST_KEY = [...SYMBOLS].sort().join(',');
 
 export function AIAnalysis() {
-  const [analysis, setAnalysis] = useState(null);
+  const [requested, setRequested] = useState(null);
+  const digest = usePriceStore((s) => s.aiDigests[DIGEST_KEY]);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState('');
 
@@ -18,7 +21,7 @@ export function AIAnalysis() {
     
     try {
       const response = await pricesAPI.analyze(SYMBOLS);
-      setAnalysis(response.data);
+      setRequested(response.data);
     } catch (err) {
       setError(err.response?.data?.detail || 'Failed to get analysis');
     } finally {
@@ -26,6 +29,11 @@ export function AIAnalysis() {
     }
   };
 
+  // Show whichever is newer: the pushed digest or the last requested analysis
+  const analysis = !requested || (digest && new Date(digest.timestamp) > new Date(requested.timestamp))
+    ? digest
+    : requested;
+
   const getSentimentIcon = (sentiment) => {
     switch (sentiment) {
       case 'bullish':
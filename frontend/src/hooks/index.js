@@ -1,2 +1,3 @@
 export { useWebSocket } from './useWebSocket';
 export { useAuth } from './useAuth';
+export { usePortfolioStream } from './usePortfolioStream';
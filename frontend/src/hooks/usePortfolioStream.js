@@ -0,0 +1,77 @@
+/**
+ * WebSocket hook for live portfolio valuation.
+ */
+import { useEffect, useRef } from 'react';
+import { useAuthStore, usePortfolioStore } from '../store';
+
+const WS_URL = import.meta.env.VITE_WS_URL || 'ws://localhost:8000';
+
+export function usePortfolioStream() {
+  const wsRef = useRef(null);
+  const reconnectTimeoutRef = useRef(null);
+  const token = useAuthStore((s) => s.token);
+  const { setPortfolio, applyPortfolioDelta, setLoading } = usePortfolioStore();
+
+  useEffect(() => {
+    if (!token) return;
+
+    let closed = false;
+    let pingInterval = null;
+
+    const connect = () => {
+      setLoading(true);
+      const ws = new WebSocket(`${WS_URL}/api/portfolio/ws?token=${encodeURIComponent(token)}`);
+
+      ws.onclose = () => {
+        clearInterval(pingInterval);
+        if (!closed) {
+          // Reconnect after 3 seconds
+          reconnectTimeoutRef.current = setTimeout(connect, 3000);
+        }
+      };
+
+      ws.onerror = (error) => {
+        console.error('Portfolio WebSocket error:', error);
+      };
+
+      ws.onmessage = (event) => {
+        if (event.data === 'ping' || event.data === 'pong') return;
+
+        try {
+          const message = JSON.parse(event.data);
+
+          if (message.type === 'snapshot') {
+            setPortfolio(message.data);
+            setLoading(false);
+          } else if (message.type === 'delta') {
+            applyPortfolioDelta(message.data);
+          }
+        } catch (e) {
+          console.error('Failed to parse portfolio message:', e);
+        }
+      };
+
+      // Ping to keep connection alive
+      pingInterval = setInterval(() => {
+        if (ws.readyState === WebSocket.OPEN) {
+          ws.send('ping');
+        }
+      }, 25000);
+
+      wsRef.current = ws;
+    };
+
+    connect();
+
+    return () => {
+      closed = true;
+      clearInterval(pingInterval);
+      if (reconnectTimeoutRef.current) {
+        clearTimeout(reconnectTimeoutRef.current);
+      }
+      if (wsRef.current) {
+        wsRef.current.close();
+      }
+    };
+  }, [token, setPortfolio, applyPortfolioDelta, setLoading]);
+}
@@ -9,7 +9,7 @@ const WS_URL = import.meta.env.VITE_WS_URL || 'ws://localhost:8000';
 export function useWebSocket() {
   const wsRef = useRef(null);
   const reconnectTimeoutRef = useRef(null);
-  const { setPrice, setPrices, setConnected } = usePriceStore();
+  const { setPrice, setPrices, setConnected, setAIDigest } = usePriceStore();
 
   const connect = useCallback(() => {
     if (wsRef.current?.readyState === WebSocket.OPEN) return;
@@ -48,6 +48,9 @@ export function useWebSocket() {
           if (symbol) {
             setPrice(symbol, message.data);
           }
+        } else if (message.type === 'ai_digest') {
+          // Precomputed AI analysis for a symbol set
+          setAIDigest(message.data);
         }
       } catch (e) {
         console.error('Failed to parse WebSocket message:', e);
@@ -66,7 +69,7 @@ export function useWebSocket() {
     return () => {
       clearInterval(pingInterval);
     };
-  }, [setPrice, setPrices, setConnected]);
+  }, [setPrice, setPrices, setConnected, setAIDigest]);
 
   useEffect(() => {
     connect();
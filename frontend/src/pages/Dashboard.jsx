@@ -1,31 +1,21 @@
 /**
  * Dashboard page - main overview of prices and portfolio.
  */
-import React, { useState, useEffect } from 'react';
+import React, { useState } from 'react';
 import { TrendingUp, TrendingDown, Wallet } from 'lucide-react';
 import { PriceCard, PriceChart, AIAnalysis } from '../components';
 import { usePriceStore, usePortfolioStore } from '../store';
-import { portfolioAPI } from '../services/api';
+import { usePortfolioStream } from '../hooks';
 
 const SYMBOLS = ['BTCUSDT', 'ETHUSDT', 'SOLUSDT', 'XRPUSDT', 'DOGEUSDT'];
 
 export function Dashboard() {
   const prices = usePriceStore((s) => s.prices);
-  const { totalValue, totalPnl, totalPnlPercent, setPortfolio } = usePortfolioStore();
+  const { totalValue, totalPnl, totalPnlPercent } = usePortfolioStore();
   const [selectedSymbol, setSelectedSymbol] = useState('BTCUSDT');
 
-  // Fetch portfolio on mount
-  useEffect(() => {
-    const fetchPortfolio = async () => {
-      try {
-        const response = await portfolioAPI.get();
-        setPortfolio(response.data);
-      } catch (error) {
-        console.error('Failed to fetch portfolio:', error);
-      }
-    };
-    fetchPortfolio();
-  }, [setPortfolio]);
+  // Live portfolio valuation
+  usePortfolioStream();
 
   const isPositive = totalPnlPercent >= 0;
 
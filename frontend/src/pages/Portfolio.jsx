@@ -1,16 +1,17 @@
 /**
  * Portfolio page - manage crypto holdings.
  */
-import React, { useState, useEffect } from 'react';
+import React, { useState } from 'react';
 import { Wallet, Plus, TrendingUp, TrendingDown, X } from 'lucide-react';
 import { PortfolioCard } from '../components';
 import { usePortfolioStore } from '../store';
 import { portfolioAPI } from '../services/api';
+import { usePortfolioStream } from '../hooks';
 
 const SYMBOLS = ['BTCUSDT', 'ETHUSDT', 'SOLUSDT', 'XRPUSDT', 'DOGEUSDT'];
 
 export function Portfolio() {
-  const { holdings, totalValue, totalPnl, totalPnlPercent, setPortfolio, setLoading } = usePortfolioStore();
+  const { holdings, totalValue, totalPnl, totalPnlPercent } = usePortfolioStore();
   const [showForm, setShowForm] = useState(false);
   const [editHolding, setEditHolding] = useState(null);
   const [formData, setFormData] = useState({
@@ -21,21 +22,8 @@ export function Portfolio() {
   const [error, setError] = useState('');
   const [submitting, setSubmitting] = useState(false);
 
-  // Fetch portfolio on mount
-  useEffect(() => {
-    const fetchPortfolio = async () => {
-      setLoading(true);
-      try {
-        const response = await portfolioAPI.get();
-        setPortfolio(response.data);
-      } catch (error) {
-        console.error('Failed to fetch portfolio:', error);
-      } finally {
-        setLoading(false);
-      }
-    };
-    fetchPortfolio();
-  }, [setPortfolio, setLoading]);
+  // Live portfolio valuation; holding changes arrive over the stream too
+  usePortfolioStream();
 
   const handleEdit = (holding) => {
     setEditHolding(holding);
@@ -52,8 +40,6 @@ export function Portfolio() {
     
     try {
       await portfolioAPI.deleteHolding(holding.id);
-      const response = await portfolioAPI.get();
-      setPortfolio(response.data);
     } catch (error) {
       console.error('Failed to delete holding:', error);
     }
@@ -77,10 +63,6 @@ export function Portfolio() {
         await portfolioAPI.addHolding(data);
       }
 
-      // Refresh portfolio
-      const response = await portfolioAPI.get();
-      setPortfolio(response.data);
-      
       setShowForm(false);
       setEditHolding(null);
       setFormData({ symbol: 'BTCUSDT', amount: '', average_buy_price: '' });
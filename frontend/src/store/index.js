@@ -8,6 +8,7 @@ export const usePriceStore = create((set, get) => ({
   prices: {},
   lastUpdated: null,
   connected: false,
+  aiDigests: {},
   
   setPrice: (symbol, priceData) => set((state) => ({
     prices: { ...state.prices, [symbol]: priceData },
@@ -21,6 +22,11 @@ export const usePriceStore = create((set, get) => ({
   
   setConnected: (connected) => set({ connected }),
   
+  // Digests are keyed by their sorted, comma-joined symbols
+  setAIDigest: (digest) => set((state) => ({
+    aiDigests: { ...state.aiDigests, [[...digest.symbols].sort().join(',')]: digest },
+  })),
+  
   getPrice: (symbol) => get().prices[symbol],
 }));
 
@@ -85,6 +91,17 @@ export const usePortfolioStore = create((set) => ({
     totalPnlPercent: data.total_pnl_percent,
   }),
   
+  // Apply a streamed delta: new totals plus only the holdings that changed
+  applyPortfolioDelta: (delta) => set((state) => {
+    const changed = Object.fromEntries(delta.holdings.map((h) => [h.id, h]));
+    return {
+      holdings: state.holdings.map((h) => changed[h.id] || h),
+      totalValue: delta.total_value,
+      totalPnl: delta.total_pnl,
+      totalPnlPercent: delta.total_pnl_percent,
+    };
+  }),
+  
   setLoading: (loading) => set({ loading }),
 }));
 